@@ -14,6 +14,19 @@ class Settings(BaseSettings):
     chunk_overlap: int = 200
     min_chunk_words: int = 20
     num_chunks_to_select: int = 6
+    # Chunks whose estimated Jaccard similarity (MinHash over word 5-grams) to an earlier
+    # chunk reaches this are dropped before sampling (empty or 0 disables)
+    chunk_dedup_threshold: float | None = 0.85
+    chunk_dedup_num_perm: int = 128
+    # Chunk sampling seed (None = random per run; the seed used is in the run manifest)
+    qa_seed: int | None = None
+    # Results of finished runs by manifest key, reused when a manifest matches (empty disables)
+    manifest_dir: str | None = ".rag_med/manifests"
+    # QA result files: json (indented) or parquet (metrics as columns, needs pyarrow)
+    results_format: str = "json"
+    parquet_compression: str = "zstd"
+    # Indexed history of runs, items and metrics for `rag-med runs` (empty path disables)
+    results_db_path: str | None = ".rag_med/results.sqlite3"
 
     start_section_text: str = "Список литературы"
     end_section_text: str = "Приложение А2. Методология разработки клинических рекомендаций"
@@ -27,13 +40,67 @@ class Settings(BaseSettings):
     valueai_instructions: str = "you are helpful assistant"
     valueai_poll_interval_seconds: float = 2.0
     valueai_timeout_seconds: float = 600  
+    # LLM API tokens (QA generation, RAGAS, alignment judge) are reused this long (0 = per call)
+    valueai_token_ttl_seconds: float = 600
     ragas_max_tokens: int = 8192
+    # Samples scored concurrently by the batch RAGAS API (one shared event loop)
+    ragas_max_concurrency: int = 8
+
+    # Predict journal: submitted predict ids survive restarts (empty path disables)
+    valueai_journal_path: str | None = ".rag_med/predict_journal.sqlite3"
+    valueai_journal_ttl_seconds: float = 86400
+
+    # Evaluation: QA items evaluated concurrently (metrics of one item always run in parallel)
+    eval_max_concurrent_items: int = 4
+    # Corpus TF-IDF/BM25 statistics, persisted per chunk corpus (empty = build in memory only)
+    lexical_index_dir: str | None = ".rag_med/lexical_index"
+    # Metric result cache: unchanged pairs are not rescored (empty path disables)
+    metric_cache_path: str | None = ".rag_med/metric_cache.sqlite3"
+    metric_cache_max_entries: int = 100_000
+    # Local gate in front of FactualCorrectness and the alignment judge: empty answers and
+    # refusals score lowest; token F1 and ROUGE-L >= identical threshold with the same numbers
+    # and negations score highest; char n-gram F1 <= disjoint threshold scores lowest
+    # (None disables that rule)
+    eval_gate_enabled: bool = True
+    eval_gate_identical_threshold: float | None = 0.95
+    eval_gate_disjoint_threshold: float | None = None
+    # Alignment judge: pairs per LLM request (1 = one request per pair); a batch is sent
+    # once full or after the wait (generate batches items evaluated concurrently)
+    llm_judge_batch_size: int = 1
+    llm_judge_batch_wait_seconds: float = 2.0
+
+    # rag-med run: items allowed in each queue between stages, and per-stage worker
+    # overrides ("generate=8,rag=8"; stages clean, extract, chunk, generate, rag, score)
+    pipeline_queue_size: int = 16
+    pipeline_workers: str = ""
+    # Job queue shared by `rag-med worker` processes (a path on storage every host can
+    # reach); a job whose lease is not renewed is retried, up to max attempts
+    workqueue_path: str = ".rag_med/workqueue.sqlite3"
+    workqueue_lease_seconds: float = 120.0
+    workqueue_max_attempts: int = 3
+    workqueue_retry_delay_seconds: float = 5.0
+    workqueue_poll_seconds: float = 2.0
+    # rag-med serve: listen address and how concurrent score requests are batched
+    serve_host: str = "127.0.0.1"
+    serve_port: int = 8765
+    serve_batch_size: int = 8
+    serve_batch_wait_seconds: float = 0.05
+    # Live dashboard: progress log interval when stdout is not a terminal
+    progress_log_interval_seconds: float = 30.0
 
     # Metrics LLM
     metrics_llm_model_name: str = "llm_qwen_2_5_coder_32b_instruct_q8"
     metrics_llm_poll_interval_seconds: float = 2.0
     metrics_llm_timeout_seconds: float = 600
 
+    # Tracing: spans/events buffered in memory and appended to trace_path as JSON lines by
+    # a background thread (debug|info|warning|error; errors are kept regardless of sampling)
+    trace_enabled: bool = False
+    trace_path: str | None = ".rag_med/trace.jsonl"
+    trace_level: str = "info"
+    trace_sample_rate: float = 1.0
+    trace_buffer_size: int = 10_000
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
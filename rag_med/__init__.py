@@ -1,9 +1,17 @@
-"""RAG_MED - Medical RAG system for PDF processing and QA generation."""
+"""RAG_MED - Medical RAG system for PDF processing and QA generation.
 
-from importlib import metadata as importlib_metadata
+Public names are imported on first access so that ``import rag_med`` (and the CLI)
+does not pay for PDF, LLM and metrics dependencies it may not use.
+"""
 
-from .pdf_cleaner import clean_pdf
-from .qa_generator import generate_qa_from_pdf
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .pdf_cleaner import clean_pdf
+    from .qa_generator import generate_qa_from_pdf
 
 __all__ = [
     "clean_pdf",
@@ -11,13 +19,33 @@ __all__ = [
     "__version__",
 ]
 
+_LAZY = {
+    "clean_pdf": ".pdf_cleaner",
+    "generate_qa_from_pdf": ".qa_generator",
+}
+
 
 def get_version() -> str:
     """Get package version."""
+    from importlib import metadata as importlib_metadata
+
     try:
         return importlib_metadata.version(__name__)
     except importlib_metadata.PackageNotFoundError:
         return "unknown"
 
 
-__version__: str = get_version()
+def __getattr__(name: str) -> object:
+    if name == "__version__":
+        value: object = get_version()
+    elif name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+    else:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
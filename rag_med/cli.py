@@ -1,17 +1,23 @@
 """Command-line interface for RAG_MED."""
 
+import json
 import logging
+import sys
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import typer
 from rich import print as rprint
 from rich.console import Console
 from rich.table import Table
 
-from . import __version__
-from .pdf_cleaner import clean_pdf
-from .qa_generator import generate_qa_from_pdf
-from configs.settings import settings as _settings
+if TYPE_CHECKING:
+    from .results_store import ResultsStore
+
+# Heavy dependencies (PyMuPDF, pypdf, openai, metrics) are imported inside the commands
+# that use them, so ``rag-med version`` and ``--help`` start quickly
 
 app = typer.Typer(
     name="rag-med",
@@ -28,9 +34,41 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _live_dashboard(enabled: bool, tracker: object) -> AbstractContextManager:
+    """Rich live view of ``tracker`` (periodic log lines when stdout is not a terminal)."""
+    if not enabled:
+        return nullcontext()
+    from configs.settings import settings
+
+    from .dashboard import LiveDashboard
+
+    return LiveDashboard(
+        tracker,
+        console,
+        log_interval=getattr(settings, "progress_log_interval_seconds", 30.0),
+    )
+
+
+@contextmanager
+def _profiling(enabled: bool, pstats_file: Path | None, memory: bool) -> Iterator[None]:
+    """Per-stage profiling for the block (``--profile``); the summary gets a ``profile`` key."""
+    if not (enabled or pstats_file or memory):
+        yield
+        return
+    from .profiling import disable_profiling, enable_profiling
+
+    enable_profiling(pstats_path=pstats_file, trace_memory=memory)
+    try:
+        yield
+    finally:
+        disable_profiling()
+
+
 @app.command()
 def version() -> None:
     """Show version information."""
+    from . import __version__
+
     rprint(f"[bold green]RAG_MED[/bold green] v{__version__}")
 
 
@@ -48,6 +86,8 @@ def clean(
         rag-med clean document.pdf
         rag-med clean /path/to/pdfs/ --output /path/to/output/
     """
+    from .pdf_cleaner import clean_pdf
+
     if verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
@@ -120,6 +160,18 @@ def _build_results_table(results: list, valueai_eval: bool) -> None:
     console.print(table)
 
 
+def _write_generate_profile(output_file: Path) -> None:
+    """Without ValueAI evaluation there is no summary; the profile gets its own file."""
+    from .profiling import profile_summary
+
+    profile = profile_summary()
+    if profile is None:
+        return
+    profile_file = output_file.with_name(f"{output_file.stem}_profile.json")
+    profile_file.write_text(json.dumps({"profile": profile}, indent=2), encoding="utf-8")
+    console.print(f"[green] Profile saved to: {profile_file}[/green]")
+
+
 @app.command()
 def generate(
     pdf_path: Path = typer.Argument(..., help="Input PDF file"),
@@ -129,6 +181,33 @@ def generate(
     ),
     valueai_eval: bool = typer.Option(False, "--valueai-eval", help="Evaluate with ValueAI"),
     eval_summary: str | None = typer.Option(None, "--eval-summary", help="Evaluation summary file"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the metric cache"),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Rescore every pair and overwrite cached metric results (no stored run is reused)",
+    ),
+    output_format: str | None = typer.Option(
+        None, "--format", help="Results as json or parquet (default: RESULTS_FORMAT)"
+    ),
+    seed: int | None = typer.Option(
+        None, "--seed", help="Chunk sampling seed (default: QA_SEED, else random and recorded)"
+    ),
+    no_reuse: bool = typer.Option(
+        False, "--no-reuse", help="Recompute even if a run with the same manifest is stored"
+    ),
+    dashboard: bool = typer.Option(
+        True, "--dashboard/--no-dashboard", help="Live per-stage throughput view"
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Record wall/CPU time per stage in the summary"
+    ),
+    profile_pstats: Path | None = typer.Option(
+        None, "--profile-pstats", help="Also dump cProfile stats to this file (implies --profile)"
+    ),
+    profile_memory: bool = typer.Option(
+        False, "--profile-memory", help="Also record tracemalloc peak per stage (slow)"
+    ),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
 ) -> None:
     """Generate QA pairs from PDF file.
@@ -136,9 +215,18 @@ def generate(
     Example:
         rag-med generate document.pdf
         rag-med generate document.pdf --output results.json
+        rag-med generate document.pdf -n 5 --seed 42
     """
+    from configs.settings import settings as _settings
+
+    from .dashboard import ProgressTracker
+    from .evaluation.cache import configure_metric_cache
+    from .qa_generator import generate_qa_from_pdf
+    from .qa_generator.output import with_format
+
     if verbose:
         logging.getLogger().setLevel(logging.DEBUG)
+    configure_metric_cache(enabled=not no_cache, refresh=refresh)
 
     logger.info(
         "Модель для генерации: %s (config: metrics_llm_model_name / METRICS_LLM_MODEL_NAME)",
@@ -147,17 +235,32 @@ def generate(
     try:
         # Convert string paths to Path objects
         output_path = Path(output_file) if output_file else None
+        if output_path is not None:
+            fmt = output_format or getattr(_settings, "results_format", "json")
+            output_path = with_format(output_path, fmt)
         summary_path = Path(eval_summary) if eval_summary else None
 
-        results = generate_qa_from_pdf(
-            pdf_path,
-            output_path,
-            num_questions=num_questions,
-            evaluate_with_valueai=valueai_eval,
-            summary_file=summary_path,
-        )
+        if dashboard and num_questions is None and sys.stdin.isatty():
+            # The question-count prompt cannot share the terminal with the live view
+            console.print("[yellow]Live dashboard off: pass --num-questions to enable it[/yellow]")
+            dashboard = False
+        tracker = ProgressTracker()
+        with _profiling(profile, profile_pstats, profile_memory):
+            with _live_dashboard(dashboard, tracker):
+                results = generate_qa_from_pdf(
+                    pdf_path,
+                    output_path,
+                    num_questions=num_questions,
+                    evaluate_with_valueai=valueai_eval,
+                    summary_file=summary_path,
+                    progress=tracker,
+                    seed=seed,
+                    reuse=not (no_reuse or refresh),
+                )
+            if not valueai_eval:
+                _write_generate_profile(output_path or Path("qa_result.json"))
         _build_results_table(results, valueai_eval)
-        console.print(f"\n[green] Results saved to: {output_file}[/green]")
+        console.print(f"\n[green] Results saved to: {output_path}[/green]")
 
     except FileNotFoundError as e:
         console.print(f"[red] Error: {e}[/red]")
@@ -171,5 +274,478 @@ def generate(
         raise typer.Exit(1) from e
 
 
+@app.command()
+def evaluate(
+    inputs: list[Path] = typer.Argument(..., help="QA result JSON files or directories"),
+    metrics: str = typer.Option(
+        "all", "--metrics", "-m", help="Comma-separated: faithfulness,factual,cosine,alignment"
+    ),
+    output_dir: Path | None = typer.Option(
+        None, "--output-dir", "-o", help="Write rescored files here (default: in place)"
+    ),
+    summary: Path | None = typer.Option(
+        None, "--summary", help="Merged summary file (default: evaluation_summary.json)"
+    ),
+    force: bool = typer.Option(False, "--force", help="Rescore metrics that are up to date"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the metric cache"),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Rescore every pair and overwrite cached metric results"
+    ),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+) -> None:
+    """Re-score saved QA result files (items need valueai_answer).
+
+    Example:
+        rag-med evaluate qa_result.json
+        rag-med evaluate reports/ --metrics alignment --output-dir rescored/
+    """
+    from .evaluation.cache import configure_metric_cache
+    from .evaluation.rescore import evaluate_result_files, parse_metric_names
+
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    configure_metric_cache(enabled=not no_cache, refresh=refresh)
+
+    try:
+        report = evaluate_result_files(
+            inputs,
+            parse_metric_names(metrics),
+            output_dir=output_dir,
+            summary_file=summary,
+            force=force,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        console.print(f"[red] Error: {e}[/red]")
+        raise typer.Exit(1) from e
+
+    table = Table(title=" Evaluation", show_header=True)
+    table.add_column("Metric", style="cyan")
+    table.add_column("Rescored", style="yellow")
+    table.add_column("Up to date", style="green")
+    for name in report["metrics"]:
+        table.add_row(name, str(report["rescored"][name]), str(report["up_to_date"][name]))
+    console.print(table)
+    console.print(f"\n[green] Summary saved to: {report['summary_file']}[/green]")
+
+
+@app.command()
+def run(
+    inputs: list[Path] = typer.Argument(..., help="PDF files or directories"),
+    output_dir: Path = typer.Option(
+        Path("reports/run"), "--output-dir", "-o", help="Results, summary and cleaned PDFs"
+    ),
+    num_questions: int | None = typer.Option(
+        None, "--num-questions", "-n", help="Questions per PDF (default: NUM_CHUNKS_TO_SELECT)"
+    ),
+    no_clean: bool = typer.Option(False, "--no-clean", help="Use the PDFs as they are"),
+    no_eval: bool = typer.Option(False, "--no-eval", help="Stop after QA generation"),
+    workers: str | None = typer.Option(
+        None, "--workers", "-w", help="Per-stage workers, e.g. generate=8,rag=8,score=4"
+    ),
+    queue_size: int | None = typer.Option(
+        None, "--queue-size", help="Items allowed between stages (default: PIPELINE_QUEUE_SIZE)"
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the metric cache"),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Rescore every pair and overwrite cached metric results (no stored run is reused)",
+    ),
+    output_format: str | None = typer.Option(
+        None, "--format", help="Results as json or parquet (default: RESULTS_FORMAT)"
+    ),
+    seed: int | None = typer.Option(
+        None, "--seed", help="Chunk sampling seed (default: QA_SEED, else random and recorded)"
+    ),
+    no_reuse: bool = typer.Option(
+        False, "--no-reuse", help="Recompute even if a run with the same manifest is stored"
+    ),
+    dashboard: bool = typer.Option(
+        True, "--dashboard/--no-dashboard", help="Live per-stage throughput view"
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Record wall/CPU time per stage in the summary"
+    ),
+    profile_pstats: Path | None = typer.Option(
+        None, "--profile-pstats", help="Also dump cProfile stats to this file (implies --profile)"
+    ),
+    profile_memory: bool = typer.Option(
+        False, "--profile-memory", help="Also record tracemalloc peak per stage (slow)"
+    ),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+) -> None:
+    """Clean, extract, chunk, generate QA, ask ValueAI RAG and score, streaming per item.
+
+    Example:
+        rag-med run pdfs/ --num-questions 5
+        rag-med run a.pdf b.pdf --workers generate=8,rag=8 --output-dir reports/run1
+    """
+    from configs.settings import settings as _settings
+
+    from .dashboard import ProgressTracker
+    from .evaluation.cache import configure_metric_cache
+    from .pipeline.run import parse_workers, run_pipeline
+
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    configure_metric_cache(enabled=not no_cache, refresh=refresh)
+
+    tracker = ProgressTracker()
+    try:
+        with (
+            _profiling(profile, profile_pstats, profile_memory),
+            _live_dashboard(dashboard, tracker),
+        ):
+            summary = run_pipeline(
+                inputs,
+                output_dir,
+                questions_per_file=num_questions,
+                clean=not no_clean,
+                evaluate=not no_eval,
+                workers=parse_workers(workers),
+                queue_size=queue_size,
+                progress=tracker,
+                seed=seed,
+                reuse=not (no_reuse or refresh),
+                output_format=output_format or getattr(_settings, "results_format", "json"),
+            )
+    except (FileNotFoundError, ValueError) as e:
+        console.print(f"[red] Error: {e}[/red]")
+        raise typer.Exit(1) from e
+
+    table = Table(title=" Pipeline stages", show_header=True)
+    table.add_column("Stage", style="cyan")
+    table.add_column("Workers", style="white")
+    table.add_column("In", style="green")
+    table.add_column("Out", style="green")
+    table.add_column("Errors", style="red")
+    table.add_column("Busy, s", style="yellow")
+    for name, st in summary["stages"].items():
+        table.add_row(
+            name,
+            str(st["workers"]),
+            str(st["consumed"]),
+            str(st["produced"]),
+            str(st["errors"]),
+            f"{st['busy_seconds']:.1f}",
+        )
+    console.print(table)
+    aggregate = summary["aggregate_metrics"]
+    console.print(
+        f"\n[green] {aggregate['count']} results ({aggregate['evaluated_count']} evaluated) "
+        f"saved to: {summary['results_file']}[/green]"
+    )
+    if "parquet_file" in summary:
+        console.print(f"[green] Parquet results saved to: {summary['parquet_file']}[/green]")
+    console.print(f"[green] Summary saved to: {summary['summary_file']}[/green]")
+
+
+@app.command()
+def worker(
+    queue_path: Path | None = typer.Option(
+        None, "--queue", help="Job queue file (default: WORKQUEUE_PATH)"
+    ),
+    kinds: str | None = typer.Option(
+        None, "--kinds", help="Only these job kinds, comma-separated: generate, rag, metric"
+    ),
+    concurrency: int = typer.Option(1, "--concurrency", "-c", help="Jobs processed at once"),
+    exit_when_idle: bool = typer.Option(
+        False, "--exit-when-idle", help="Stop once no job is pending or leased"
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the metric cache"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+) -> None:
+    """Process generation and evaluation jobs from the shared job queue.
+
+    Example:
+        rag-med worker --queue /shared/rag_med/workqueue.sqlite3 --concurrency 4
+    """
+    from configs.settings import settings as _settings
+
+    from .evaluation.cache import configure_metric_cache
+    from .workqueue.coordinator import get_job_queue
+    from .workqueue.tasks import JOB_KINDS
+    from .workqueue.worker import Worker
+
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    configure_metric_cache(enabled=not no_cache)
+    kind_list = [k.strip() for k in kinds.split(",") if k.strip()] if kinds else None
+    unknown = sorted(set(kind_list or ()) - set(JOB_KINDS))
+    if unknown:
+        console.print(f"[red] Unknown job kinds: {', '.join(unknown)}[/red]")
+        raise typer.Exit(1)
+    queue = get_job_queue(queue_path)
+    w = Worker(
+        queue,
+        kinds=kind_list,
+        lease_seconds=getattr(_settings, "workqueue_lease_seconds", 120.0),
+        poll_seconds=getattr(_settings, "workqueue_poll_seconds", 2.0),
+        concurrency=concurrency,
+    )
+    try:
+        w.run(until_idle=exit_when_idle)
+    except KeyboardInterrupt:
+        console.print("[yellow] Interrupted; leased jobs are retried after their lease[/yellow]")
+    finally:
+        queue.close()
+    console.print(f"[green] Worker {w.owner}: {w.processed} jobs done, {w.failed} failed[/green]")
+
+
+@app.command()
+def coordinate(
+    pdf_path: Path = typer.Argument(..., help="Input PDF file"),
+    output_file: str = typer.Option("qa_result.json", "--output", "-o", help="Output JSON file"),
+    num_questions: int | None = typer.Option(
+        None, "--num-questions", "-n", help="Number of questions (default: NUM_CHUNKS_TO_SELECT)"
+    ),
+    valueai_eval: bool = typer.Option(False, "--valueai-eval", help="Evaluate with ValueAI"),
+    eval_summary: str | None = typer.Option(None, "--eval-summary", help="Evaluation summary file"),
+    output_format: str | None = typer.Option(
+        None, "--format", help="Results as json or parquet (default: RESULTS_FORMAT)"
+    ),
+    seed: int | None = typer.Option(
+        None, "--seed", help="Chunk sampling seed (default: QA_SEED, else random and recorded)"
+    ),
+    queue_path: Path | None = typer.Option(
+        None, "--queue", help="Job queue file (default: WORKQUEUE_PATH)"
+    ),
+    local_workers: int = typer.Option(
+        0, "--local-workers", help="Also process jobs on this many threads here"
+    ),
+    timeout: float | None = typer.Option(
+        None, "--timeout", help="Give up after this many seconds (the batch stays queued)"
+    ),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+) -> None:
+    """Publish a PDF's jobs to the shared queue and merge the workers' results.
+
+    Example:
+        rag-med coordinate document.pdf -n 20 --valueai-eval --queue /shared/workqueue.sqlite3
+    """
+    from configs.settings import settings as _settings
+
+    from .qa_generator.output import with_format
+    from .workqueue.coordinator import coordinate_pdf, get_job_queue
+
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    try:
+        fmt = output_format or getattr(_settings, "results_format", "json")
+        output_path = with_format(Path(output_file), fmt)
+        queue = get_job_queue(queue_path)
+        try:
+            results = coordinate_pdf(
+                pdf_path,
+                output_path,
+                num_questions=num_questions,
+                evaluate=valueai_eval,
+                summary_file=Path(eval_summary) if eval_summary else None,
+                seed=seed,
+                queue=queue,
+                local_workers=local_workers,
+                timeout=timeout,
+            )
+        finally:
+            queue.close()
+        _build_results_table(results, valueai_eval)
+        console.print(f"\n[green] Results saved to: {output_path}[/green]")
+    except (FileNotFoundError, ValueError, TimeoutError) as e:
+        console.print(f"[red] Error: {e}[/red]")
+        raise typer.Exit(1) from e
+
+
+@app.command()
+def serve(
+    host: str | None = typer.Option(None, "--host", help="Listen address (default: SERVE_HOST)"),
+    port: int | None = typer.Option(None, "--port", "-p", help="Port (default: SERVE_PORT)"),
+    no_warmup: bool = typer.Option(
+        False, "--no-warmup", help="Authenticate and build scorers on first use instead"
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the metric cache"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+) -> None:
+    """Run a warm local HTTP service for QA generation, RAG answers and scoring.
+
+    Example:
+        rag-med serve --port 8765
+        curl -s localhost:8765/ask -d '{"question": "..."}'
+    """
+    from .evaluation.cache import configure_metric_cache
+    from .server import QAServer
+
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    configure_metric_cache(enabled=not no_cache)
+    try:
+        server = QAServer(host, port)
+    except OSError as e:
+        console.print(f"[red] Error: {e}[/red]")
+        raise typer.Exit(1) from e
+    if not no_warmup:
+        server.service.warm_up()
+    console.print(f"[green] Serving on {server.base_url} (Ctrl+C to stop)[/green]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[yellow] Stopping[/yellow]")
+    finally:
+        server.stop()
+
+
+runs_app = typer.Typer(help="Query the run history (RESULTS_DB_PATH)", no_args_is_help=True)
+app.add_typer(runs_app, name="runs")
+
+
+def _results_store() -> "ResultsStore":
+    from .results_store import get_results_store
+
+    store = get_results_store()
+    if store is None:
+        console.print("[red] Results store is disabled (RESULTS_DB_PATH is empty)[/red]")
+        raise typer.Exit(1)
+    return store
+
+
+def _fmt_metric(value: float | None) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+@runs_app.command("list")
+def runs_list(
+    rag_id: int | None = typer.Option(None, "--rag-id", help="Only runs against this RAG"),
+    source: str | None = typer.Option(None, "--source", help="PDF / output path contains"),
+    kind: str | None = typer.Option(
+        None, "--kind", help="generate, run, evaluate, distributed or backfill"
+    ),
+    metric: str = typer.Option(
+        "ragas_faithfulness", "--metric", "-m", help="Metric averaged per run"
+    ),
+    limit: int = typer.Option(20, "--limit", "-n", help="Newest N runs"),
+) -> None:
+    """List runs, newest first, with the mean of one metric.
+
+    Example:
+        rag-med runs list --rag-id 387 --metric ragas_faithfulness -n 20
+    """
+    from datetime import datetime
+
+    rows = _results_store().list_runs(
+        rag_id=rag_id, source=source, kind=kind, metric=metric, limit=limit
+    )
+    table = Table(title=f" Runs ({metric})", show_header=True)
+    table.add_column("ID", style="cyan", justify="right")
+    table.add_column("Created", style="white")
+    table.add_column("Kind", style="white")
+    table.add_column("Source", style="green")
+    table.add_column("RAG", style="magenta")
+    table.add_column("Items", justify="right")
+    table.add_column("Evaluated", justify="right")
+    table.add_column(metric, style="yellow", justify="right")
+    for r in rows:
+        table.add_row(
+            str(r["run_id"]),
+            datetime.fromtimestamp(r["created_at"]).strftime("%Y-%m-%d %H:%M"),
+            f"{r['kind']} (reused)" if r["reused"] else r["kind"],
+            r["source"] or "-",
+            "-" if r["rag_id"] is None else str(r["rag_id"]),
+            str(r["item_count"]),
+            str(r["evaluated_count"]),
+            _fmt_metric(r["metric_mean"]),
+        )
+    console.print(table)
+
+
+@runs_app.command("show")
+def runs_show(run_id: int = typer.Argument(..., help="Run ID from `rag-med runs list`")) -> None:
+    """Show a run and the mean, min and max of every metric."""
+    store = _results_store()
+    run = store.get_run(run_id)
+    if run is None:
+        console.print(f"[red] Run {run_id} not found[/red]")
+        raise typer.Exit(1)
+    for key in ("kind", "source", "rag_id", "rag_model", "qa_model", "seed", "results_file"):
+        console.print(f"{key}: {run[key] if run[key] is not None else '-'}")
+    console.print(f"reused: {'yes' if run['reused'] else 'no'}")
+    table = Table(title=f" Run {run_id}", show_header=True)
+    table.add_column("Metric", style="cyan")
+    table.add_column("Count", justify="right")
+    table.add_column("Mean", style="yellow", justify="right")
+    table.add_column("Min", justify="right")
+    table.add_column("Max", justify="right")
+    for name, st in store.metric_means(run_id).items():
+        table.add_row(
+            name,
+            str(st["count"]),
+            _fmt_metric(st["mean"]),
+            _fmt_metric(st["min"]),
+            _fmt_metric(st["max"]),
+        )
+    console.print(table)
+
+
+@runs_app.command("diff")
+def runs_diff(
+    run_a: int = typer.Argument(..., help="Baseline run ID"),
+    run_b: int = typer.Argument(..., help="Compared run ID"),
+) -> None:
+    """Compare metric means of two runs (and the change over questions both runs share)."""
+    store = _results_store()
+    for run_id in (run_a, run_b):
+        if store.get_run(run_id) is None:
+            console.print(f"[red] Run {run_id} not found[/red]")
+            raise typer.Exit(1)
+    table = Table(title=f" Run {run_a} → {run_b}", show_header=True)
+    table.add_column("Metric", style="cyan")
+    table.add_column(f"#{run_a}", justify="right")
+    table.add_column(f"#{run_b}", justify="right")
+    table.add_column("Δ", style="yellow", justify="right")
+    table.add_column("Same questions", justify="right")
+    table.add_column("Δ same questions", style="yellow", justify="right")
+    for row in store.diff(run_a, run_b):
+        table.add_row(
+            row["metric"],
+            _fmt_metric(row["a"]),
+            _fmt_metric(row["b"]),
+            _fmt_metric(row["delta"]),
+            str(row["paired"]),
+            _fmt_metric(row["paired_delta"]),
+        )
+    console.print(table)
+
+
+@runs_app.command("ingest")
+def runs_ingest(
+    inputs: list[Path] = typer.Argument(..., help="QA result files (JSON/Parquet) or directories"),
+) -> None:
+    """Backfill saved result files into the run history.
+
+    Example:
+        rag-med runs ingest reports/
+    """
+    from .evaluation.rescore import discover_result_files
+
+    store = _results_store()
+    try:
+        files = discover_result_files(inputs)
+    except FileNotFoundError as e:
+        console.print(f"[red] Error: {e}[/red]")
+        raise typer.Exit(1) from e
+    added = skipped = 0
+    for path in files:
+        try:
+            run_id = store.ingest_file(path)
+        except (OSError, ValueError, TypeError):
+            # Summaries, manifests and other JSON that is not a result list
+            run_id = None
+        if run_id is None:
+            skipped += 1
+        else:
+            added += 1
+    console.print(
+        f"[green] Ingested {added} runs ({skipped} files skipped) into: {store.path}[/green]"
+    )
+
+
 if __name__ == "__main__":
     app()
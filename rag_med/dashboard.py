@@ -0,0 +1,247 @@
+"""Live progress of long runs: per-stage counters and a rich view (log lines off a TTY)."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from rich.console import Console, RenderableType
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RATE_WINDOW_SECONDS = 30.0
+
+
+@dataclass
+class _StageCounters:
+    total: int | None = None
+    started: int = 0
+    done: int = 0
+    errors: int = 0
+    finished_at: deque = field(default_factory=deque)
+
+
+class ProgressTracker:
+    """Thread-safe per-stage counters: totals, in-flight, completions and errors.
+
+    Rates are completions per second over the last RATE_WINDOW_SECONDS. Queue depths
+    are read from callables registered with ``watch_queue``.
+    """
+
+    def __init__(self, window: float = RATE_WINDOW_SECONDS):
+        self._window = window
+        self._lock = threading.Lock()
+        self._stages: dict[str, _StageCounters] = {}
+        self._queues: dict[str, Callable[[], int]] = {}
+        self.started_at = time.monotonic()
+
+    def _stage(self, name: str) -> _StageCounters:
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _StageCounters()
+        return stage
+
+    def add_total(self, stage: str, n: int) -> None:
+        with self._lock:
+            counters = self._stage(stage)
+            counters.total = (counters.total or 0) + n
+
+    def started(self, stage: str) -> None:
+        with self._lock:
+            self._stage(stage).started += 1
+
+    def finished(self, stage: str, *, ok: bool = True) -> None:
+        now = time.monotonic()
+        with self._lock:
+            counters = self._stage(stage)
+            counters.done += 1
+            if not ok:
+                counters.errors += 1
+            counters.finished_at.append(now)
+            while counters.finished_at and counters.finished_at[0] < now - self._window:
+                counters.finished_at.popleft()
+
+    @contextmanager
+    def track(self, stage: str) -> Iterator[None]:
+        """Count the block as one item of ``stage`` (an exception counts as an error)."""
+        self.started(stage)
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.finished(stage, ok=ok)
+
+    def wrap(self, stage: str, fn: Callable[..., T]) -> Callable[..., T]:
+        """``fn`` with every call counted as one item of ``stage``."""
+
+        def tracked(*args: object, **kwargs: object) -> T:
+            with self.track(stage):
+                return fn(*args, **kwargs)
+
+        return tracked
+
+    def watch_queue(self, stage: str, depth: Callable[[], int]) -> None:
+        with self._lock:
+            self._stage(stage)
+            self._queues[stage] = depth
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        elapsed = now - self.started_at
+        out: dict[str, dict] = {}
+        with self._lock:
+            for name, c in self._stages.items():
+                recent = sum(1 for t in c.finished_at if t >= now - self._window)
+                span = min(self._window, elapsed)
+                rate = recent / span if span > 0 else 0.0
+                remaining = c.total - c.done if c.total is not None else None
+                queue = self._queues.get(name)
+                out[name] = {
+                    "total": c.total,
+                    "done": c.done,
+                    "in_flight": c.started - c.done,
+                    "queued": queue() if queue is not None else None,
+                    "errors": c.errors,
+                    "error_rate": c.errors / c.done if c.done else 0.0,
+                    "items_per_second": round(rate, 3),
+                    "eta_seconds": (
+                        round(remaining / rate, 1) if remaining and rate > 0 else None
+                    ),
+                }
+        return {"elapsed_seconds": round(elapsed, 1), "stages": out}
+
+
+def _external_stats() -> dict:
+    """ValueAI in-flight predicts per endpoint and the metric cache hit rate."""
+    from rag_med.evaluation.cache import metric_cache_stats
+    from rag_med.valueai.telemetry import get_recorder
+
+    return {
+        "valueai_in_flight": get_recorder().in_flight(),
+        "metric_cache_hit_rate": metric_cache_stats().get("hit_rate"),
+    }
+
+
+def _fmt_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def render_progress(snapshot: dict, external: dict) -> RenderableType:
+    from rich.console import Group
+    from rich.table import Table
+
+    elapsed = _fmt_seconds(snapshot["elapsed_seconds"])
+    table = Table(title=f" Progress ({elapsed})", show_header=True)
+    table.add_column("Stage", style="cyan")
+    table.add_column("Done", style="green", justify="right")
+    table.add_column("In flight", justify="right")
+    table.add_column("Queued", justify="right")
+    table.add_column("Items/s", style="yellow", justify="right")
+    table.add_column("Errors", style="red", justify="right")
+    table.add_column("ETA", justify="right")
+    for name, st in snapshot["stages"].items():
+        total = f"/{st['total']}" if st["total"] is not None else ""
+        table.add_row(
+            name,
+            f"{st['done']}{total}",
+            str(st["in_flight"]),
+            "-" if st["queued"] is None else str(st["queued"]),
+            f"{st['items_per_second']:.2f}",
+            f"{st['errors']} ({st['error_rate']:.0%})",
+            _fmt_seconds(st["eta_seconds"]),
+        )
+    in_flight = ", ".join(f"{ep}: {n}" for ep, n in external["valueai_in_flight"].items()) or "-"
+    hit_rate = external["metric_cache_hit_rate"]
+    footer = (
+        f"ValueAI in flight: {in_flight}   "
+        f"Metric cache hit rate: {'-' if hit_rate is None else f'{hit_rate:.0%}'}"
+    )
+    return Group(table, footer)
+
+
+class LiveDashboard:
+    """Show ``tracker`` live on a terminal; otherwise log it every ``log_interval`` seconds.
+
+    On a terminal, log records are routed through the console (above the live view)
+    while the dashboard is open.
+    """
+
+    def __init__(
+        self,
+        tracker: ProgressTracker,
+        console: Console,
+        *,
+        refresh_per_second: float = 2.0,
+        log_interval: float = 30.0,
+    ):
+        self._tracker = tracker
+        self._console = console
+        self._refresh = refresh_per_second
+        self._log_interval = log_interval
+        self._live = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._saved_handlers: list[logging.Handler] = []
+
+    def _render(self) -> RenderableType:
+        return render_progress(self._tracker.snapshot(), _external_stats())
+
+    def _log_loop(self) -> None:
+        while not self._stop.wait(self._log_interval):
+            self.log_snapshot()
+
+    def log_snapshot(self) -> None:
+        payload = {**self._tracker.snapshot(), **_external_stats()}
+        logger.info("progress %s", json.dumps(payload, ensure_ascii=False))
+
+    def __enter__(self) -> LiveDashboard:
+        if self._console.is_terminal:
+            from rich.live import Live
+            from rich.logging import RichHandler
+
+            root = logging.getLogger()
+            self._saved_handlers = list(root.handlers)
+            for handler in self._saved_handlers:
+                root.removeHandler(handler)
+            root.addHandler(RichHandler(console=self._console, show_path=False))
+            self._live = Live(
+                console=self._console,
+                refresh_per_second=self._refresh,
+                get_renderable=self._render,
+                transient=False,
+            )
+            self._live.start()
+        else:
+            self._thread = threading.Thread(target=self._log_loop, name="dashboard-log", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._live is not None:
+            self._live.stop()
+            root = logging.getLogger()
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            for handler in self._saved_handlers:
+                root.addHandler(handler)
+            self._live = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.log_snapshot()
@@ -1,13 +1,37 @@
 """Evaluation utilities (RAGAS metrics; compare reference vs candidate)."""
 
-from .metrics import (
-    compare_two_answers,
-    evaluate_answer_pair,
-    evaluate_answer_pair_ragas_extended,
-)
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .metrics import (
+        compare_two_answers,
+        compare_two_answers_batch,
+        cosine_similarity_batch,
+        evaluate_answer_pair,
+        evaluate_answer_pair_ragas_extended,
+        evaluate_answer_pairs_ragas_batch,
+        lexical_similarity,
+    )
 
 __all__ = [
     "compare_two_answers",
+    "compare_two_answers_batch",
+    "cosine_similarity_batch",
     "evaluate_answer_pair",
     "evaluate_answer_pair_ragas_extended",
+    "evaluate_answer_pairs_ragas_batch",
+    "lexical_similarity",
 ]
+
+
+def __getattr__(name: str) -> object:
+    # Submodules such as ``evaluation.cache`` import without loading the metrics module
+    if name in __all__:
+        value = getattr(import_module(".metrics", __name__), name)
+        globals()[name] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,76 @@
+"""Long-lived background event loop for async metric scoring from synchronous code."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Coroutine, Sequence
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """An event loop running forever in a daemon thread.
+
+    ``run(coro)`` may be called from any thread except the loop's own; all
+    coroutines share the loop, so loop-bound resources (the ValueAI HTTP pool,
+    the ragas LLM client) are created once instead of once per ``asyncio.run``.
+    """
+
+    def __init__(self, name: str = "rag-med-eval-loop"):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, name=name, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run ``coro`` on the background loop and block until it finishes."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() called from the loop thread")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+
+async def gather_bounded(
+    factories: Sequence[Callable[[], Awaitable[T]]], max_concurrency: int
+) -> list[T | BaseException]:
+    """Await every factory with at most ``max_concurrency`` in flight; errors are returned."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def guarded(factory: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await factory()
+
+    return await asyncio.gather(*(guarded(f) for f in factories), return_exceptions=True)
+
+
+_default_loop: BackgroundLoop | None = None
+_default_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Process-wide background loop (started on first use)."""
+    global _default_loop
+    with _default_lock:
+        if _default_loop is None:
+            _default_loop = BackgroundLoop()
+            logger.debug("Started background evaluation event loop")
+        return _default_loop
@@ -0,0 +1,98 @@
+"""Micro-batching of concurrent per-item calls into one batch call."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_STOP = object()
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collect concurrent ``submit(item)`` calls into ``fn(batch)`` calls.
+
+    A batch is flushed when it holds ``max_batch`` items or ``max_wait`` seconds after
+    its first item arrived. ``fn`` must return one result per item, in order; an
+    exception from ``fn`` is raised in every caller of that batch.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[list[T]], Sequence[R]],
+        max_batch: int,
+        max_wait: float = 0.5,
+        max_concurrent_batches: int = 4,
+        name: str = "micro-batcher",
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self._fn = fn
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix=name)
+        self._thread = threading.Thread(target=self._collect, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: T) -> R:
+        """Queue ``item`` and block until its batch has been processed."""
+        fut: Future = Future()
+        self._queue.put((item, fut))
+        return fut.result()
+
+    def _collect(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._pool.submit(self._run, batch)
+
+    def _run(self, batch: list[tuple[T, Future]]) -> None:
+        try:
+            results = list(self._fn([item for item, _ in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(f"batch function returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            logger.debug("Batch of %s failed", len(batch), exc_info=True)
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        for (_, fut), result in zip(batch, results):
+            fut.set_result(result)
+
+    def close(self) -> None:
+        """Flush queued items and stop the collector."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> MicroBatcher[T, R]:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,175 @@
+"""Persistent cache of metric results keyed by metric inputs (rescore only changed pairs)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_results (
+    key TEXT PRIMARY KEY,
+    metric TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS metric_results_accessed ON metric_results (accessed_at)"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def metric_cache_key(metric: str, version: str, model: str, inputs: dict[str, object]) -> str:
+    """Hash of metric name, metric version (prompt hash), judge model and every input."""
+    hashed = {
+        name: _sha256(json.dumps(value, sort_keys=True, ensure_ascii=False))
+        for name, value in inputs.items()
+    }
+    canonical = json.dumps(
+        {"metric": metric, "version": version, "model": model, "inputs": hashed},
+        sort_keys=True,
+    )
+    return _sha256(canonical)
+
+
+class MetricCache:
+    """SQLite store of metric outputs with least-recently-used eviction.
+
+    ``refresh`` skips lookups but still stores fresh results (rescore everything
+    and overwrite the cache). Hit/miss counters are kept for the run summary.
+    """
+
+    def __init__(self, path: Path, max_entries: int | None = None, refresh: bool = False):
+        self._path = Path(path)
+        self._max_entries = max_entries
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+            self._conn.execute(_INDEX)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def get(self, key: str) -> dict | None:
+        if self.refresh:
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM metric_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._conn.execute(
+                "UPDATE metric_results SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, metric: str, value: dict) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metric_results (key, metric, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, metric, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._writes += 1
+            if self._max_entries is not None:
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM metric_results").fetchone()
+                excess = count - self._max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM metric_results WHERE key IN ("
+                        "SELECT key FROM metric_results ORDER BY accessed_at ASC LIMIT ?)",
+                        (excess,),
+                    )
+                    self._evictions += excess
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM metric_results").fetchone()
+        return int(count)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": True,
+                "refresh": self.refresh,
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else None,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits = self._misses = self._writes = self._evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_caches: dict[str, MetricCache] = {}
+_default_lock = threading.Lock()
+_enabled = True
+_refresh = False
+
+
+def configure_metric_cache(*, enabled: bool = True, refresh: bool = False) -> None:
+    """Process-wide switches behind ``--no-cache`` / ``--refresh``."""
+    global _enabled, _refresh
+    with _default_lock:
+        _enabled = enabled
+        _refresh = refresh
+        for cache in _default_caches.values():
+            cache.refresh = refresh
+
+
+def get_default_cache() -> MetricCache | None:
+    """Cache configured by METRIC_CACHE_PATH (None when disabled)."""
+    from configs.settings import settings
+
+    path = getattr(settings, "metric_cache_path", None)
+    if not path or not _enabled:
+        return None
+    with _default_lock:
+        cache = _default_caches.get(path)
+        if cache is None:
+            cache = MetricCache(
+                Path(path),
+                max_entries=getattr(settings, "metric_cache_max_entries", None),
+                refresh=_refresh,
+            )
+            _default_caches[path] = cache
+            logger.debug("Metric cache: %s", path)
+        return cache
+
+
+def metric_cache_stats() -> dict:
+    """Stats of the default cache for run summaries."""
+    cache = get_default_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
@@ -0,0 +1,82 @@
+"""Concurrent evaluation executor: one prepare step per item, then independent metrics."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class ItemOutcome(Generic[T]):
+    """Result of evaluating one item.
+
+    ``error`` is set when ``prepare`` or any metric raised; ``metrics`` then
+    holds only the metrics that finished.
+    """
+
+    item: T
+    prepared: Any = None
+    metrics: dict[str, Any] = field(default_factory=dict)
+    error: BaseException | None = None
+
+
+class EvaluationExecutor:
+    """Run a small DAG per item: ``prepare(item)`` first, then every metric concurrently.
+
+    Items run concurrently too, at most ``max_concurrent_items`` at a time, so
+    the number of in-flight metric calls is bounded by
+    ``max_concurrent_items * len(metrics)``. Outcomes keep the input order.
+    """
+
+    def __init__(self, max_concurrent_items: int = 4):
+        if max_concurrent_items < 1:
+            raise ValueError("max_concurrent_items must be >= 1")
+        self._max_items = max_concurrent_items
+
+    def run(
+        self,
+        items: Sequence[T],
+        prepare: Callable[[T], Any],
+        metrics: Mapping[str, Callable[[T, Any], Any]],
+        skip: Callable[[T], bool] | None = None,
+    ) -> list[ItemOutcome[T] | None]:
+        """Evaluate items; skipped items (``skip(item)`` is true) yield None."""
+        if not items:
+            return []
+        n_items = min(self._max_items, len(items))
+        with ThreadPoolExecutor(
+            max_workers=n_items, thread_name_prefix="eval-item"
+        ) as item_pool, ThreadPoolExecutor(
+            max_workers=max(1, n_items * len(metrics)), thread_name_prefix="eval-metric"
+        ) as metric_pool:
+
+            def evaluate(item: T) -> ItemOutcome[T] | None:
+                if skip is not None and skip(item):
+                    return None
+                outcome: ItemOutcome[T] = ItemOutcome(item)
+                try:
+                    outcome.prepared = prepare(item)
+                except Exception as e:
+                    outcome.error = e
+                    return outcome
+                futures: dict[str, Future] = {
+                    name: metric_pool.submit(fn, item, outcome.prepared)
+                    for name, fn in metrics.items()
+                }
+                for name, fut in futures.items():
+                    try:
+                        outcome.metrics[name] = fut.result()
+                    except Exception as e:
+                        logger.debug("Metric %s failed", name, exc_info=True)
+                        if outcome.error is None:
+                            outcome.error = e
+                return outcome
+
+            return list(item_pool.map(evaluate, items))
@@ -0,0 +1,159 @@
+"""Corpus statistics (IDF / BM25) for local lexical similarity without network calls."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import math
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+from rag_med.evaluation.metrics import _tokenize
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+class LexicalIndex:
+    """Document frequencies of a chunk corpus with precomputed IDF weights.
+
+    Build once per corpus (``build``), persist as gzipped JSON (``save``/``load``)
+    and score pairs with ``tfidf_cosine`` / ``bm25_similarity``. Tokens never seen
+    in the corpus get the maximum IDF (they are as rare as it gets).
+    """
+
+    def __init__(
+        self,
+        n_docs: int,
+        avg_doc_len: float,
+        doc_freq: dict[str, int],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.n_docs = n_docs
+        self.avg_doc_len = avg_doc_len or 1.0
+        self.doc_freq = doc_freq
+        self.k1 = k1
+        self.b = b
+        self._idf = {t: self._bm25_idf(df) for t, df in doc_freq.items()}
+        self._idf_unseen = self._bm25_idf(0)
+
+    def _bm25_idf(self, df: int) -> float:
+        return math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+    @classmethod
+    def build(cls, documents: Iterable[str]) -> LexicalIndex:
+        doc_freq: Counter = Counter()
+        n_docs = 0
+        total_len = 0
+        for doc in documents:
+            tokens = _tokenize(doc)
+            n_docs += 1
+            total_len += len(tokens)
+            doc_freq.update(set(tokens))
+        return cls(n_docs, total_len / n_docs if n_docs else 0.0, dict(doc_freq))
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "version": INDEX_FORMAT_VERSION,
+            "n_docs": self.n_docs,
+            "avg_doc_len": self.avg_doc_len,
+            "k1": self.k1,
+            "b": self.b,
+            "doc_freq": self.doc_freq,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: Path) -> LexicalIndex:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != INDEX_FORMAT_VERSION:
+            msg = f"Unsupported lexical index version in {path}: {payload.get('version')}"
+            raise ValueError(msg)
+        return cls(
+            payload["n_docs"],
+            payload["avg_doc_len"],
+            payload["doc_freq"],
+            k1=payload.get("k1", 1.5),
+            b=payload.get("b", 0.75),
+        )
+
+    def idf(self, token: str) -> float:
+        return self._idf.get(token, self._idf_unseen)
+
+    def tfidf_cosine(self, reference: str, candidate: str) -> float:
+        """Cosine of TF-IDF vectors in [0, 1] (1.0 when both texts are empty)."""
+        ref = Counter(_tokenize(reference))
+        cand = Counter(_tokenize(candidate))
+        if not ref and not cand:
+            return 1.0
+        if not ref or not cand:
+            return 0.0
+        idf = self.idf
+        ref_w = {t: c * idf(t) for t, c in ref.items()}
+        cand_w = {t: c * idf(t) for t, c in cand.items()}
+        dot = sum(w * cand_w[t] for t, w in ref_w.items() if t in cand_w)
+        norm = math.sqrt(sum(w * w for w in ref_w.values())) * math.sqrt(
+            sum(w * w for w in cand_w.values())
+        )
+        return max(0.0, min(1.0, dot / norm)) if norm else 0.0
+
+    def _bm25(self, query: Counter, doc: Counter, doc_len: int) -> float:
+        norm = self.k1 * (1.0 - self.b + self.b * doc_len / self.avg_doc_len)
+        score = 0.0
+        for term in query:
+            tf = doc.get(term)
+            if tf:
+                score += self.idf(term) * tf * (self.k1 + 1.0) / (tf + norm)
+        return score
+
+    def bm25_score(self, query: str, document: str) -> float:
+        """Raw Okapi BM25 score of ``document`` for ``query``."""
+        doc_tokens = _tokenize(document)
+        return self._bm25(Counter(_tokenize(query)), Counter(doc_tokens), len(doc_tokens))
+
+    def bm25_similarity(self, reference: str, candidate: str) -> float:
+        """BM25 of the candidate for the reference, normalized by the reference self-score."""
+        ref_tokens = _tokenize(reference)
+        cand_tokens = _tokenize(candidate)
+        if not ref_tokens and not cand_tokens:
+            return 1.0
+        if not ref_tokens or not cand_tokens:
+            return 0.0
+        ref = Counter(ref_tokens)
+        best = self._bm25(ref, ref, len(ref_tokens))
+        if best <= 0:
+            return 0.0
+        return max(0.0, min(1.0, self._bm25(ref, Counter(cand_tokens), len(cand_tokens)) / best))
+
+
+def corpus_fingerprint(documents: Sequence[str]) -> str:
+    """Stable hash of a chunk corpus (used as the persisted index file name)."""
+    h = hashlib.sha256()
+    for doc in documents:
+        h.update(doc.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def load_or_build_index(documents: Sequence[str], index_dir: Path | None) -> LexicalIndex:
+    """Load the persisted index of this corpus from ``index_dir`` or build and save it."""
+    if index_dir is None:
+        return LexicalIndex.build(documents)
+    path = index_dir / f"{corpus_fingerprint(documents)[:32]}.json.gz"
+    if path.exists():
+        try:
+            return LexicalIndex.load(path)
+        except (OSError, ValueError, KeyError, json.JSONDecodeError):
+            logger.warning("Lexical index %s is unreadable, rebuilding", path)
+    index = LexicalIndex.build(documents)
+    index.save(path)
+    logger.info("Lexical index (%s docs, %s terms) saved to: %s", index.n_docs, len(index.doc_freq), path)
+    return index
@@ -2,48 +2,34 @@
 
 from __future__ import annotations
 
-import inspect
+import hashlib
 import json
 import logging
 import re
+import threading
 from collections import Counter
-from pathlib import Path
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from itertools import chain
+from typing import TYPE_CHECKING
 
-from configs.paths import PROJECT_DPATH
 from configs.settings import settings
+from rag_med.tracing import event as trace_event
+from rag_med.tracing import span as trace_span
 
-_DEBUG_LOG_PATH = PROJECT_DPATH / "debug" / "debug-3dbdd8.log"
-_DEBUG_PROOF_PATH = PROJECT_DPATH / "debug" / "debug_ragas_client.txt"
-
-
-def _debug_log(hypothesis_id: str, message: str, data: dict, location: str = ""):
-    import time as _t
-    payload = {"sessionId": "3dbdd8", "hypothesisId": hypothesis_id, "message": message, "data": data, "timestamp": int(_t.time() * 1000), "location": location or "metrics.py"}
-    try:
-        _DEBUG_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(_DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
-    except Exception:
-        pass
-    try:
-        with open(_DEBUG_PROOF_PATH, "w", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=False, indent=2))
-    except Exception:
-        pass
+if TYPE_CHECKING:
+    from rag_med.evaluation.lexical_index import LexicalIndex
 
 logger = logging.getLogger(__name__)
 
 #  cosine_similarity (reference vs candidate) 
 
-_WS_RE = re.compile(r"\s+")
-_PUNCT_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
 
 
 def _tokenize(text: str) -> list[str]:
-    text = text.lower().strip()
-    text = _PUNCT_RE.sub(" ", text)
-    text = _WS_RE.sub(" ", text)
-    return [t for t in text.split() if t]
+    # Same tokens as replacing punctuation by spaces and splitting: maximal \w runs.
+    return _WORD_RE.findall(text.lower())
 
 
 def _cosine_similarity(reference: str, candidate: str) -> float:
@@ -68,15 +54,249 @@ def _cosine_similarity(reference: str, candidate: str) -> float:
     return max(0.0, min(1.0, float(cos)))
 
 
+def cosine_similarity_batch(pairs: Sequence[tuple[str, str]]) -> list[float]:
+    """Bag-of-words cosine similarity for many (reference, candidate) pairs at once.
+
+    Every distinct text is tokenized once; counts go into two sparse matrices over a
+    shared vocabulary and all scores come from one vectorized pass. Results equal
+    ``_cosine_similarity`` pair by pair.
+    """
+    if not pairs:
+        return []
+    import numpy as np
+    from scipy import sparse
+
+    vocab: dict[str, int] = {}
+    token_ids: dict[str, list[int]] = {}
+
+    def ids(text: str) -> list[int]:
+        found = token_ids.get(text)
+        if found is None:
+            setdefault = vocab.setdefault
+            found = token_ids[text] = [setdefault(t, len(vocab)) for t in _tokenize(text)]
+        return found
+
+    def matrix(texts: list[str]):
+        per_row = [ids(text) for text in texts]
+        lengths = np.fromiter((len(r) for r in per_row), dtype=np.int64, count=len(per_row))
+        cols = np.fromiter(chain.from_iterable(per_row), dtype=np.int64, count=int(lengths.sum()))
+        rows_idx = np.repeat(np.arange(len(per_row)), lengths)
+        # Duplicate (row, token) entries are summed into counts on conversion.
+        return rows_idx, cols
+
+    ref_rows, ref_cols = matrix([r for r, _ in pairs])
+    cand_rows, cand_cols = matrix([c for _, c in pairs])
+    shape = (len(pairs), max(1, len(vocab)))
+    ref = sparse.coo_matrix(
+        (np.ones(len(ref_cols), dtype=np.int64), (ref_rows, ref_cols)), shape=shape
+    ).tocsr()
+    cand = sparse.coo_matrix(
+        (np.ones(len(cand_cols), dtype=np.int64), (cand_rows, cand_cols)), shape=shape
+    ).tocsr()
+
+    dot = np.asarray(ref.multiply(cand).sum(axis=1)).ravel()
+    sq_ref = np.asarray(ref.multiply(ref).sum(axis=1)).ravel()
+    sq_cand = np.asarray(cand.multiply(cand).sum(axis=1)).ravel()
+    norm_ref = np.power(sq_ref.astype(np.float64), 0.5)
+    norm_cand = np.power(sq_cand.astype(np.float64), 0.5)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos = np.clip(dot / (norm_ref * norm_cand), 0.0, 1.0)
+    ref_empty = np.diff(ref.indptr) == 0
+    cand_empty = np.diff(cand.indptr) == 0
+    cos = np.where(ref_empty | cand_empty, 0.0, cos)
+    cos = np.where(ref_empty & cand_empty, 1.0, cos)
+    return [float(v) for v in cos]
+
+
+#  Cheap local tier: token F1, ROUGE-L, char n-grams (and the gate in front of LLM judges) 
+
+
+def _overlap_f1(ref: Counter, cand: Counter) -> float:
+    if not ref and not cand:
+        return 1.0
+    common = sum((ref & cand).values())
+    if common == 0:
+        return 0.0
+    precision = common / sum(cand.values())
+    recall = common / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def token_f1(reference: str, candidate: str) -> float:
+    """SQuAD-style token F1 (multiset overlap of word tokens). Score in [0, 1]."""
+    return _overlap_f1(Counter(_tokenize(reference)), Counter(_tokenize(candidate)))
+
+
+def rouge_l(reference: str, candidate: str) -> float:
+    """ROUGE-L F1: longest common token subsequence. Score in [0, 1]."""
+    ref = _tokenize(reference)
+    cand = _tokenize(candidate)
+    if not ref and not cand:
+        return 1.0
+    if not ref or not cand:
+        return 0.0
+    prev = [0] * (len(cand) + 1)
+    for r in ref:
+        cur = [0]
+        for j, c in enumerate(cand):
+            cur.append(prev[j] + 1 if r == c else max(prev[j + 1], cur[j]))
+        prev = cur
+    lcs = prev[-1]
+    if lcs == 0:
+        return 0.0
+    precision = lcs / len(cand)
+    recall = lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _char_ngrams(text: str, n: int) -> Counter:
+    normalized = " ".join(_tokenize(text))
+    if len(normalized) < n:
+        return Counter([normalized]) if normalized else Counter()
+    return Counter(normalized[i : i + n] for i in range(len(normalized) - n + 1))
+
+
+def char_ngram_f1(reference: str, candidate: str, n: int = 3) -> float:
+    """F1 overlap of character n-grams (robust to Russian inflection). Score in [0, 1]."""
+    return _overlap_f1(_char_ngrams(reference, n), _char_ngrams(candidate, n))
+
+
+def cheap_lexical_metrics(reference: str, candidate: str) -> dict:
+    """Local lexical scores: token_f1, rouge_l, char_ngram_f1 (no LLM)."""
+    return {
+        "token_f1": token_f1(reference, candidate),
+        "rouge_l": rouge_l(reference, candidate),
+        "char_ngram_f1": char_ngram_f1(reference, candidate),
+    }
+
+
+_REFUSAL_RE = re.compile(
+    r"не\s+могу\s+(ответить|помочь|дать)|нет\s+(информации|данных|ответа)"
+    r"|информаци[яи]\s+(отсутствует|не\s+найден)|не\s+найден[оа]?\s+(информаци|в\s+документ)"
+    r"|не\s+знаю|i\s+(don'?t|do\s+not)\s+know|no\s+information|cannot\s+answer",
+    re.IGNORECASE,
+)
+# Refusals are short; a long answer mentioning "нет данных" is still an answer.
+_REFUSAL_MAX_WORDS = 40
+
+# A near-identical answer must keep every number and negation/polarity word: "500 мг" vs
+# "5000 мг" or "можно" vs "нельзя" differ by one token but reverse the meaning.
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_POLARITY_WORDS = frozenset(
+    {
+        "не", "нет", "ни", "нельзя", "можно", "без", "запрещено", "разрешено",
+        "противопоказан", "противопоказано", "противопоказаны", "показан", "показано",
+        "показаны", "no", "not", "never", "without",
+    }
+)
+
+
+def _critical_tokens(text: str) -> Counter:
+    """Numbers (decimal comma normalized) and negation/polarity words of a text."""
+    lowered = (text or "").lower()
+    numbers = (n.replace(",", ".") for n in _NUMBER_RE.findall(lowered))
+    polarity = (t for t in _tokenize(lowered) if t in _POLARITY_WORDS)
+    return Counter(numbers) + Counter(polarity)
+
+
+@dataclass(frozen=True)
+class GateDecision:
+    """Scores assigned locally instead of calling the LLM judges."""
+
+    reason: str
+    alignment_score: int
+    factual_correctness: float
+    comment: str
+
+
+_GATE_LOCK = threading.Lock()
+_GATE_COUNTS: Counter = Counter()
+
+
+def gate_llm_metrics(reference: str, candidate: str, cheap: dict | None = None) -> GateDecision | None:
+    """Decide FactualCorrectness / alignment locally when the cheap tier is decisive.
+
+    Empty answers and refusals score lowest; answers whose token F1 and ROUGE-L reach
+    EVAL_GATE_IDENTICAL_THRESHOLD and whose numbers and negation words match the reference
+    exactly score highest; with EVAL_GATE_DISJOINT_THRESHOLD set,
+    answers whose char n-gram F1 is at or below it score lowest. None means "ask the LLM".
+    """
+    if not getattr(settings, "eval_gate_enabled", True):
+        return None
+    text = (candidate or "").strip()
+    if not _tokenize(text):
+        return GateDecision("empty_answer", 1, 0.0, "Ответ RAG пустой (локальная проверка).")
+    if len(text.split()) <= _REFUSAL_MAX_WORDS and _REFUSAL_RE.search(text):
+        return GateDecision("refusal", 1, 0.0, "Ответ RAG — отказ от ответа (локальная проверка).")
+    cheap = cheap or cheap_lexical_metrics(reference, candidate)
+    identical = getattr(settings, "eval_gate_identical_threshold", 0.95)
+    if (
+        identical is not None
+        and cheap["token_f1"] >= identical
+        and cheap["rouge_l"] >= identical
+        and _critical_tokens(reference) == _critical_tokens(candidate)
+    ):
+        return GateDecision(
+            "near_identical", 10, 1.0, "Ответ RAG практически совпадает с эталоном (локальная проверка)."
+        )
+    disjoint = getattr(settings, "eval_gate_disjoint_threshold", None)
+    if disjoint is not None and cheap["char_ngram_f1"] <= disjoint:
+        return GateDecision(
+            "disjoint", 1, 0.0, "Ответ RAG не пересекается с эталоном (локальная проверка)."
+        )
+    return None
+
+
+def _record_gate(metric: str, reason: str) -> None:
+    with _GATE_LOCK:
+        _GATE_COUNTS[(metric, reason)] += 1
+
+
+def gate_stats() -> dict:
+    """LLM metric calls avoided by the local gate, by metric and by reason."""
+    with _GATE_LOCK:
+        items = list(_GATE_COUNTS.items())
+    by_metric: Counter = Counter()
+    by_reason: Counter = Counter()
+    for (metric, reason), n in items:
+        by_metric[metric] += n
+        by_reason[reason] += n
+    return {
+        "llm_calls_avoided": sum(by_metric.values()),
+        "by_metric": dict(by_metric),
+        "by_reason": dict(by_reason),
+    }
+
+
+def reset_gate_stats() -> None:
+    with _GATE_LOCK:
+        _GATE_COUNTS.clear()
+
+
 def compare_two_answers(reference: str, candidate: str) -> dict:
-    """Return cosine_similarity and factual_correctness (etalon vs RAG answer)."""
+    """Return cosine_similarity, the cheap lexical tier and factual_correctness (etalon vs RAG answer).
+
+    FactualCorrectness is decided locally (``factual_gate``) when ``gate_llm_metrics`` is decisive.
+    """
     out: dict = {"cosine_similarity": _cosine_similarity(reference, candidate)}
+    out.update(cheap_lexical_metrics(reference, candidate))
+    decision = gate_llm_metrics(reference, candidate, out)
+    if decision is not None:
+        _record_gate("factual_correctness", decision.reason)
+        out["factual_correctness"] = decision.factual_correctness
+        out["factual_gate"] = decision.reason
+        return out
 
     # FactualCorrectness (LLM)
     try:
-        fc = _get_factual_correctness_scorer()
-        result = fc.score(response=candidate, reference=reference)
-        out["factual_correctness"] = float(result.value)
+        out["factual_correctness"] = _cached_metric_value(
+            "factual_correctness",
+            {"response": candidate, "reference": reference},
+            lambda: _ragas_score(
+                _get_factual_correctness_scorer(), response=candidate, reference=reference
+            ),
+        )
     except Exception as e:
         logger.warning("FactualCorrectness failed: %s", e)
         out["factual_correctness"] = None
@@ -85,6 +305,189 @@ def compare_two_answers(reference: str, candidate: str) -> dict:
     return out
 
 
+def compare_two_answers_batch(
+    pairs: Sequence[tuple[str, str]], max_concurrency: int | None = None
+) -> list[dict]:
+    """Batch ``compare_two_answers`` over (reference, candidate) pairs.
+
+    FactualCorrectness samples are scored concurrently (at most RAGAS_MAX_CONCURRENCY)
+    on one long-lived event loop; each output dict matches ``compare_two_answers``.
+    """
+    outs: list[dict] = [
+        {"cosine_similarity": cos, **cheap_lexical_metrics(ref, cand)}
+        for cos, (ref, cand) in zip(cosine_similarity_batch(pairs), pairs)
+    ]
+    scored: list[int] = []
+    for i, (ref, cand) in enumerate(pairs):
+        decision = gate_llm_metrics(ref, cand, outs[i])
+        if decision is None:
+            scored.append(i)
+        else:
+            _record_gate("factual_correctness", decision.reason)
+            outs[i]["factual_correctness"] = decision.factual_correctness
+            outs[i]["factual_gate"] = decision.reason
+    if not scored:
+        return outs
+    try:
+        fc = _get_factual_correctness_scorer()
+        values = _cached_metric_values_batch(
+            "factual_correctness",
+            [{"response": pairs[i][1], "reference": pairs[i][0]} for i in scored],
+            [
+                lambda p=pairs[i]: _ragas_ascore(fc, response=p[1], reference=p[0])
+                for i in scored
+            ],
+            _ragas_max_concurrency(max_concurrency),
+        )
+    except Exception as e:
+        values = [e] * len(scored)
+    for out, value in zip((outs[i] for i in scored), values):
+        if isinstance(value, BaseException):
+            logger.warning("FactualCorrectness failed: %s", value)
+            out["factual_correctness"] = None
+            out["factual_error"] = str(value)
+        else:
+            out["factual_correctness"] = value
+    return outs
+
+
+def lexical_similarity(reference: str, candidate: str, index: LexicalIndex) -> dict:
+    """Return tfidf_cosine and bm25_similarity weighted by corpus statistics (no LLM)."""
+    return {
+        "tfidf_cosine": index.tfidf_cosine(reference, candidate),
+        "bm25_similarity": index.bm25_similarity(reference, candidate),
+    }
+
+
+#  Metric result cache 
+
+# Bump a version when a metric's scoring changes in a way the inputs do not capture.
+METRIC_VERSIONS: dict[str, str] = {
+    "faithfulness": "1",
+    "factual_correctness": "1",
+    "llm_alignment": "1",
+    "cosine_similarity": "1",
+}
+
+
+def _metrics_model_name() -> str:
+    return getattr(settings, "metrics_llm_model_name", "llm_qwen_2_5_coder_32b_instruct_q8")
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def _ragas_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("ragas")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def metric_version(metric: str) -> str:
+    """Version stamp of a metric: METRIC_VERSIONS plus the ragas version or judge prompt hash.
+
+    ``llm_alignment_batch`` is the alignment judge with the multi-pair prompt
+    (LLM_JUDGE_BATCH_SIZE > 1); its scores are cached apart from single-pair ones.
+    """
+    if metric == "llm_alignment_batch":
+        prompt = _ALIGNMENT_SYSTEM_PROMPT + _ALIGNMENT_BATCH_PROMPT + _ALIGNMENT_BATCH_ITEM
+        return f"{METRIC_VERSIONS['llm_alignment']}:batch-{_prompt_hash(prompt)}"
+    base = METRIC_VERSIONS[metric]
+    if metric == "llm_alignment":
+        prompt = _ALIGNMENT_SYSTEM_PROMPT + _ALIGNMENT_USER_PROMPT
+        return f"{base}:{_prompt_hash(prompt)}"
+    if metric == "cosine_similarity":
+        return base
+    return f"{base}:ragas-{_ragas_version()}"
+
+
+def _cached_metric_value(
+    metric: str,
+    inputs: dict,
+    compute: Callable[[], object],
+    cacheable: Callable[[object], bool] | None = None,
+    *,
+    version: str | None = None,
+    lookup: bool = True,
+) -> object:
+    """Return ``compute()`` through the persistent metric cache.
+
+    Exceptions are not cached, nor are values rejected by ``cacheable``. ``version``
+    overrides ``metric_version(metric)``; ``lookup=False`` skips the read for a key the
+    caller already missed.
+    """
+    from rag_med.evaluation.cache import get_default_cache, metric_cache_key
+
+    cache = get_default_cache()
+    if cache is None:
+        return compute()
+    version = version or metric_version(metric)
+    key = metric_cache_key(metric, version, _metrics_model_name(), inputs)
+    hit = cache.get(key) if lookup else None
+    if hit is not None:
+        return hit["value"]
+    value = compute()
+    if cacheable is None or cacheable(value):
+        cache.put(key, metric, {"value": value})
+    return value
+
+
+def _cached_metric_values_batch(
+    metric: str,
+    inputs: Sequence[dict],
+    factories: Sequence[Callable[[], Awaitable[object]]],
+    max_concurrency: int,
+) -> list[object | BaseException]:
+    """Batch form of ``_cached_metric_value``: misses are awaited concurrently on the shared loop."""
+    from rag_med.evaluation.async_runner import gather_bounded, get_background_loop
+    from rag_med.evaluation.cache import get_default_cache, metric_cache_key
+
+    cache = get_default_cache()
+    results: list[object | BaseException | None] = [None] * len(factories)
+    keys: list[str | None] = [None] * len(factories)
+    pending: list[int] = []
+    for i, item_inputs in enumerate(inputs):
+        if cache is not None:
+            keys[i] = metric_cache_key(
+                metric, metric_version(metric), _metrics_model_name(), item_inputs
+            )
+            hit = cache.get(keys[i])
+            if hit is not None:
+                results[i] = hit["value"]
+                continue
+        pending.append(i)
+
+    if pending:
+        values = get_background_loop().run(
+            gather_bounded([factories[i] for i in pending], max_concurrency)
+        )
+        for i, value in zip(pending, values):
+            results[i] = value
+            if cache is not None and not isinstance(value, BaseException):
+                cache.put(keys[i], metric, {"value": value})
+    return results
+
+
+def _ragas_score(scorer, **kwargs) -> float:
+    """Score one sample via ``ascore`` on the shared loop (not a fresh ``asyncio.run``)."""
+    from rag_med.evaluation.async_runner import get_background_loop
+
+    with trace_span("ragas.score", scorer=type(scorer).__name__):
+        return float(get_background_loop().run(scorer.ascore(**kwargs)).value)
+
+
+async def _ragas_ascore(scorer, **kwargs) -> float:
+    return float((await scorer.ascore(**kwargs)).value)
+
+
+def _ragas_max_concurrency(max_concurrency: int | None) -> int:
+    return max_concurrency or getattr(settings, "ragas_max_concurrency", 8)
+
+
 #  RAGAS Faithfulness 
 
 
@@ -96,18 +499,18 @@ def _use_valueai_llm() -> bool:
     return bool(base.strip() and user and pwd)
 
 
-def _get_ragas_llm():  # noqa: ANN201
+def _get_ragas_llm():
     from ragas.llms import llm_factory
 
     if _use_valueai_llm():
-        from rag_med.valueai.llm_api_client import ValueAIAsyncOpenAI, get_token
+        from rag_med.valueai.journal import get_default_journal
+        from rag_med.valueai.llm_api_client import ValueAIAsyncOpenAI, get_cached_token
 
         base = (getattr(settings, "valueai_base_url", None) or "").rstrip("/")
-        token = get_token(
-            base,
-            getattr(settings, "valueai_username", "") or "",
-            getattr(settings, "valueai_password", "") or "",
-        )
+        username = getattr(settings, "valueai_username", "") or ""
+        password = getattr(settings, "valueai_password", "") or ""
+        token_ttl = getattr(settings, "valueai_token_ttl_seconds", 0)
+        token = get_cached_token(base, username, password, token_ttl)
         model_name = getattr(settings, "metrics_llm_model_name", "llm_qwen_2_5_coder_32b_instruct_q8")
         max_tokens = getattr(settings, "ragas_max_tokens", 8192)
         poll = getattr(settings, "metrics_llm_poll_interval_seconds", 2.0)
@@ -119,39 +522,25 @@ def _get_ragas_llm():  # noqa: ANN201
             max_tokens=max_tokens,
             poll_interval=poll,
             timeout=timeout,
+            journal=get_default_journal(),
+            username=username,
+            password=password,
+            token_ttl=token_ttl,
         )
-        import openai as _openai
-        create_fn = getattr(getattr(client, "chat", None), "completions", None)
-        create_fn = getattr(create_fn, "create", None) if create_fn else None
-        _debug_log("H2", "ValueAIAsyncOpenAI after create", {
-            "client_type": type(client).__name__,
-            "create_is_coro": inspect.iscoroutinefunction(create_fn) if create_fn else None,
-            "isinstance_AsyncOpenAI": isinstance(client, _openai.AsyncOpenAI),
-            "isinstance_OpenAI": isinstance(client, _openai.OpenAI),
-        }, "metrics.py:_get_ragas_llm")
         llm = llm_factory(
             model_name,
             provider="openai",
             client=client,
             max_tokens=max_tokens,
         )
-        stored = getattr(llm, "client", None)
-        stored_create = getattr(getattr(stored, "chat", None), "completions", None)
-        stored_create = getattr(stored_create, "create", None) if stored_create else None
-        proof = {
-            "isinstance_AsyncOpenAI": isinstance(client, _openai.AsyncOpenAI),
-            "isinstance_OpenAI": isinstance(client, _openai.OpenAI),
-            "llm_client_type": type(stored).__name__ if stored else None,
-            "stored_create_is_coro": inspect.iscoroutinefunction(stored_create) if stored_create else None,
-            "llm_is_async": getattr(llm, "is_async", None),
-        }
-        _debug_log("H1", "After llm_factory", proof, "metrics.py:after_llm_factory")
-        try:
-            _DEBUG_PROOF_PATH.parent.mkdir(parents=True, exist_ok=True)
-            with open(_DEBUG_PROOF_PATH, "w", encoding="utf-8") as f:
-                f.write(json.dumps(proof, ensure_ascii=False, indent=2))
-        except Exception:
-            pass
+        trace_event(
+            "ragas.llm_client",
+            level="debug",
+            client_type=type(client).__name__,
+            llm_client_type=type(getattr(llm, "client", None)).__name__,
+            llm_is_async=getattr(llm, "is_async", None),
+            model=model_name,
+        )
         return llm
     raise ValueError(
         "ValueAI credentials are required for RAGAS metrics. "
@@ -159,24 +548,42 @@ def _get_ragas_llm():  # noqa: ANN201
     )
 
 
+_SCORER_LOCK = threading.Lock()
+
+
 def _get_factual_correctness_scorer():
     from ragas.metrics.collections import FactualCorrectness
 
-    if not hasattr(_get_factual_correctness_scorer, "_scorer"):
-        llm = _get_ragas_llm()
-        _get_factual_correctness_scorer._scorer = FactualCorrectness(llm=llm, mode="f1")
+    with _SCORER_LOCK:
+        if not hasattr(_get_factual_correctness_scorer, "_scorer"):
+            llm = _get_ragas_llm()
+            _get_factual_correctness_scorer._scorer = FactualCorrectness(llm=llm, mode="f1")
     return _get_factual_correctness_scorer._scorer
 
 
 def _get_faithfulness_scorer():
     from ragas.metrics.collections import Faithfulness
 
-    if not hasattr(_get_faithfulness_scorer, "_scorer"):
-        llm = _get_ragas_llm()
-        _get_faithfulness_scorer._scorer = Faithfulness(llm=llm)
+    with _SCORER_LOCK:
+        if not hasattr(_get_faithfulness_scorer, "_scorer"):
+            llm = _get_ragas_llm()
+            _get_faithfulness_scorer._scorer = Faithfulness(llm=llm)
     return _get_faithfulness_scorer._scorer
 
 
+def _score_faithfulness(question: str, response: str, retrieved_contexts: list[str]) -> float:
+    return _cached_metric_value(
+        "faithfulness",
+        {"question": question, "response": response, "contexts": list(retrieved_contexts)},
+        lambda: _ragas_score(
+            _get_faithfulness_scorer(),
+            user_input=question,
+            response=response,
+            retrieved_contexts=retrieved_contexts,
+        ),
+    )
+
+
 def evaluate_answer_pair_ragas_extended(
     question: str,
     response: str,
@@ -188,36 +595,60 @@ def evaluate_answer_pair_ragas_extended(
     if not retrieved_contexts:
         return out
     try:
-        result = _get_faithfulness_scorer().score(
-            user_input=question,
-            response=response,
-            retrieved_contexts=retrieved_contexts,
-        )
-        out["faithfulness"] = float(result.value)
+        out["faithfulness"] = _score_faithfulness(question, response, retrieved_contexts)
     except Exception as e:
-        try:
-            scorer = _get_faithfulness_scorer()
-            sl = getattr(scorer, "llm", None)
-            _debug_log("H3", "On Faithfulness exception", {"scorer_llm_client_type": type(getattr(sl, "client", None)).__name__ if sl else None, "llm_is_async": getattr(sl, "is_async", None), "error": str(e)[:200]}, "metrics.py:except_ragas")
-        except Exception as _:
-            pass
+        trace_event("ragas.faithfulness.error", level="error", error=str(e)[:200])
         logger.exception("RAGAS Faithfulness failed: %s", e)
         out["error"] = str(e)
     return out
 
 
+def evaluate_answer_pairs_ragas_batch(
+    samples: Sequence[tuple[str, str, list[str]]], max_concurrency: int | None = None
+) -> list[dict]:
+    """Batch ``evaluate_answer_pair_ragas_extended`` over (question, response, contexts) samples.
+
+    Faithfulness samples are scored concurrently (at most RAGAS_MAX_CONCURRENCY) on one
+    long-lived event loop; each output dict matches the single-sample function.
+    """
+    outs: list[dict] = [{"faithfulness": 0.0} for _ in samples]
+    scored = [i for i, (_, _, contexts) in enumerate(samples) if contexts]
+    if not scored:
+        return outs
+    try:
+        scorer = _get_faithfulness_scorer()
+        values = _cached_metric_values_batch(
+            "faithfulness",
+            [
+                {"question": samples[i][0], "response": samples[i][1], "contexts": list(samples[i][2])}
+                for i in scored
+            ],
+            [
+                lambda s=samples[i]: _ragas_ascore(
+                    scorer, user_input=s[0], response=s[1], retrieved_contexts=s[2]
+                )
+                for i in scored
+            ],
+            _ragas_max_concurrency(max_concurrency),
+        )
+    except Exception as e:
+        values = [e] * len(scored)
+    for i, value in zip(scored, values):
+        if isinstance(value, BaseException):
+            logger.error("RAGAS Faithfulness failed: %s", value)
+            outs[i]["error"] = str(value)
+        else:
+            outs[i]["faithfulness"] = value
+    return outs
+
+
 def evaluate_answer_pair(question: str, response: str, retrieved_contexts: list[str]) -> dict:
     """Return only faithfulness (RAGAS)."""
     if not retrieved_contexts:
         return {"faithfulness": 0.0}
     out = {"faithfulness": 0.0}
     try:
-        result = _get_faithfulness_scorer().score(
-            user_input=question,
-            response=response,
-            retrieved_contexts=retrieved_contexts,
-        )
-        out["faithfulness"] = float(result.value)
+        out["faithfulness"] = _score_faithfulness(question, response, retrieved_contexts)
     except Exception as e:
         logger.exception("RAGAS Faithfulness failed: %s", e)
         out["error"] = str(e)
@@ -227,41 +658,12 @@ def evaluate_answer_pair(question: str, response: str, retrieved_contexts: list[
 #  LLM judge: alignment (RAG vs etalon), 1–10 
 
 
-def evaluate_answer_pair_llm_alignment(
-    question: str,
-    etalon_answer: str,
-    rag_answer: str,
-    context: str | None = None,
-) -> dict:
-    """LLM-judge alignment score (1–10) for RAG answer vs etalon.
-
-    Uses ValueAI LLM (metrics_llm_model_name). Prompt and output are fully in Russian.
-    """
-    out: dict = {
-        "alignment_score": None,
-        "alignment_comment": None,
-    }
-
-    if not etalon_answer or not rag_answer:
-        out["alignment_error"] = "missing etalon_answer or rag_answer"
-        return out
-
-    question_str = question or ""
-    context_str = context or ""
-
-    system_prompt = (
-        "Ты — экспертный врач и методист, который оценивает качество ответа модели "
-        "по сравнению с эталонным ответом."
-    )
+_ALIGNMENT_SYSTEM_PROMPT = (
+    "Ты — экспертный врач и методист, который оценивает качество ответа модели "
+    "по сравнению с эталонным ответом."
+)
 
-    user_prompt_template = """
-Тебе даны:
-1) Вопрос пациента или клинический вопрос.
-2) Фрагмент клинического текста (контекст), на основе которого должны строиться ответы.
-3) Эталонный ответ (правильный, проверенный специалистом).
-4) Ответ RAG‑системы (модели), который нужно сравнить с эталоном.
-
-Твоя задача — ОЦЕНИТЬ, насколько ответ RAG‑системы соответствует эталонному
+_ALIGNMENT_RUBRIC = """Твоя задача — ОЦЕНИТЬ, насколько ответ RAG‑системы соответствует эталонному
 по следующим критериям:
 - медицинская корректность (нет ли ошибок, противоречий с эталоном и контекстом),
 - полнота (насколько хорошо покрыты ключевые моменты эталона),
@@ -272,7 +674,19 @@ def evaluate_answer_pair_llm_alignment(
 - 4–6: частично совпадает с эталоном, но ответ заметно слабее.
 - 7–8: в целом близко к эталону, есть лишь несущественные недочёты.
 - 9–10: очень близко к эталону, без существенных расхождений.
+"""
+
+_ALIGNMENT_USER_PROMPT = (
+    """
+Тебе даны:
+1) Вопрос пациента или клинический вопрос.
+2) Фрагмент клинического текста (контекст), на основе которого должны строиться ответы.
+3) Эталонный ответ (правильный, проверенный специалистом).
+4) Ответ RAG‑системы (модели), который нужно сравнить с эталоном.
 
+"""
+    + _ALIGNMENT_RUBRIC
+    + """
 Входные данные:
 
 Вопрос:
@@ -294,8 +708,172 @@ def evaluate_answer_pair_llm_alignment(
   "comment": "<КРАТКОЕ_ОБОСНОВАНИЕ_НА_РУССКОМ_ЯЗЫКЕ>"
 }}
 """
+)
+
+# Batched judge: K pairs per request, one JSON object per pair in a JSON array
+_ALIGNMENT_BATCH_PROMPT = (
+    """
+Тебе даны несколько пар для оценки. В каждой паре:
+1) Вопрос пациента или клинический вопрос.
+2) Фрагмент клинического текста (контекст), на основе которого должны строиться ответы.
+3) Эталонный ответ (правильный, проверенный специалистом).
+4) Ответ RAG‑системы (модели), который нужно сравнить с эталоном.
+
+"""
+    + _ALIGNMENT_RUBRIC
+    + """
+Оцени КАЖДУЮ пару независимо от остальных.
+
+Входные данные:
+
+{items}
+ОТВЕТЬ ТОЛЬКО В ВИДЕ ВАЛИДНОГО JSON-МАССИВА, БЕЗ ДОПОЛНИТЕЛЬНОГО ТЕКСТА,
+ПО ОДНОМУ ОБЪЕКТУ НА КАЖДУЮ ПАРУ (ПОЛЕ "id" — НОМЕР ПАРЫ), В СЛЕДУЮЩЕМ ФОРМАТЕ:
+
+[
+  {{"id": <НОМЕР_ПАРЫ>, "alignment_score": <ЦЕЛОЕ_ЧИСЛО_ОТ_1_ДО_10>, "comment": "<КРАТКОЕ_ОБОСНОВАНИЕ_НА_РУССКОМ_ЯЗЫКЕ>"}}
+]
+"""
+)
+
+_ALIGNMENT_BATCH_ITEM = """=== Пара {id} ===
+Вопрос:
+{question}
+
+Контекст:
+{context}
+
+Эталонный ответ:
+{etalon_answer}
+
+Ответ RAG‑системы:
+{rag_answer}
+"""
+
+
+_JUDGE_LOCK = threading.Lock()
+_JUDGE_COUNTS: Counter = Counter()
+
+
+def _record_judge(calls: int = 0, items: int = 0, fallbacks: int = 0) -> None:
+    with _JUDGE_LOCK:
+        _JUDGE_COUNTS["calls"] += calls
+        _JUDGE_COUNTS["items"] += items
+        _JUDGE_COUNTS["fallbacks"] += fallbacks
+
+
+def judge_call_stats() -> dict:
+    """Alignment-judge LLM requests vs items they scored (batching lowers calls per item)."""
+    with _JUDGE_LOCK:
+        calls = _JUDGE_COUNTS["calls"]
+        items = _JUDGE_COUNTS["items"]
+        fallbacks = _JUDGE_COUNTS["fallbacks"]
+    return {
+        "batch_size": getattr(settings, "llm_judge_batch_size", 1),
+        "llm_calls": calls,
+        "items_scored": items,
+        "calls_per_item": calls / items if items else None,
+        "single_pair_fallbacks": fallbacks,
+    }
+
+
+def reset_judge_stats() -> None:
+    with _JUDGE_LOCK:
+        _JUDGE_COUNTS.clear()
+
+
+def _alignment_judge_call(user_prompt: str, n_items: int = 1) -> str:
+    """One ValueAI LLM call of the alignment judge; returns the raw model output.
+
+    ``n_items`` is the number of pairs counted as scored by this call (0 for batched
+    calls, whose pairs are counted once parsed).
+    """
+    from rag_med.valueai.journal import get_default_journal
+    from rag_med.valueai.llm_api_client import get_cached_token, predict_sync
 
-    user_prompt = user_prompt_template.format(
+    base = (getattr(settings, "valueai_base_url", None) or "").rstrip("/")
+    token = get_cached_token(
+        base,
+        getattr(settings, "valueai_username", "") or "",
+        getattr(settings, "valueai_password", "") or "",
+        getattr(settings, "valueai_token_ttl_seconds", 0),
+    )
+    poll = getattr(settings, "metrics_llm_poll_interval_seconds", 2.0)
+    timeout = getattr(settings, "metrics_llm_timeout_seconds", 120.0)
+    _record_judge(calls=1, items=n_items)
+    with trace_span("judge.alignment", items=n_items, prompt_chars=len(user_prompt)):
+        return predict_sync(
+            base,
+            token,
+            _metrics_model_name(),
+            messages=[
+                {"role": "system", "content": _ALIGNMENT_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=getattr(settings, "ragas_max_tokens", 8192),
+            temperature=0,
+            poll_interval=poll,
+            timeout=timeout,
+            journal=get_default_journal(),
+        ).strip()
+
+
+def evaluate_answer_pair_llm_alignment(
+    question: str,
+    etalon_answer: str,
+    rag_answer: str,
+    context: str | None = None,
+) -> dict:
+    """LLM-judge alignment score (1–10) for RAG answer vs etalon.
+
+    Uses ValueAI LLM (metrics_llm_model_name). Prompt and output are fully in Russian.
+    """
+    return _llm_alignment_pair(question, etalon_answer, rag_answer, context)
+
+
+def _alignment_inputs(question: str, context: str, etalon_answer: str, rag_answer: str) -> dict:
+    """Cache inputs of one judged pair."""
+    return {
+        "question": question,
+        "context": context,
+        "etalon_answer": etalon_answer,
+        "rag_answer": rag_answer,
+    }
+
+
+def _llm_alignment_pair(
+    question: str,
+    etalon_answer: str,
+    rag_answer: str,
+    context: str | None = None,
+    *,
+    cache_version: str | None = None,
+    cache_lookup: bool = True,
+) -> dict:
+    """``evaluate_answer_pair_llm_alignment`` with the cache version and lookup of
+    ``_cached_metric_value`` (the batch judge's single-pair fallback stores its scores
+    under the batch version and has already missed that key)."""
+    out: dict = {
+        "alignment_score": None,
+        "alignment_comment": None,
+    }
+
+    if not etalon_answer or not rag_answer:
+        out["alignment_error"] = "missing etalon_answer or rag_answer"
+        return out
+
+    decision = gate_llm_metrics(etalon_answer, rag_answer)
+    if decision is not None:
+        _record_gate("llm_alignment", decision.reason)
+        out["alignment_score"] = decision.alignment_score
+        out["alignment_comment"] = decision.comment
+        out["alignment_gate"] = decision.reason
+        return out
+
+    question_str = question or ""
+    context_str = context or ""
+
+    user_prompt = _ALIGNMENT_USER_PROMPT.format(
         question=question_str,
         context=context_str,
         etalon_answer=etalon_answer,
@@ -304,30 +882,14 @@ def evaluate_answer_pair_llm_alignment(
 
     try:
         if _use_valueai_llm():
-            from rag_med.valueai.llm_api_client import get_token, predict_sync
-
-            base = (getattr(settings, "valueai_base_url", None) or "").rstrip("/")
-            token = get_token(
-                base,
-                getattr(settings, "valueai_username", "") or "",
-                getattr(settings, "valueai_password", "") or "",
+            content = _cached_metric_value(
+                "llm_alignment",
+                _alignment_inputs(question_str, context_str, etalon_answer, rag_answer),
+                lambda: _alignment_judge_call(user_prompt),
+                cacheable=_alignment_content_parses,
+                version=cache_version,
+                lookup=cache_lookup,
             )
-            model_name = getattr(settings, "metrics_llm_model_name", "llm_qwen_2_5_coder_32b_instruct_q8")
-            poll = getattr(settings, "metrics_llm_poll_interval_seconds", 2.0)
-            timeout = getattr(settings, "metrics_llm_timeout_seconds", 120.0)
-            content = predict_sync(
-                base,
-                token,
-                model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                max_tokens=getattr(settings, "ragas_max_tokens", 8192),
-                temperature=0,
-                poll_interval=poll,
-                timeout=timeout,
-            ).strip()
         else:
             out["alignment_error"] = (
                 "ValueAI credentials required for LLM judge. "
@@ -339,23 +901,174 @@ def evaluate_answer_pair_llm_alignment(
         out["alignment_error"] = str(e)
         return out
 
+    _apply_alignment_content(out, content)
+    return out
+
+
+def _apply_alignment_json(out: dict, data: dict) -> None:
+    score = data.get("alignment_score")
+    comment = data.get("comment")
+
+    if isinstance(score, (int, float)) and not isinstance(score, bool):
+        score_int = int(round(score))
+        score_int = max(1, min(10, score_int))
+        out["alignment_score"] = score_int
+    else:
+        out["alignment_score"] = None
+
+    if isinstance(comment, str):
+        out["alignment_comment"] = comment
+
+
+def _alignment_content_parses(content: object) -> bool:
+    """Whether a single-pair judge answer yields a score (others are not cached)."""
+    if not isinstance(content, str):
+        return False
+    out: dict = {}
     try:
-        data = json.loads(content)
-        score = data.get("alignment_score")
-        comment = data.get("comment")
-
-        if isinstance(score, (int, float)):
-            score_int = int(round(score))
-            score_int = max(1, min(10, score_int))
-            out["alignment_score"] = score_int
-        else:
-            out["alignment_score"] = None
+        _apply_alignment_json(out, json.loads(content))
+    except Exception:
+        return False
+    return out.get("alignment_score") is not None
 
-        if isinstance(comment, str):
-            out["alignment_comment"] = comment
+
+def _apply_alignment_content(out: dict, content: str) -> None:
+    """Fill ``out`` from a single-pair judge answer (JSON object)."""
+    try:
+        _apply_alignment_json(out, json.loads(content))
     except Exception as e:
         logger.exception("Failed to parse LLM alignment JSON: %s", e)
         out["alignment_error"] = str(e)
         out["alignment_comment"] = content[:500]
 
-    return out
+
+_JSON_OBJECT_RE = re.compile(r"\{[^{}]*\}", re.DOTALL)
+
+
+def _parse_alignment_batch(content: str) -> dict[int, dict]:
+    """Per-pair judge objects by "id" from a batched answer.
+
+    Accepts a JSON array (optionally inside a code fence or surrounded by text); when
+    the array is broken (e.g. truncated), every well-formed object is still recovered.
+    Objects without a usable id or score are dropped (those pairs fall back to single calls).
+    """
+    objects: list = []
+    start, end = content.find("["), content.rfind("]")
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(content[start : end + 1])
+            if isinstance(parsed, list):
+                objects = parsed
+        except json.JSONDecodeError:
+            objects = []
+    if not objects:
+        for match in _JSON_OBJECT_RE.finditer(content):
+            try:
+                objects.append(json.loads(match.group(0)))
+            except json.JSONDecodeError:
+                continue
+    by_id: dict[int, dict] = {}
+    for obj in objects:
+        if not isinstance(obj, dict):
+            continue
+        try:
+            pair_id = int(obj.get("id"))
+        except (TypeError, ValueError):
+            continue
+        score = obj.get("alignment_score")
+        if isinstance(score, (int, float)) and not isinstance(score, bool):
+            by_id.setdefault(pair_id, obj)
+    return by_id
+
+
+def evaluate_answer_pairs_llm_alignment_batch(
+    samples: Sequence[tuple[str, str, str, str | None]], batch_size: int | None = None
+) -> list[dict]:
+    """Batch ``evaluate_answer_pair_llm_alignment`` over (question, etalon, rag, context) samples.
+
+    Pairs that are not gated or cached are packed ``batch_size`` (LLM_JUDGE_BATCH_SIZE) per
+    request with a JSON-array answer; pairs missing from the parsed answer, and every pair
+    of a failed request, are re-judged one by one. Output dicts match the single-pair function.
+    """
+    from rag_med.evaluation.cache import get_default_cache, metric_cache_key
+
+    size = max(1, batch_size or getattr(settings, "llm_judge_batch_size", 1))
+    outs: list[dict | None] = [None] * len(samples)
+    pending: list[int] = []
+    keys: dict[int, str] = {}
+    cache = get_default_cache()
+    version = metric_version("llm_alignment_batch")
+    for i, (question, etalon, rag, context) in enumerate(samples):
+        if not etalon or not rag or not _use_valueai_llm() or size == 1:
+            continue
+        if gate_llm_metrics(etalon, rag) is not None:
+            continue
+        if cache is not None:
+            keys[i] = metric_cache_key(
+                "llm_alignment",
+                version,
+                _metrics_model_name(),
+                _alignment_inputs(question or "", context or "", etalon, rag),
+            )
+            hit = cache.get(keys[i])
+            if hit is not None:
+                out: dict = {"alignment_score": None, "alignment_comment": None}
+                _apply_alignment_content(out, hit["value"])
+                outs[i] = out
+                continue
+        pending.append(i)
+
+    fallbacks: set[int] = set()
+    for offset in range(0, len(pending), size):
+        group = pending[offset : offset + size]
+        if len(group) < 2:
+            continue
+        items = "\n".join(
+            _ALIGNMENT_BATCH_ITEM.format(
+                id=n,
+                question=samples[i][0] or "",
+                context=samples[i][3] or "",
+                etalon_answer=samples[i][1],
+                rag_answer=samples[i][2],
+            )
+            for n, i in enumerate(group, start=1)
+        )
+        try:
+            parsed = _parse_alignment_batch(
+                _alignment_judge_call(_ALIGNMENT_BATCH_PROMPT.format(items=items), n_items=0)
+            )
+        except Exception as e:
+            logger.warning("Batched LLM alignment judge call failed, falling back: %s", e)
+            parsed = {}
+        for n, i in enumerate(group, start=1):
+            data = parsed.get(n)
+            if data is None:
+                fallbacks.add(i)
+                continue
+            out = {"alignment_score": None, "alignment_comment": None}
+            _apply_alignment_json(out, data)
+            outs[i] = out
+            _record_judge(items=1)
+            if cache is not None and i in keys:
+                content = json.dumps(
+                    {"alignment_score": data["alignment_score"], "comment": data.get("comment")},
+                    ensure_ascii=False,
+                )
+                cache.put(keys[i], "llm_alignment", {"value": content})
+
+    results: list[dict] = []
+    judged = set(pending)
+    for i, out in enumerate(outs):
+        if out is None:
+            question, etalon, rag, context = samples[i]
+            if i in judged:
+                # Judged alone, but cached with the batch results (the key was missed above)
+                if i in fallbacks:
+                    _record_judge(fallbacks=1)
+                out = _llm_alignment_pair(
+                    question, etalon, rag, context, cache_version=version, cache_lookup=False
+                )
+            else:
+                out = evaluate_answer_pair_llm_alignment(question, etalon, rag, context)
+        results.append(out)
+    return results
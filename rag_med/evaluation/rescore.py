@@ -0,0 +1,338 @@
+"""Offline re-scoring of saved QA result files (``rag-med evaluate``)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from configs.settings import settings
+from rag_med.evaluation.cache import metric_cache_stats
+from rag_med.evaluation.stats import AVERAGED_METRICS, MetricAggregator
+from rag_med.evaluation.metrics import (
+    _metrics_model_name,
+    compare_two_answers_batch,
+    cosine_similarity_batch,
+    evaluate_answer_pair_llm_alignment,
+    evaluate_answer_pairs_llm_alignment_batch,
+    evaluate_answer_pairs_ragas_batch,
+    gate_stats,
+    judge_call_stats,
+    metric_version,
+)
+from rag_med.qa_generator.models import QAResult
+from rag_med.qa_generator.output import read_results, write_results
+from rag_med.results_store import record_run, result_file_meta
+
+logger = logging.getLogger(__name__)
+
+METRIC_NAMES = ("faithfulness", "factual", "cosine", "alignment")
+
+# Per-metric "<version>@<model>#<inputs digest>" of the scores, inside evaluation_metrics
+VERSIONS_KEY = "metric_versions"
+
+# CLI name -> (metric id of METRIC_VERSIONS, value key, error key) in evaluation_metrics
+_METRICS: dict[str, tuple[str, str, str | None]] = {
+    "faithfulness": ("faithfulness", "ragas_faithfulness", "ragas_error"),
+    "factual": ("factual_correctness", "factual_correctness", "factual_error"),
+    "cosine": ("cosine_similarity", "cosine_similarity", None),
+    "alignment": ("llm_alignment", "llm_alignment_score", "llm_alignment_error"),
+}
+
+
+def parse_metric_names(spec: str) -> list[str]:
+    """Parse a comma-separated metric list ("all" selects every metric)."""
+    names = [n.strip().lower() for n in spec.split(",") if n.strip()]
+    if not names or names == ["all"]:
+        return list(METRIC_NAMES)
+    unknown = [n for n in names if n not in _METRICS]
+    if unknown:
+        msg = f"Unknown metrics: {', '.join(unknown)}. Choose from: {', '.join(METRIC_NAMES)}"
+        raise ValueError(msg)
+    return list(dict.fromkeys(names))
+
+
+def metric_stamp(name: str) -> str:
+    """Current version stamp of a metric (LLM metrics include the judge model)."""
+    version = metric_version(_METRICS[name][0])
+    if name == "cosine":
+        return version
+    return f"{version}@{_metrics_model_name()}"
+
+
+def _item_stamp(r: QAResult, stamp: str) -> str:
+    inputs = json.dumps([r.question, r.answer, r.valueai_answer, r.chunk], ensure_ascii=False)
+    return f"{stamp}#{hashlib.sha256(inputs.encode('utf-8')).hexdigest()[:12]}"
+
+
+def is_up_to_date(r: QAResult, name: str, stamp: str) -> bool:
+    """True when the metric was scored with this version and the item's current inputs."""
+    metrics = r.evaluation_metrics or {}
+    _, value_key, error_key = _METRICS[name]
+    return (
+        (metrics.get(VERSIONS_KEY) or {}).get(name) == _item_stamp(r, stamp)
+        and metrics.get(value_key) is not None
+        and not (error_key and metrics.get(error_key))
+    )
+
+
+def _evaluable(r: QAResult) -> bool:
+    return bool(r.question and r.answer and r.valueai_answer)
+
+
+def _faithfulness_updates(items: list[QAResult]) -> list[dict]:
+    outs = evaluate_answer_pairs_ragas_batch(
+        [(r.question, r.valueai_answer, [r.answer]) for r in items]
+    )
+    return [{"ragas_faithfulness": o.get("faithfulness"), "ragas_error": o.get("error")} for o in outs]
+
+
+def _factual_updates(items: list[QAResult]) -> list[dict]:
+    outs = compare_two_answers_batch([(r.answer, r.valueai_answer) for r in items])
+    return [
+        {
+            "factual_correctness": o.get("factual_correctness"),
+            "factual_error": o.get("factual_error"),
+            "factual_gate": o.get("factual_gate"),
+        }
+        for o in outs
+    ]
+
+
+def _cosine_updates(items: list[QAResult]) -> list[dict]:
+    values = cosine_similarity_batch([(r.answer, r.valueai_answer) for r in items])
+    return [{"cosine_similarity": v} for v in values]
+
+
+def _alignment_updates(items: list[QAResult]) -> list[dict]:
+    def judge(r: QAResult) -> dict:
+        return evaluate_answer_pair_llm_alignment(
+            question=r.question,
+            etalon_answer=r.answer,
+            rag_answer=r.valueai_answer,
+            context=(r.chunk or ""),
+        )
+
+    batch_size = max(1, getattr(settings, "llm_judge_batch_size", 1))
+    workers = max(1, getattr(settings, "eval_max_concurrent_items", 4))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eval-judge") as pool:
+        if batch_size > 1:
+            groups = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+            outs = [
+                out
+                for group_outs in pool.map(
+                    lambda group: evaluate_answer_pairs_llm_alignment_batch(
+                        [(r.question, r.answer, r.valueai_answer, r.chunk or "") for r in group]
+                    ),
+                    groups,
+                )
+                for out in group_outs
+            ]
+        else:
+            outs = list(pool.map(judge, items))
+    return [
+        {
+            "llm_alignment_score": out.get("alignment_score"),
+            "llm_alignment_comment": out.get("alignment_comment"),
+            "llm_alignment_error": out.get("alignment_error"),
+            "llm_alignment_gate": out.get("alignment_gate"),
+        }
+        for out in outs
+    ]
+
+
+_UPDATERS: dict[str, Callable[[list[QAResult]], list[dict]]] = {
+    "faithfulness": _faithfulness_updates,
+    "factual": _factual_updates,
+    "cosine": _cosine_updates,
+    "alignment": _alignment_updates,
+}
+
+
+def _apply_update(r: QAResult, name: str, update: dict, stamp: str) -> None:
+    metrics = dict(r.evaluation_metrics or {})
+    metrics.pop("error", None)
+    for key, value in update.items():
+        if value is None and key.endswith(("_error", "_gate")):
+            metrics.pop(key, None)
+        else:
+            metrics[key] = value
+    versions = dict(metrics.get(VERSIONS_KEY) or {})
+    error_key = _METRICS[name][2]
+    if error_key and update.get(error_key):
+        versions.pop(name, None)
+    else:
+        versions[name] = _item_stamp(r, stamp)
+    metrics[VERSIONS_KEY] = versions
+    r.evaluation_metrics = metrics
+
+
+def rescore_results(
+    results: Sequence[QAResult], metrics: Sequence[str], *, force: bool = False
+) -> dict:
+    """Rescore stale metrics of ``results`` in place; return per-metric counts.
+
+    Metrics run in parallel with each other, and each metric is batched over items
+    (RAGAS concurrently on one event loop, the judge on EVAL_MAX_CONCURRENT_ITEMS threads).
+    """
+    evaluable = [r for r in results if _evaluable(r)]
+    stamps = {name: metric_stamp(name) for name in metrics}
+    todo = {
+        name: [r for r in evaluable if force or not is_up_to_date(r, name, stamps[name])]
+        for name in metrics
+    }
+    with ThreadPoolExecutor(max_workers=max(1, len(metrics)), thread_name_prefix="rescore") as pool:
+        futures = {name: pool.submit(_UPDATERS[name], items) for name, items in todo.items() if items}
+        for name, fut in futures.items():
+            for r, update in zip(todo[name], fut.result()):
+                _apply_update(r, name, update, stamps[name])
+    return {
+        "items": len(results),
+        "evaluable": len(evaluable),
+        "rescored": {name: len(todo[name]) for name in metrics},
+        "up_to_date": {name: len(evaluable) - len(todo[name]) for name in metrics},
+    }
+
+
+def aggregate_results(results: Sequence[QAResult]) -> dict:
+    """Averages over items where each metric is present, plus streaming metric_stats."""
+    stats = MetricAggregator(AVERAGED_METRICS.values())
+    n_evaluated = 0
+    for r in results:
+        if r.evaluation_metrics and r.valueai_answer:
+            stats.add(r.evaluation_metrics)
+            n_evaluated += 1
+    return {
+        "count": len(results),
+        **{name: stats.mean(key) for name, key in AVERAGED_METRICS.items()},
+        "evaluated_count": n_evaluated,
+        "metric_stats": stats.summary(),
+    }
+
+
+def discover_result_files(inputs: Sequence[Path]) -> list[Path]:
+    """Expand directories into the JSON/Parquet files below them (evaluation summaries excluded).
+
+    When a run was saved in both formats (``x.json`` and ``x.parquet``), only the more
+    recently written file is returned, so its items are not counted twice.
+    """
+    files: list[Path] = []
+    for path in inputs:
+        if path.is_dir():
+            files.extend(sorted([*path.rglob("*.json"), *path.rglob("*.parquet")]))
+        elif path.is_file():
+            files.append(path)
+        else:
+            msg = f"Path not found: {path}"
+            raise FileNotFoundError(msg)
+    files = [f for f in dict.fromkeys(files) if not f.stem.endswith("_valueai_eval")]
+    by_run: dict[Path, Path] = {}
+    for f in files:
+        kept = by_run.setdefault(f.with_suffix(""), f)
+        if kept is f:
+            continue
+        newer, older = sorted(
+            (kept, f),
+            key=lambda p: (p.stat().st_mtime, p.suffix.lower() == ".parquet"),
+            reverse=True,
+        )
+        logger.info("Skipping %s: the same run is saved in %s", older, newer)
+        by_run[f.with_suffix("")] = newer
+    return [f for f in files if by_run[f.with_suffix("")] is f]
+
+
+def _output_paths(files: Sequence[Path], output_dir: Path | None) -> dict[Path, Path]:
+    """Where each rescored file is written: in place, or under ``output_dir`` with its path
+    relative to the files' common directory (same-named files of different runs stay apart)."""
+    if output_dir is None:
+        return {f: f for f in files}
+    resolved = [f.resolve() for f in files]
+    root = Path(os.path.commonpath([r.parent for r in resolved]))
+    return {f: output_dir / r.relative_to(root) for f, r in zip(files, resolved)}
+
+
+def load_result_file(path: Path) -> list[QAResult] | None:
+    """QA results of a file, or None when it is not a QA result list."""
+    if path.suffix.lower() == ".parquet":
+        try:
+            return read_results(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping %s: %s", path, e)
+            return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Skipping %s: %s", path, e)
+        return None
+    if not isinstance(data, list):
+        return None
+    try:
+        return [QAResult.model_validate(item) for item in data]
+    except ValidationError:
+        return None
+
+
+def evaluate_result_files(
+    inputs: Sequence[Path],
+    metrics: Sequence[str],
+    *,
+    output_dir: Path | None = None,
+    summary_file: Path | None = None,
+    force: bool = False,
+) -> dict:
+    """Rescore result files, write them back (or into ``output_dir``) and a merged summary."""
+    loaded: list[tuple[Path, list[QAResult]]] = []
+    for path in discover_result_files(inputs):
+        results = load_result_file(path)
+        if results is None:
+            logger.info("Skipping %s: not a QA result file", path)
+            continue
+        loaded.append((path, results))
+    if not loaded:
+        raise ValueError("No QA result files found")
+
+    all_results = [r for _, results in loaded for r in results]
+    counts = rescore_results(all_results, metrics, force=force)
+
+    targets = _output_paths([path for path, _ in loaded], output_dir)
+    files_report = []
+    for path, results in loaded:
+        target = targets[path]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        write_results(results, target)
+        files_report.append(
+            {"path": str(path), "output": str(target), "aggregate_metrics": aggregate_results(results)}
+        )
+        logger.info("Rescored results saved to: %s", target)
+
+    summary = {
+        "metrics": list(metrics),
+        "metric_versions": {name: metric_stamp(name) for name in metrics},
+        **counts,
+        "aggregate_metrics": aggregate_results(all_results),
+        "files": files_report,
+        "metric_cache": metric_cache_stats(),
+        "llm_gating": gate_stats(),
+        "llm_judge": judge_call_stats(),
+    }
+    if summary_file is None:
+        summary_file = (output_dir or Path(".")) / "evaluation_summary.json"
+    summary_file.parent.mkdir(parents=True, exist_ok=True)
+    with summary_file.open("w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    logger.info("Evaluation summary saved to: %s", summary_file)
+    summary["summary_file"] = str(summary_file)
+    for path, results in loaded:
+        record_run(
+            results,
+            kind="evaluate",
+            results_file=targets[path],
+            **{**result_file_meta(path, results), "summary_file": summary_file},
+        )
+    return summary
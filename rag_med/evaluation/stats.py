@@ -0,0 +1,163 @@
+"""Constant-memory streaming statistics for evaluation summaries."""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Mapping
+from statistics import NormalDist
+
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+# Summary average name -> per-item key of ``evaluation_metrics``
+AVERAGED_METRICS = {
+    "avg_faithfulness": "ragas_faithfulness",
+    "avg_cosine_similarity": "cosine_similarity",
+    "avg_factual_correctness": "factual_correctness",
+    "avg_llm_alignment_score": "llm_alignment_score",
+}
+
+
+class P2Quantile:
+    """P² estimator of one quantile (Jain & Chlamtac, 1985): five markers, O(1) memory."""
+
+    def __init__(self, q: float):
+        if not 0.0 < q < 1.0:
+            raise ValueError("q must be in (0, 1)")
+        self.q = q
+        self._count = 0
+        self._heights: list[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1.0 + 2 * q, 1.0 + 4 * q, 3.0 + 2 * q, 5.0]
+        self._increments = [0.0, q / 2, q, (1.0 + q) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        self._count += 1
+        h = self._heights
+        if self._count <= 5:
+            h.append(x)
+            h.sort()
+            return
+
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if h[i] <= x < h[i + 1])
+        n = self._positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = h[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not h[i - 1] < candidate < h[i + 1]:
+                    candidate = h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
+                h[i] = candidate
+                n[i] += step
+
+    def value(self) -> float | None:
+        if not self._heights:
+            return None
+        if self._count <= 5:
+            # exact nearest-rank quantile of the few values seen so far
+            rank = max(1, math.ceil(self.q * len(self._heights)))
+            return self._heights[rank - 1]
+        return self._heights[2]
+
+
+class RunningStats:
+    """Welford mean/variance, min/max, P² quantiles and a count of missing values."""
+
+    def __init__(self, quantiles: Iterable[float] = DEFAULT_QUANTILES):
+        self.count = 0
+        self.missing = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+        self._quantiles = {q: P2Quantile(q) for q in quantiles}
+
+    def add(self, value: float | None) -> None:
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            self.missing += 1
+            return
+        x = float(value)
+        self.count += 1
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+        for estimator in self._quantiles.values():
+            estimator.add(x)
+
+    @property
+    def mean(self) -> float | None:
+        return self._mean if self.count else None
+
+    @property
+    def variance(self) -> float | None:
+        """Sample variance (n - 1)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def stdev(self) -> float | None:
+        var = self.variance
+        return math.sqrt(var) if var is not None else None
+
+    def confidence_interval(self, confidence: float = 0.95) -> tuple[float, float] | None:
+        """Normal-approximation interval of the mean (None below two values)."""
+        if self.count < 2:
+            return None
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        half = z * self.stdev / math.sqrt(self.count)
+        return (self._mean - half, self._mean + half)
+
+    def summary(self, confidence: float = 0.95) -> dict:
+        ci = self.confidence_interval(confidence)
+        return {
+            "count": self.count,
+            "missing": self.missing,
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "min": self.min,
+            "max": self.max,
+            **{f"p{round(q * 100)}": est.value() for q, est in self._quantiles.items()},
+            "ci_level": confidence,
+            "ci_low": ci[0] if ci else None,
+            "ci_high": ci[1] if ci else None,
+        }
+
+
+class MetricAggregator:
+    """One RunningStats per metric key of ``evaluation_metrics`` dicts."""
+
+    def __init__(self, keys: Iterable[str], quantiles: Iterable[float] = DEFAULT_QUANTILES):
+        quantiles = tuple(quantiles)
+        self._stats = {key: RunningStats(quantiles) for key in keys}
+
+    def add(self, metrics: Mapping[str, object]) -> None:
+        """Add one evaluated item; absent or None values count as missing."""
+        for key, stats in self._stats.items():
+            value = metrics.get(key)
+            stats.add(value if isinstance(value, (int, float)) and not isinstance(value, bool) else None)
+
+    def __getitem__(self, key: str) -> RunningStats:
+        return self._stats[key]
+
+    def mean(self, key: str, default: float = 0.0) -> float:
+        mean = self._stats[key].mean
+        return mean if mean is not None else default
+
+    def summary(self, confidence: float = 0.95) -> dict:
+        return {key: stats.summary(confidence) for key, stats in self._stats.items()}
@@ -1,5 +1,21 @@
 """PDF cleaner module for removing unnecessary sections from PDF files."""
 
-from .cleaner import clean_pdf, find_text_in_pdf
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .cleaner import clean_pdf, find_text_in_pdf
 
 __all__ = ["clean_pdf", "find_text_in_pdf"]
+
+
+def __getattr__(name: str) -> object:
+    # PyMuPDF is imported only when a cleaner function is first used
+    if name in __all__:
+        value = getattr(import_module(".cleaner", __name__), name)
+        globals()[name] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,23 @@
+"""Streaming end-to-end pipeline (``rag-med run``)."""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from .stream import Stage, StreamingPipeline
+
+if TYPE_CHECKING:
+    from .run import run_pipeline
+
+__all__ = ["Stage", "StreamingPipeline", "run_pipeline"]
+
+
+def __getattr__(name: str) -> object:
+    # The stages import the generator, PDF and metrics modules
+    if name == "run_pipeline":
+        value = import_module(".run", __name__).run_pipeline
+        globals()[name] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
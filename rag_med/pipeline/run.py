@@ -0,0 +1,415 @@
+"""``rag-med run``: clean → extract → chunk → generate QA → RAG answer → score, streamed."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from configs.settings import settings
+from rag_med.evaluation.cache import metric_cache_stats
+from rag_med.evaluation.lexical_index import LexicalIndex, load_or_build_index
+from rag_med.evaluation.metrics import gate_stats, judge_call_stats
+from rag_med.evaluation.stats import MetricAggregator
+from rag_med.pdf_cleaner import clean_pdf
+from rag_med.pipeline.stream import Stage, StreamingPipeline
+from rag_med.profiling import profile_stage, profile_summary
+from rag_med.results_store import run_meta, start_run_recording
+from rag_med.qa_generator.generator import (
+    CHUNKS_PER_QA,
+    _averaged_metrics,
+    _build_valueai_client,
+    _generation_failed,
+    _item_metric_fns,
+    _make_judge_batcher,
+    _merge_item_metrics,
+    _read_pdf_text,
+    _reusable,
+    _split_text_chunks,
+    generate_qa,
+)
+from rag_med.qa_generator.dedup import dedup_stats
+from rag_med.qa_generator.manifest import (
+    RunManifest,
+    file_sha256,
+    get_manifest_store,
+    resolve_seed,
+    sample_chunk_groups,
+)
+from rag_med.qa_generator.models import QAResult
+from rag_med.qa_generator.output import OUTPUT_FORMATS, write_parquet_from_jsonl
+from rag_med.tracing import span as trace_span
+from rag_med.valueai.singleflight import singleflight_stats
+from rag_med.valueai.telemetry import get_recorder
+
+if TYPE_CHECKING:
+    from rag_med.dashboard import ProgressTracker
+
+logger = logging.getLogger(__name__)
+
+STAGE_NAMES = ("clean", "extract", "chunk", "generate", "rag", "score")
+
+# CPU stages (PyMuPDF/pypdf, splitting) need few threads; network stages wait on ValueAI
+DEFAULT_WORKERS = {"clean": 2, "extract": 2, "chunk": 1, "generate": 4, "rag": 4, "score": 4}
+
+RESULTS_FILE = "qa_results.jsonl"
+PARQUET_FILE = "qa_results.parquet"
+SUMMARY_FILE = "run_summary.json"
+
+
+def parse_workers(spec: str | None) -> dict[str, int]:
+    """Parse ``"generate=8,rag=8"`` into per-stage worker counts."""
+    workers: dict[str, int] = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, sep, value = part.partition("=")
+        name = name.strip().lower()
+        if not sep or name not in STAGE_NAMES:
+            msg = (
+                f"Invalid worker spec {part.strip()!r}; "
+                f"use stage=N with stages: {', '.join(STAGE_NAMES)}"
+            )
+            raise ValueError(msg)
+        try:
+            count = int(value)
+        except ValueError:
+            count = 0
+        if count < 1:
+            msg = f"Worker count for {name} must be a positive integer, got {value.strip()!r}"
+            raise ValueError(msg)
+        workers[name] = count
+    return workers
+
+
+def discover_pdfs(inputs: Sequence[Path]) -> list[Path]:
+    """Expand directories into the PDF files below them, keeping input order."""
+    files: list[Path] = []
+    for path in inputs:
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.pdf")))
+        elif path.is_file():
+            files.append(path)
+        else:
+            msg = f"Path not found: {path}"
+            raise FileNotFoundError(msg)
+    return list(dict.fromkeys(files))
+
+
+@dataclass
+class _Document:
+    source: Path
+    pdf: Path
+    sha256: str
+    text: str = ""
+
+
+@dataclass
+class _Item:
+    source: Path
+    chunk_index: int
+    chunk: str
+    lexical_index: LexicalIndex | None = None
+    result: QAResult | None = None
+
+
+def run_pipeline(
+    inputs: Sequence[Path],
+    output_dir: Path,
+    *,
+    questions_per_file: int | None = None,
+    clean: bool = True,
+    evaluate: bool = True,
+    workers: Mapping[str, int] | None = None,
+    queue_size: int | None = None,
+    on_result: Callable[[QAResult], None] | None = None,
+    progress: ProgressTracker | None = None,
+    seed: int | None = None,
+    reuse: bool = True,
+    output_format: str = "json",
+) -> dict:
+    """Stream PDFs through all stages; results are appended to ``qa_results.jsonl`` as scored.
+
+    Stages run concurrently with their own worker counts and bounded queues
+    (PIPELINE_QUEUE_SIZE), so the first result is written while later documents are
+    still being cleaned and memory stays bounded on large corpora. Without
+    ``evaluate`` the pipeline ends after QA generation. ``progress`` receives per-stage
+    and per-metric counts and queue depths (``rag-med run`` dashboard). Chunks are sampled
+    per document from ``seed`` and the source PDF hash; each document's manifest goes into
+    the summary, and with ``reuse`` QA pairs of a matching stored generation skip the
+    QA LLM. A document's results are saved to the manifest store once its last item is
+    scored and then dropped, and the run history receives results in batches as they
+    arrive. With ``output_format="parquet"`` the results are also converted to
+    ``qa_results.parquet`` in batches once the run ends. Returns the run summary.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        msg = f"Unknown output format {output_format!r}; use one of: {', '.join(OUTPUT_FORMATS)}"
+        raise ValueError(msg)
+    pdfs = discover_pdfs(inputs)
+    if not pdfs:
+        raise ValueError("No PDF files found")
+    n_questions = questions_per_file or settings.num_chunks_to_select
+    if n_questions < 1:
+        raise ValueError("questions_per_file must be >= 1")
+    counts = {
+        **DEFAULT_WORKERS,
+        **parse_workers(getattr(settings, "pipeline_workers", "")),
+        **(workers or {}),
+    }
+    bound = queue_size or getattr(settings, "pipeline_queue_size", 16)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cleaned_dir = output_dir / "cleaned"
+    index_dir = getattr(settings, "lexical_index_dir", None)
+    client = _build_valueai_client() if evaluate else None
+    names = STAGE_NAMES if evaluate else STAGE_NAMES[:4]
+    judge_batcher = _make_judge_batcher() if evaluate else None
+    seed = resolve_seed(seed)
+    store = get_manifest_store(reuse)
+    manifests: list[RunManifest] = []
+    # Manifest of each chunked document, by source path, until all its items are saved
+    open_manifests: dict[str, RunManifest] = {}
+
+    def clean_stage(src: Path) -> Iterator[_Document]:
+        sha256 = file_sha256(src)
+        if not clean:
+            yield _Document(src, src, sha256)
+            return
+        digest = hashlib.sha1(str(src.resolve()).encode("utf-8")).hexdigest()[:8]
+        target = cleaned_dir / f"{src.stem}_{digest}_cleaned.pdf"
+        cleaned_dir.mkdir(parents=True, exist_ok=True)
+        with trace_span("pipeline.clean", pdf=str(src)), profile_stage("pdf_clean"):
+            ok = clean_pdf(src, target)
+        if not ok:
+            logger.warning("Очистка не удалась, используется исходный PDF: %s", src)
+        yield _Document(src, target if ok else src, sha256)
+
+    def extract_stage(doc: _Document) -> Iterator[_Document]:
+        with trace_span("pipeline.extract", pdf=str(doc.source)):
+            doc.text = _read_pdf_text(doc.pdf)
+        logger.info("Загружено %s символов: %s", len(doc.text), doc.source)
+        yield doc
+
+    def chunk_stage(doc: _Document) -> Iterator[_Item]:
+        text_chunks = _split_text_chunks(doc.text)
+        n = min(n_questions, len(text_chunks) // CHUNKS_PER_QA)
+        if n <= 0:
+            logger.warning(
+                "Недостаточно chunk-ов в %s: %s (нужно минимум %s)",
+                doc.source,
+                len(text_chunks),
+                CHUNKS_PER_QA,
+            )
+            return
+        index = None
+        if evaluate:
+            with profile_stage("lexical_index"):
+                index = load_or_build_index(text_chunks, Path(index_dir) if index_dir else None)
+        if progress is not None:
+            for stage in names[names.index("generate") :]:
+                progress.add_total(stage, n)
+        with profile_stage("sampling"):
+            groups = sample_chunk_groups(
+                len(text_chunks), n, CHUNKS_PER_QA, seed=seed, pdf_sha256=doc.sha256
+            )
+        manifest = RunManifest.build(
+            pdf_path=doc.source,
+            pdf_sha256=doc.sha256,
+            seed=seed,
+            chunk_groups=groups,
+            evaluate=evaluate,
+            cleaned=clean,
+        )
+        manifests.append(manifest)
+        open_manifests[str(doc.source)] = manifest
+        stored = store.load_generation(manifest) if store is not None else None
+        if stored is not None:
+            logger.info("Q&A для %s взяты из совпадающей генерации", doc.source)
+        for idx, group in enumerate(groups):
+            chunk = "\n\n".join(text_chunks[i] for i in group)
+            yield _Item(doc.source, idx + 1, chunk, index, stored[idx] if stored else None)
+
+    def generate_stage(item: _Item) -> Iterator[_Item]:
+        if item.result is not None:
+            item.result.source_pdf = str(item.source)
+            yield item
+            return
+        with (
+            trace_span("pipeline.generate", pdf=str(item.source), chunk_index=item.chunk_index),
+            profile_stage("llm:generate"),
+        ):
+            item.result = generate_qa(item.chunk, item.chunk_index)
+        item.result.source_pdf = str(item.source)
+        yield item
+
+    def rag_stage(item: _Item) -> Iterator[_Item]:
+        r = item.result
+        if _generation_failed(r):
+            logger.warning(
+                "Пропуск ValueAI для %s chunk %s: генерация не удалась", item.source, r.chunk_index
+            )
+            r.evaluation_metrics = {"skipped": "generation failed"}
+        else:
+            try:
+                with (
+                    trace_span("eval.rag_answer", chunk_index=r.chunk_index),
+                    profile_stage("llm:rag"),
+                ):
+                    r.valueai_answer = client.ask(r.question)
+            except Exception as e:
+                logger.exception("ValueAI error for question: %s", r.question[:50])
+                r.evaluation_metrics = {"error": str(e)}
+        yield item
+
+    # Metrics of one item run in parallel (at most four per item)
+    metric_pool = ThreadPoolExecutor(
+        max_workers=counts["score"] * 4, thread_name_prefix="pipeline-metric"
+    )
+
+    def score_stage(item: _Item) -> Iterator[_Item]:
+        r = item.result
+        if r.valueai_answer is None:
+            yield item
+            return
+        fns = _item_metric_fns(item.lexical_index, judge_batcher)
+        if progress is not None:
+            fns = {name: progress.wrap(f"metric:{name}", fn) for name, fn in fns.items()}
+        futures = {name: metric_pool.submit(fn, r, r.valueai_answer) for name, fn in fns.items()}
+        outputs: dict = {}
+        error: Exception | None = None
+        for name, fut in futures.items():
+            try:
+                outputs[name] = fut.result()
+            except Exception as e:
+                logger.debug("Metric %s failed", name, exc_info=True)
+                error = error or e
+        if error is not None:
+            logger.error("Metric error for question: %s", r.question[:50], exc_info=error)
+            r.valueai_answer = None
+            r.evaluation_metrics = {"error": str(error)}
+        else:
+            r.evaluation_metrics = _merge_item_metrics(
+                outputs["ragas"], outputs["text"], outputs["llm_judge"], outputs.get("lexical")
+            )
+        yield item
+
+    stage_fns = {
+        "clean": clean_stage,
+        "extract": extract_stage,
+        "chunk": chunk_stage,
+        "generate": generate_stage,
+        "rag": rag_stage,
+        "score": score_stage,
+    }
+    pipeline = StreamingPipeline(
+        [Stage(name, stage_fns[name], workers=counts[name], queue_size=bound) for name in names],
+        tracker=progress,
+    )
+    if progress is not None:
+        for stage in names[: names.index("generate")]:
+            progress.add_total(stage, len(pdfs))
+
+    averaged = _averaged_metrics(with_lexical=evaluate)
+    stats = MetricAggregator(averaged.values())
+    n_results = n_evaluated = 0
+    # Results of documents whose items are still in flight (for the manifest store)
+    by_source: dict[str, list[QAResult]] = {}
+    started = time.perf_counter()
+    first_result_seconds: float | None = None
+    results_file = output_dir / RESULTS_FILE
+    recorder = start_run_recording(
+        kind="run",
+        source=str(output_dir),
+        results_file=results_file,
+        meta={**run_meta(), "seed": seed},
+    )
+
+    def save_document(r: QAResult) -> None:
+        done = by_source.setdefault(r.source_pdf, [])
+        done.append(r)
+        manifest = open_manifests.get(r.source_pdf)
+        if manifest is None or len(done) < manifest.num_questions:
+            return
+        del by_source[r.source_pdf], open_manifests[r.source_pdf]
+        done.sort(key=lambda item: item.chunk_index)
+        if _reusable(done):
+            store.save(manifest, done)
+
+    try:
+        with results_file.open("w", encoding="utf-8") as f:
+            for item in pipeline.run(pdfs):
+                r = item.result
+                if first_result_seconds is None:
+                    first_result_seconds = time.perf_counter() - started
+                with profile_stage("results_write"):
+                    f.write(json.dumps(r.model_dump(), ensure_ascii=False) + "\n")
+                    f.flush()
+                n_results += 1
+                if recorder is not None:
+                    recorder.add(r)
+                if store is not None:
+                    save_document(r)
+                if r.valueai_answer and r.evaluation_metrics:
+                    stats.add(r.evaluation_metrics)
+                    n_evaluated += 1
+                if on_result is not None:
+                    on_result(r)
+    finally:
+        metric_pool.shutdown(wait=True)
+        if judge_batcher is not None:
+            judge_batcher.close()
+
+    summary = {
+        "inputs": [str(p) for p in pdfs],
+        "results_file": str(results_file),
+        "questions_per_file": n_questions,
+        "evaluated": evaluate,
+        "seed": seed,
+        "cleaned": clean,
+        "manifests": [m.to_dict() for m in manifests],
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "first_result_seconds": (
+            round(first_result_seconds, 3) if first_result_seconds is not None else None
+        ),
+        "aggregate_metrics": {
+            "count": n_results,
+            **{name: stats.mean(key) for name, key in averaged.items()},
+            "evaluated_count": n_evaluated,
+            "metric_stats": stats.summary(),
+        },
+        "stages": pipeline.stats(),
+        "queue_size": bound,
+        "chunk_dedup": dedup_stats(),
+    }
+    if evaluate:
+        summary.update(
+            {
+                "metric_cache": metric_cache_stats(),
+                "llm_gating": gate_stats(),
+                "llm_judge": judge_call_stats(),
+                "singleflight": singleflight_stats(),
+                "valueai_latency": get_recorder().snapshot(),
+            }
+        )
+    if output_format == "parquet":
+        parquet_file = output_dir / PARQUET_FILE
+        with profile_stage("results_write"):
+            write_parquet_from_jsonl(results_file, parquet_file)
+        summary["parquet_file"] = str(parquet_file)
+        logger.info("Parquet results saved to: %s", parquet_file)
+    profile = profile_summary()
+    if profile is not None:
+        summary["profile"] = profile
+    summary_file = output_dir / SUMMARY_FILE
+    with summary_file.open("w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    logger.info("Run summary saved to: %s", summary_file)
+    if recorder is not None:
+        recorder.finish(summary_file)
+    summary["summary_file"] = str(summary_file)
+    return summary
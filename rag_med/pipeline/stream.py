@@ -0,0 +1,207 @@
+"""Thread-per-worker streaming pipeline with bounded queues between stages."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from rag_med.tracing import event as trace_event
+
+if TYPE_CHECKING:
+    from rag_med.dashboard import ProgressTracker
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline stage.
+
+    ``fn(item)`` returns an iterable of zero or more outputs for the next stage
+    (a generator is consumed lazily, so backpressure applies between its outputs).
+    ``queue_size`` bounds the queue in front of the stage.
+    """
+
+    name: str
+    fn: Callable[[Any], Iterable[Any]]
+    workers: int = 1
+    queue_size: int = 16
+
+
+@dataclass
+class StageStats:
+    workers: int
+    consumed: int = 0
+    produced: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    max_queue: int = 0
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class StreamingPipeline:
+    """Run stages concurrently; items flow through as soon as a stage yields them.
+
+    Each stage has ``workers`` threads reading its input queue. Queues are bounded,
+    so a slow stage blocks the ones before it instead of letting items pile up in
+    memory. An exception on an item is logged and counted, and that item is dropped.
+    With a ``tracker``, items and queue depths are reported per stage for the dashboard.
+    """
+
+    def __init__(self, stages: Sequence[Stage], tracker: ProgressTracker | None = None):
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        for stage in stages:
+            if stage.workers < 1 or stage.queue_size < 1:
+                raise ValueError(f"stage {stage.name}: workers and queue_size must be >= 1")
+        self.stages = list(stages)
+        self._stats = {s.name: StageStats(workers=s.workers) for s in self.stages}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._tracker = tracker
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "workers": st.workers,
+                    "consumed": st.consumed,
+                    "produced": st.produced,
+                    "errors": st.errors,
+                    "busy_seconds": round(st.busy_seconds, 3),
+                    "max_queue": st.max_queue,
+                }
+                for name, st in self._stats.items()
+            }
+
+    def _put(self, q: queue.Queue, item: object) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue) -> object:
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _feed(self, source: Iterable, out: queue.Queue) -> None:
+        try:
+            for item in source:
+                self._put(out, item)
+        except _Cancelled:
+            return
+        except Exception:
+            logger.exception("Pipeline source failed")
+        try:
+            for _ in range(self.stages[0].workers):
+                self._put(out, _DONE)
+        except _Cancelled:
+            return
+
+    def _work(
+        self,
+        stage: Stage,
+        inbox: queue.Queue,
+        outbox: queue.Queue,
+        next_workers: int,
+        remaining: list[int],
+    ) -> None:
+        stats = self._stats[stage.name]
+        try:
+            while True:
+                with self._lock:
+                    stats.max_queue = max(stats.max_queue, inbox.qsize())
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                with self._lock:
+                    stats.consumed += 1
+                started = time.perf_counter()
+                ok = False
+                if self._tracker is not None:
+                    self._tracker.started(stage.name)
+                try:
+                    for out in stage.fn(item):
+                        self._put(outbox, out)
+                        with self._lock:
+                            stats.produced += 1
+                    ok = True
+                except _Cancelled:
+                    raise
+                except Exception as e:
+                    logger.exception("Pipeline stage %s failed on an item", stage.name)
+                    trace_event("pipeline.item_failed", level="error", stage=stage.name, error=str(e))
+                    with self._lock:
+                        stats.errors += 1
+                finally:
+                    with self._lock:
+                        stats.busy_seconds += time.perf_counter() - started
+                    if self._tracker is not None:
+                        self._tracker.finished(stage.name, ok=ok)
+            # The last worker of a stage closes the next stage's input
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                for _ in range(next_workers):
+                    self._put(outbox, _DONE)
+        except _Cancelled:
+            return
+
+    def run(self, source: Iterable) -> Iterator:
+        """Yield outputs of the last stage as they are produced (stops all stages on exit)."""
+        queues = [queue.Queue(maxsize=s.queue_size) for s in self.stages]
+        queues.append(queue.Queue(maxsize=self.stages[-1].queue_size))
+        if self._tracker is not None:
+            for stage, q in zip(self.stages, queues):
+                self._tracker.watch_queue(stage.name, q.qsize)
+        threads = [
+            threading.Thread(
+                target=self._feed, args=(source, queues[0]), name="pipeline-source", daemon=True
+            )
+        ]
+        for i, stage in enumerate(self.stages):
+            next_workers = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            remaining = [stage.workers]
+            threads.extend(
+                threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[i], queues[i + 1], next_workers, remaining),
+                    name=f"pipeline-{stage.name}-{w}",
+                    daemon=True,
+                )
+                for w in range(stage.workers)
+            )
+        self._stop.clear()
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join()
@@ -0,0 +1,170 @@
+"""Opt-in per-stage profiling (``--profile``): wall/CPU time, cProfile and tracemalloc peaks.
+
+Code marks stages with ``profile_stage("pdf_read")``; without an active profiler that is
+a shared no-op context. CPU time is the calling thread's (``time.thread_time``), so work a
+stage hands to other threads or the RAGAS event loop counts as wall time only. Memory
+peaks use ``tracemalloc.reset_peak`` per stage: exact for sequential stages, a lower
+bound where stages overlap.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+_NULL = nullcontext()
+
+
+@dataclass
+class _StageTimes:
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    wall_max: float = 0.0
+    peak_memory: int | None = None
+
+
+class StageProfiler:
+    """Accumulates per-stage timings; optionally cProfile (per thread) and tracemalloc."""
+
+    def __init__(self, *, pstats_path: Path | None = None, trace_memory: bool = False):
+        self.pstats_path = pstats_path
+        self.trace_memory = trace_memory
+        self._lock = threading.Lock()
+        self._stages: dict[str, _StageTimes] = {}
+        self._profiles: list[cProfile.Profile] = []
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        self._cprofile_skipped = 0
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if self.pstats_path is not None and self._profiles:
+            self.pstats_path.parent.mkdir(parents=True, exist_ok=True)
+            stats = pstats.Stats(self._profiles[0])
+            for profile in self._profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(str(self.pstats_path))
+            logger.info("cProfile stats saved to: %s", self.pstats_path)
+
+    def _thread_profile(self) -> cProfile.Profile:
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        return profile
+
+    def _enable_profile(self) -> cProfile.Profile | None:
+        profile = self._thread_profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active cProfile per process: another thread's
+            # stage is being profiled, so this one is timed without cProfile
+            with self._lock:
+                self._cprofile_skipped += 1
+            return None
+        return profile
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        profile = None
+        wall0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            # cProfile runs only around the outermost stage of each thread
+            if self.pstats_path is not None and depth == 0:
+                profile = self._enable_profile()
+            if self.trace_memory and tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            yield
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.thread_time() - cpu0
+            peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+            if profile is not None:
+                profile.disable()
+            self._local.depth = depth
+            with self._lock:
+                st = self._stages.setdefault(name, _StageTimes())
+                st.calls += 1
+                st.wall += wall
+                st.cpu += cpu
+                st.wall_max = max(st.wall_max, wall)
+                if peak is not None:
+                    st.peak_memory = max(st.peak_memory or 0, peak)
+
+    def summary(self) -> dict:
+        """``{stage: {calls, wall_seconds, cpu_seconds, wall_mean_seconds, ...}}``."""
+        with self._lock:
+            stages = {
+                name: {
+                    "calls": st.calls,
+                    "wall_seconds": round(st.wall, 6),
+                    "cpu_seconds": round(st.cpu, 6),
+                    "wall_mean_seconds": round(st.wall / st.calls, 6) if st.calls else None,
+                    "wall_max_seconds": round(st.wall_max, 6),
+                    **({"peak_memory_bytes": st.peak_memory} if st.peak_memory is not None else {}),
+                }
+                for name, st in sorted(self._stages.items())
+            }
+        return {
+            "stages": stages,
+            "pstats_file": str(self.pstats_path) if self.pstats_path is not None else None,
+            "cprofile_skipped": self._cprofile_skipped,
+            "tracemalloc": self.trace_memory,
+        }
+
+
+_profiler: StageProfiler | None = None
+
+
+def enable_profiling(
+    *, pstats_path: Path | None = None, trace_memory: bool = False
+) -> StageProfiler:
+    """Install a process profiler (replacing the previous one) and start it."""
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+    _profiler = StageProfiler(pstats_path=pstats_path, trace_memory=trace_memory)
+    _profiler.start()
+    return _profiler
+
+
+def disable_profiling() -> None:
+    """Stop the process profiler (writing the pstats file, if any)."""
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+        _profiler = None
+
+
+def profile_stage(name: str) -> AbstractContextManager:
+    """Time the block as stage ``name`` when profiling is on."""
+    profiler = _profiler
+    return profiler.stage(name) if profiler is not None else _NULL
+
+
+def profile_summary() -> dict | None:
+    """Breakdown for run summaries, or None when profiling is off."""
+    profiler = _profiler
+    return profiler.summary() if profiler is not None else None
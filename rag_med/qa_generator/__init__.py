@@ -1,5 +1,22 @@
 """QA generator module for generating clinical questions and answers from PDF."""
 
-from .generator import generate_qa, generate_qa_from_pdf
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .generator import generate_qa, generate_qa_from_pdf
 
 __all__ = ["generate_qa", "generate_qa_from_pdf"]
+
+
+def __getattr__(name: str) -> object:
+    # The generator (pypdf, text splitters, ValueAI clients) loads on first use, so
+    # ``qa_generator.models`` stays cheap to import
+    if name in __all__:
+        value = getattr(import_module(".generator", __name__), name)
+        globals()[name] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,118 @@
+"""Near-duplicate chunk filter (MinHash over word shingles, LSH banding).
+
+Overlapping splits and guideline sections that repeat the same dosing tables produce
+chunks that are almost identical; sampled together they yield redundant questions.
+Each chunk gets a MinHash signature of its word ``shingle_size``-grams, signatures are
+bucketed by LSH bands, and only chunks sharing a bucket are compared, so the filter
+stays near-linear in the number of chunks. Of a group of near-duplicates the first
+chunk is kept.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import zlib
+from collections.abc import Sequence
+
+_WORD_RE = re.compile(r"\w+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_STATS_LOCK = threading.Lock()
+_STATS = {"documents": 0, "chunks": 0, "dropped": 0}
+
+
+def _shingle_hashes(text: str, shingle_size: int):
+    import numpy as np
+
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    n = max(1, len(words) - shingle_size + 1)
+    shingles = {" ".join(words[i : i + shingle_size]) for i in range(n)}
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+
+
+def minhash_signatures(
+    texts: Sequence[str], *, num_perm: int = 128, shingle_size: int = 5, seed: int = 1
+):
+    """``(len(texts), num_perm)`` MinHash matrix; texts without words get all-max rows."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    signatures = np.full((len(texts), num_perm), _MAX_HASH, dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hashes = _shingle_hashes(text, shingle_size)
+        if hashes.size:
+            # Universal hashing (a*x + b) mod p; the uint64 product wraps, which is fine here
+            permuted = (np.outer(hashes, a) + b) % _MERSENNE_PRIME & _MAX_HASH
+            signatures[i] = permuted.min(axis=0)
+    return signatures
+
+
+def lsh_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """``(bands, rows)`` with ``bands * rows == num_perm`` whose S-curve midpoint
+    ``(1 / bands) ** (1 / rows)`` is closest to ``threshold``."""
+    pairs = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+    return min(pairs, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+def near_duplicates(
+    texts: Sequence[str],
+    threshold: float,
+    *,
+    num_perm: int = 128,
+    shingle_size: int = 5,
+) -> list[int]:
+    """Indices of texts whose estimated Jaccard similarity to an earlier kept text is
+    at least ``threshold``."""
+    if len(texts) < 2:
+        return []
+    signatures = minhash_signatures(texts, num_perm=num_perm, shingle_size=shingle_size)
+    bands, rows = lsh_bands(num_perm, threshold)
+    buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+    dropped = []
+    for i, signature in enumerate(signatures):
+        if (signature == _MAX_HASH).all():
+            continue
+        keys = [signature[band * rows : (band + 1) * rows].tobytes() for band in range(bands)]
+        candidates = {j for band, key in enumerate(keys) for j in buckets[band].get(key, ())}
+        if any((signatures[j] == signature).mean() >= threshold for j in candidates):
+            dropped.append(i)
+            continue
+        for band, key in enumerate(keys):
+            buckets[band].setdefault(key, []).append(i)
+    return dropped
+
+
+def drop_near_duplicates(
+    chunks: list[str],
+    threshold: float,
+    *,
+    num_perm: int = 128,
+    shingle_size: int = 5,
+) -> list[str]:
+    """``chunks`` without near-duplicates (order kept); counted in ``dedup_stats``."""
+    dropped = set(near_duplicates(chunks, threshold, num_perm=num_perm, shingle_size=shingle_size))
+    with _STATS_LOCK:
+        _STATS["documents"] += 1
+        _STATS["chunks"] += len(chunks)
+        _STATS["dropped"] += len(dropped)
+    return [c for i, c in enumerate(chunks) if i not in dropped]
+
+
+def dedup_stats() -> dict:
+    """Chunks seen and dropped as near-duplicates in this process, for run summaries."""
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def reset_dedup_stats() -> None:
+    with _STATS_LOCK:
+        for key in _STATS:
+            _STATS[key] = 0
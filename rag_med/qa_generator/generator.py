@@ -2,22 +2,53 @@
 
 import json
 import logging
-import random
 import sys
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pypdf import PdfReader
 
 from configs.settings import settings
-from rag_med.valueai.llm_api_client import get_token, predict_sync
+from rag_med.valueai.journal import get_default_journal
+from rag_med.valueai.llm_api_client import get_cached_token, predict_sync
+from rag_med.valueai.singleflight import singleflight_stats
+from rag_med.valueai.telemetry import get_recorder
+from rag_med.evaluation.batching import MicroBatcher
+from rag_med.evaluation.cache import metric_cache_stats
+from rag_med.evaluation.executor import EvaluationExecutor
 from rag_med.evaluation.metrics import (
     compare_two_answers,
     evaluate_answer_pair_llm_alignment,
     evaluate_answer_pair_ragas_extended,
+    evaluate_answer_pairs_llm_alignment_batch,
+    gate_stats,
+    judge_call_stats,
+    lexical_similarity,
 )
+from rag_med.evaluation.lexical_index import LexicalIndex, load_or_build_index
+from rag_med.evaluation.stats import AVERAGED_METRICS, MetricAggregator
 from rag_med.valueai.client import ValueAIRagClient, ValueAIRagClientConfig
-
+from rag_med.results_store import record_run, run_meta
+from rag_med.profiling import profile_stage, profile_summary
+from rag_med.tracing import event as trace_event
+from rag_med.tracing import span as trace_span
+
+from rag_med.qa_generator.dedup import dedup_stats, drop_near_duplicates
+from rag_med.qa_generator.manifest import (
+    ReusedRun,
+    RunManifest,
+    file_sha256,
+    get_manifest_store,
+    resolve_seed,
+    sample_chunk_groups,
+)
 from rag_med.qa_generator.models import QAResult
+from rag_med.qa_generator.output import write_results
+
+if TYPE_CHECKING:
+    from rag_med.dashboard import ProgressTracker
 
 logger = logging.getLogger(__name__)
 
@@ -95,10 +126,11 @@ def generate_qa(chunk: str, chunk_index: int = 1) -> QAResult:
     model_used = getattr(settings, "metrics_llm_model_name", "llm_qwen_2_5_coder_32b_instruct_q8")
     try:
         base_url = (getattr(settings, "valueai_base_url", None) or "").rstrip("/")
-        token = get_token(
+        token = get_cached_token(
             base_url,
             getattr(settings, "valueai_username", "") or "",
             getattr(settings, "valueai_password", "") or "",
+            getattr(settings, "valueai_token_ttl_seconds", 0),
         )
         generated_text = predict_sync(
             base_url,
@@ -109,6 +141,7 @@ def generate_qa(chunk: str, chunk_index: int = 1) -> QAResult:
             temperature=getattr(settings, "temperature", 0.7),
             poll_interval=getattr(settings, "metrics_llm_poll_interval_seconds", 2.0),
             timeout=getattr(settings, "metrics_llm_timeout_seconds", 120.0),
+            journal=get_default_journal(),
         )
 
         
@@ -162,6 +195,7 @@ def generate_qa(chunk: str, chunk_index: int = 1) -> QAResult:
 
     except Exception as e:
         logger.exception("Ошибка при вызове LLM (ValueAI)")
+        trace_event("qa.generate_failed", level="error", chunk_index=chunk_index, error=str(e)[:200])
         generated_text = f"Ошибка: модель не ответила - {e!s}"
         question = "Ошибка"
         answer = "Ошибка"
@@ -220,7 +254,116 @@ def _build_valueai_client() -> ValueAIRagClient:
         poll_interval_seconds=settings.valueai_poll_interval_seconds,
         timeout_seconds=settings.valueai_timeout_seconds,
     )
-    return ValueAIRagClient(config)
+    return ValueAIRagClient(config, journal=get_default_journal())
+
+
+def _generation_failed(r: QAResult) -> bool:
+    return (
+        not r.question
+        or not r.answer
+        or r.question.strip() == "Ошибка"
+        or r.answer.strip() == "Ошибка"
+        or "Ошибка при вызове" in (r.answer or "")
+        or "модель не ответила" in (r.raw_model_output or "")
+    )
+
+
+def _merge_item_metrics(
+    ragas: dict, text_metrics: dict, llm_judge: dict, lexical: dict | None = None
+) -> dict:
+    """Flatten per-metric outputs into the ``evaluation_metrics`` layout of QAResult."""
+    metrics: dict = {}
+    metrics["ragas_faithfulness"] = ragas.get("faithfulness")
+    if ragas.get("error") is not None:
+        metrics["ragas_error"] = ragas["error"]
+
+    metrics["cosine_similarity"] = text_metrics.get("cosine_similarity")
+    for key in ("token_f1", "rouge_l", "char_ngram_f1"):
+        if key in text_metrics:
+            metrics[key] = text_metrics[key]
+    metrics["factual_correctness"] = text_metrics.get("factual_correctness")
+    if text_metrics.get("factual_error") is not None:
+        metrics["factual_error"] = text_metrics["factual_error"]
+    if text_metrics.get("factual_gate") is not None:
+        metrics["factual_gate"] = text_metrics["factual_gate"]
+    if lexical is not None:
+        metrics["tfidf_cosine"] = lexical.get("tfidf_cosine")
+        metrics["bm25_similarity"] = lexical.get("bm25_similarity")
+
+    metrics["llm_alignment_score"] = llm_judge.get("alignment_score")
+    metrics["llm_alignment_comment"] = llm_judge.get("alignment_comment")
+    if llm_judge.get("alignment_error") is not None:
+        metrics["llm_alignment_error"] = llm_judge["alignment_error"]
+    if llm_judge.get("alignment_gate") is not None:
+        metrics["llm_alignment_gate"] = llm_judge["alignment_gate"]
+    return metrics
+
+
+def _averaged_metrics(*, with_lexical: bool) -> dict[str, str]:
+    """Summary average name -> per-item metric key."""
+    averaged = dict(AVERAGED_METRICS)
+    if with_lexical:
+        averaged["avg_tfidf_cosine"] = "tfidf_cosine"
+        averaged["avg_bm25_similarity"] = "bm25_similarity"
+    return averaged
+
+
+def _make_judge_batcher() -> MicroBatcher | None:
+    """With LLM_JUDGE_BATCH_SIZE > 1 concurrent items share one judge request."""
+    judge_batch_size = getattr(settings, "llm_judge_batch_size", 1)
+    if judge_batch_size <= 1:
+        return None
+    return MicroBatcher(
+        evaluate_answer_pairs_llm_alignment_batch,
+        max_batch=judge_batch_size,
+        max_wait=getattr(settings, "llm_judge_batch_wait_seconds", 2.0),
+        name="judge-batch",
+    )
+
+
+def _item_metric_fns(
+    lexical_index: LexicalIndex | None = None, judge_batcher: MicroBatcher | None = None
+) -> dict[str, Callable[[QAResult, str], dict]]:
+    """Independent per-item metrics ``fn(result, valueai_answer)``, merged by _merge_item_metrics."""
+
+    # RAGAS (etalon = context, ValueAI = response)
+    def ragas_metric(r: QAResult, valueai_answer: str) -> dict:
+        with trace_span("eval.ragas", chunk_index=r.chunk_index), profile_stage("metric:ragas"):
+            return evaluate_answer_pair_ragas_extended(
+                question=r.question,
+                response=valueai_answer,
+                retrieved_contexts=[r.answer],
+                reference_answer=None,
+            )
+
+    def text_metric(r: QAResult, valueai_answer: str) -> dict:
+        with profile_stage("metric:text"):
+            return compare_two_answers(reference=r.answer, candidate=valueai_answer)
+
+    def lexical_metric(r: QAResult, valueai_answer: str) -> dict:
+        with profile_stage("metric:lexical"):
+            return lexical_similarity(r.answer, valueai_answer, lexical_index)
+
+    # LLM judge (1–10) RAG vs etalon
+    def judge_metric(r: QAResult, valueai_answer: str) -> dict:
+        batched = judge_batcher is not None
+        with (
+            trace_span("eval.llm_judge", chunk_index=r.chunk_index, batched=batched),
+            profile_stage("metric:llm_judge"),
+        ):
+            if judge_batcher is not None:
+                return judge_batcher.submit((r.question, r.answer, valueai_answer, r.chunk or ""))
+            return evaluate_answer_pair_llm_alignment(
+                question=r.question,
+                etalon_answer=r.answer,
+                rag_answer=valueai_answer,
+                context=(r.chunk or ""),
+            )
+
+    fns = {"ragas": ragas_metric, "text": text_metric, "llm_judge": judge_metric}
+    if lexical_index is not None:
+        fns["lexical"] = lexical_metric
+    return fns
 
 
 def _run_valueai_evaluation(
@@ -229,106 +372,147 @@ def _run_valueai_evaluation(
     num_questions: int,
     output_file: Path,
     summary_file: Path | None,
-) -> None:
-    """Run ValueAI RAG evaluation on results and write summary."""
+    lexical_index: LexicalIndex | None = None,
+    progress: "ProgressTracker | None" = None,
+    manifest: RunManifest | None = None,
+) -> dict:
+    """Run ValueAI RAG evaluation on results, write the summary and return it.
+
+    Items are evaluated concurrently (EVAL_MAX_CONCURRENT_ITEMS); per item the RAG
+    answer comes first, then RAGAS, text metrics and the LLM judge run in parallel.
+    With ``lexical_index`` the corpus-weighted TF-IDF/BM25 similarities are added too.
+    ``progress`` counts RAG answers and each metric for the live dashboard.
+    """
     client = _build_valueai_client()
-    aggregate = {
-        "count": len(results),
-        "avg_faithfulness": 0.0,
-        "avg_cosine_similarity": 0.0,
-        "avg_factual_correctness": 0.0,
-        "avg_llm_alignment_score": 0.0,
-    }
-    sum_faith = 0.0
-    sum_cos = 0.0
-    sum_factual = 0.0
-    sum_alignment = 0.0
+    averaged = _averaged_metrics(with_lexical=lexical_index is not None)
+    # Averages skip items where a metric is missing; spread and CIs go to metric_stats
+    stats = MetricAggregator(averaged.values())
     n_evaluated = 0
 
-    for r in results:
-        
-        if (not r.question or not r.answer or
-                r.question.strip() == "Ошибка" or r.answer.strip() == "Ошибка" or
-                "Ошибка при вызове" in (r.answer or "") or "модель не ответила" in (r.raw_model_output or "")):
+    def rag_answer(r: QAResult) -> str:
+        with trace_span("eval.rag_answer", chunk_index=r.chunk_index), profile_stage("llm:rag"):
+            return client.ask(r.question)
+
+    judge_batcher = _make_judge_batcher()
+    executor = EvaluationExecutor(
+        max_concurrent_items=getattr(settings, "eval_max_concurrent_items", 4)
+    )
+    item_metrics = _item_metric_fns(lexical_index, judge_batcher)
+    if progress is not None:
+        n_items = sum(1 for r in results if not _generation_failed(r))
+        for stage in ("rag", *(f"metric:{name}" for name in item_metrics)):
+            progress.add_total(stage, n_items)
+        rag_answer = progress.wrap("rag", rag_answer)
+        item_metrics = {
+            name: progress.wrap(f"metric:{name}", fn) for name, fn in item_metrics.items()
+        }
+    try:
+        outcomes = executor.run(
+            results, prepare=rag_answer, metrics=item_metrics, skip=_generation_failed
+        )
+    finally:
+        if judge_batcher is not None:
+            judge_batcher.close()
+
+    for r, outcome in zip(results, outcomes):
+        if outcome is None:
             logger.warning("Пропуск ValueAI для chunk %s: генерация не удалась", r.chunk_index)
             r.valueai_answer = None
             r.evaluation_metrics = {"skipped": "generation failed"}
             continue
-        try:
-            valueai_answer = client.ask(r.question)
-            metrics: dict = {}
-
-            # RAGAS (etalon = context, ValueAI = response)
-            ragas = evaluate_answer_pair_ragas_extended(
-                question=r.question,
-                response=valueai_answer,
-                retrieved_contexts=[r.answer],
-                reference_answer=None,
+        if outcome.error is not None:
+            logger.error(
+                "ValueAI error for question: %s", r.question[:50], exc_info=outcome.error
             )
-            metrics["ragas_faithfulness"] = ragas.get("faithfulness")
-            if ragas.get("error") is not None:
-                metrics["ragas_error"] = ragas["error"]
-
-            
-            text_metrics = compare_two_answers(reference=r.answer, candidate=valueai_answer)
-            metrics["cosine_similarity"] = text_metrics.get("cosine_similarity")
-            metrics["factual_correctness"] = text_metrics.get("factual_correctness")
-            if text_metrics.get("factual_error") is not None:
-                metrics["factual_error"] = text_metrics["factual_error"]
-
-            # LLM judge (1–10) RAG vs etalon
-            llm_judge = evaluate_answer_pair_llm_alignment(
-                question=r.question,
-                etalon_answer=r.answer,
-                rag_answer=valueai_answer,
-                context=(r.chunk or ""),
+            trace_event(
+                "eval.item_failed",
+                level="error",
+                chunk_index=r.chunk_index,
+                error=str(outcome.error)[:200],
             )
-            metrics["llm_alignment_score"] = llm_judge.get("alignment_score")
-            metrics["llm_alignment_comment"] = llm_judge.get("alignment_comment")
-            if llm_judge.get("alignment_error") is not None:
-                metrics["llm_alignment_error"] = llm_judge["alignment_error"]
-
-            r.valueai_answer = valueai_answer
-            r.evaluation_metrics = metrics
-
-            v_faith = metrics.get("ragas_faithfulness")
-            if v_faith is not None:
-                sum_faith += float(v_faith)
-            v_cos = metrics.get("cosine_similarity")
-            if v_cos is not None:
-                sum_cos += float(v_cos)
-            v_factual = metrics.get("factual_correctness")
-            if v_factual is not None:
-                sum_factual += float(v_factual)
-            v_align = metrics.get("llm_alignment_score")
-            if v_align is not None:
-                sum_alignment += float(v_align)
-            n_evaluated += 1
-        except Exception as e:  # noqa: PERF203
-            logger.exception("ValueAI error for question: %s", r.question[:50])
             r.valueai_answer = None
-            r.evaluation_metrics = {"error": str(e)}
-
-    if results and n_evaluated > 0:
-        n = n_evaluated
-        aggregate["avg_faithfulness"] = sum_faith / n
-        aggregate["avg_cosine_similarity"] = sum_cos / n
-        aggregate["avg_factual_correctness"] = sum_factual / n
-        aggregate["avg_llm_alignment_score"] = sum_alignment / n
-    aggregate["evaluated_count"] = n_evaluated
-
-    if summary_file is None:
-        summary_file = output_file.with_name(f"{output_file.stem}_valueai_eval.json")
+            r.evaluation_metrics = {"error": str(outcome.error)}
+            continue
+
+        metrics = _merge_item_metrics(
+            outcome.metrics["ragas"],
+            outcome.metrics["text"],
+            outcome.metrics["llm_judge"],
+            outcome.metrics.get("lexical"),
+        )
+        r.valueai_answer = outcome.prepared
+        r.evaluation_metrics = metrics
+        stats.add(metrics)
+        n_evaluated += 1
+
+    aggregate = {
+        "count": len(results),
+        **{name: stats.mean(key) for name, key in averaged.items()},
+        "evaluated_count": n_evaluated,
+        "metric_stats": stats.summary(),
+    }
+
+    summary_file = _eval_summary_path(output_file, summary_file)
     summary_payload = {
         "pdf_path": str(pdf_path),
         "num_questions": num_questions,
         "aggregate_metrics": aggregate,
+        "metric_cache": metric_cache_stats(),
+        "llm_gating": gate_stats(),
+        "llm_judge": judge_call_stats(),
+        "chunk_dedup": dedup_stats(),
+        "singleflight": singleflight_stats(),
+        "valueai_latency": get_recorder().snapshot(),
     }
+    if manifest is not None:
+        summary_payload["manifest"] = manifest.to_dict()
+    with profile_stage("results_write"):
+        write_results(results, output_file)
+    profile = profile_summary()
+    if profile is not None:
+        summary_payload["profile"] = profile
     with summary_file.open("w", encoding="utf-8") as f:
         json.dump(summary_payload, f, ensure_ascii=False, indent=2)
     logger.info("ValueAI evaluation summary saved to: %s", summary_file)
-    with output_file.open("w", encoding="utf-8") as f:
-        json.dump([r.model_dump() for r in results], f, ensure_ascii=False, indent=2)
+    prom_file = summary_file.with_suffix(".prom")
+    prom_file.write_text(get_recorder().to_prometheus(), encoding="utf-8")
+    logger.info("ValueAI latency metrics (Prometheus) saved to: %s", prom_file)
+    return summary_payload
+
+
+def _read_pdf_text(pdf_path: Path) -> str:
+    with profile_stage("pdf_read"):
+        reader = PdfReader(pdf_path)
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _split_text_chunks(text: str) -> list[str]:
+    """Split text into chunks longer than MIN_CHUNK_WORDS words, without near-duplicates.
+
+    Chunks whose estimated Jaccard similarity to an earlier chunk reaches
+    CHUNK_DEDUP_THRESHOLD are dropped (see ``qa_generator.dedup``).
+    """
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.chunk_size,
+        chunk_overlap=settings.chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""],
+    )
+    with profile_stage("split"):
+        chunks = text_splitter.split_text(text)
+    logger.info(f"Создано {len(chunks)} chunk-ов")
+    chunks = [c for c in chunks if len(c.strip().split()) > settings.min_chunk_words]
+    threshold = getattr(settings, "chunk_dedup_threshold", None)
+    if threshold:
+        with profile_stage("dedup"):
+            kept = drop_near_duplicates(
+                chunks, threshold, num_perm=getattr(settings, "chunk_dedup_num_perm", 128)
+            )
+        if len(kept) < len(chunks):
+            dropped = len(chunks) - len(kept)
+            logger.info("Удалено %s почти повторяющихся chunk-ов (порог %s)", dropped, threshold)
+        chunks = kept
+    return chunks
 
 
 def generate_qa_from_pdf(
@@ -338,7 +522,16 @@ def generate_qa_from_pdf(
     num_questions: int | None = None,
     evaluate_with_valueai: bool = False,
     summary_file: Path | None = None,
+    progress: "ProgressTracker | None" = None,
+    seed: int | None = None,
+    reuse: bool = True,
 ) -> list[QAResult]:
+    """Generate QA pairs from ``num_questions`` seeded groups of chunks, optionally evaluated.
+
+    The run manifest (PDF hash, settings, seed, chunk groups, models) is written next
+    to ``output_file``. With ``reuse`` a run whose manifest matches a stored one
+    (MANIFEST_DIR) returns the stored results; a matching generation skips the QA LLM.
+    """
     if not pdf_path.exists():
         msg = f"PDF файл не найден: {pdf_path}"
         raise FileNotFoundError(msg)
@@ -348,20 +541,10 @@ def generate_qa_from_pdf(
         getattr(settings, "metrics_llm_model_name", "llm_qwen_2_5_coder_32b_instruct_q8"),
     )
     logger.info(f"Чтение PDF: {pdf_path}")
-    reader = PdfReader(pdf_path)
-    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    text = _read_pdf_text(pdf_path)
     logger.info(f"Загружено {len(text)} символов")
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=settings.chunk_size,
-        chunk_overlap=settings.chunk_overlap,
-        length_function=len,
-        separators=["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""],
-    )
-    chunks = text_splitter.split_text(text)
-    logger.info(f"Создано {len(chunks)} chunk-ов")
-
-    text_chunks = [c for c in chunks if len(c.strip().split()) > settings.min_chunk_words]
+    text_chunks = _split_text_chunks(text)
 
     
     max_questions = len(text_chunks) // CHUNKS_PER_QA
@@ -381,31 +564,46 @@ def generate_qa_from_pdf(
         raise ValueError(msg)
 
     
-    n_chunks_needed = num_questions * CHUNKS_PER_QA
-    selected_chunks = random.sample(text_chunks, n_chunks_needed)
-
-    results = []
-    for idx in range(num_questions):
-        group = selected_chunks[idx * CHUNKS_PER_QA : (idx + 1) * CHUNKS_PER_QA]
-        combined_chunk = "\n\n".join(group)
-        logger.info(
-            f"Обработка группы {idx + 1}/{num_questions} (4 chunk-а, "
-            f"{len(combined_chunk)} символов, {len(combined_chunk.split())} слов)..."
+    seed = resolve_seed(seed)
+    pdf_sha256 = file_sha256(pdf_path)
+    with profile_stage("sampling"):
+        groups = sample_chunk_groups(
+            len(text_chunks), num_questions, CHUNKS_PER_QA, seed=seed, pdf_sha256=pdf_sha256
         )
-        result = generate_qa(combined_chunk, idx + 1)
-        results.append(result)
-
+    manifest = RunManifest.build(
+        pdf_path=pdf_path,
+        pdf_sha256=pdf_sha256,
+        seed=seed,
+        chunk_groups=groups,
+        evaluate=evaluate_with_valueai,
+    )
     if output_file is None:
         output_file = Path("qa_result.json")
+    manifest_file = output_file.with_name(f"{output_file.stem}_manifest.json")
+    manifest_file.write_text(
+        json.dumps(manifest.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    logger.info("Seed %s, manifest %s: %s", seed, manifest.key[:12], manifest_file)
+
+    store = get_manifest_store(reuse)
+    reused = store.load_run(manifest) if store is not None else None
+    if reused is not None and (reused.summary is not None or not evaluate_with_valueai):
+        logger.info("Результаты взяты из совпадающего прогона %s", manifest.key[:12])
+        results = _write_reused_run(reused, output_file, summary_file, evaluate_with_valueai)
+        _record_generate_run(
+            results, pdf_path, output_file, summary_file, evaluate_with_valueai, manifest, True
+        )
+        return results
+
+    results = store.load_generation(manifest) if store is not None else None
+    if results is not None:
+        logger.info("Q&A взяты из совпадающей генерации %s", manifest.generation_key[:12])
+    else:
+        results = _generate_groups(text_chunks, groups, progress)
 
     
-    with output_file.open("w", encoding="utf-8") as f:
-        json.dump(
-            [r.model_dump() for r in results],
-            f,
-            ensure_ascii=False,
-            indent=2,
-        )
+    with profile_stage("results_write"):
+        write_results(results, output_file)
 
     logger.info(f"Готово! Результаты сохранены в: {output_file}")
 
@@ -416,12 +614,106 @@ def generate_qa_from_pdf(
         logger.info(f"Ответ: {r.answer}")
 
     if evaluate_with_valueai:
-        _run_valueai_evaluation(
+        index_dir = getattr(settings, "lexical_index_dir", None)
+        with profile_stage("lexical_index"):
+            index = load_or_build_index(text_chunks, Path(index_dir) if index_dir else None)
+        summary = _run_valueai_evaluation(
             results=results,
             pdf_path=pdf_path,
             num_questions=num_questions,
             output_file=output_file,
             summary_file=summary_file,
+            lexical_index=index,
+            progress=progress,
+            manifest=manifest,
+        )
+        if store is not None and _reusable(results):
+            store.save(manifest, results, summary)
+    elif store is not None and _reusable(results):
+        store.save(manifest, results)
+
+    _record_generate_run(
+        results, pdf_path, output_file, summary_file, evaluate_with_valueai, manifest, False
+    )
+    return results
+
+
+def _record_generate_run(
+    results: list[QAResult],
+    pdf_path: Path,
+    output_file: Path,
+    summary_file: Path | None,
+    evaluated: bool,
+    manifest: RunManifest,
+    reused: bool,
+) -> None:
+    record_run(
+        results,
+        kind="generate",
+        source=str(pdf_path),
+        results_file=output_file,
+        summary_file=_eval_summary_path(output_file, summary_file) if evaluated else None,
+        meta=run_meta(manifest=manifest.to_dict()),
+        reused=reused,
+    )
+
+
+def _eval_summary_path(output_file: Path, summary_file: Path | None) -> Path:
+    if summary_file is not None:
+        return summary_file
+    return output_file.with_name(f"{output_file.stem}_valueai_eval.json")
+
+
+def _reusable(results: list[QAResult]) -> bool:
+    """Failed generations and evaluation errors are retried, not stored for reuse."""
+    return not any(_generation_failed(r) or _evaluation_failed(r) for r in results)
+
+
+def _evaluation_failed(result: QAResult) -> bool:
+    """An evaluation error (``error`` or a scorer's ``*_error``) or a missing averaged score."""
+    metrics = result.evaluation_metrics
+    if not metrics:
+        return False
+    if any(key == "error" or key.endswith("_error") for key in metrics):
+        return True
+    return any(metrics.get(key) is None for key in AVERAGED_METRICS.values())
+
+
+def _generate_groups(
+    text_chunks: list[str],
+    groups: list[list[int]],
+    progress: "ProgressTracker | None" = None,
+) -> list[QAResult]:
+    if progress is not None:
+        progress.add_total("generate", len(groups))
+    results = []
+    for idx, group in enumerate(groups):
+        combined_chunk = "\n\n".join(text_chunks[i] for i in group)
+        logger.info(
+            f"Обработка группы {idx + 1}/{len(groups)} (4 chunk-а, "
+            f"{len(combined_chunk)} символов, {len(combined_chunk.split())} слов)..."
         )
+        with profile_stage("llm:generate"):
+            if progress is not None:
+                with progress.track("generate"):
+                    result = generate_qa(combined_chunk, idx + 1)
+            else:
+                result = generate_qa(combined_chunk, idx + 1)
+        results.append(result)
+    return results
+
 
-    return results
\ No newline at end of file
+def _write_reused_run(
+    reused: ReusedRun, output_file: Path, summary_file: Path | None, evaluated: bool
+) -> list[QAResult]:
+    """Write the stored results (and summary) of an identical run to this run's outputs."""
+    write_results(reused.results, output_file)
+    logger.info(f"Готово! Результаты сохранены в: {output_file}")
+    if evaluated and reused.summary is not None:
+        summary_file = _eval_summary_path(output_file, summary_file)
+        summary_file.write_text(
+            json.dumps({**reused.summary, "reused": True}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        logger.info("ValueAI evaluation summary saved to: %s", summary_file)
+    return reused.results
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""Seeded chunk sampling and content-addressed run manifests.
+
+A manifest records everything that decides a run's output: PDF hash, the settings
+that affect generation and evaluation, the seed, the selected chunk groups and the
+model names. Runs with the same manifest key are interchangeable, so ManifestStore
+hands back their QA pairs (and evaluated results) instead of recomputing them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import random
+import secrets
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from configs.settings import settings
+from rag_med.qa_generator.models import QAResult
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+# Settings that change which chunks exist or what the QA model produces
+GENERATION_SETTINGS = (
+    "chunk_size",
+    "chunk_overlap",
+    "min_chunk_words",
+    "chunk_dedup_threshold",
+    "chunk_dedup_num_perm",
+    "temperature",
+    "max_tokens",
+    "metrics_llm_model_name",
+)
+# Settings that change RAG answers or scores
+EVALUATION_SETTINGS = (
+    "valueai_rag_id",
+    "valueai_model_name",
+    "valueai_instructions",
+    "ragas_max_tokens",
+    "eval_gate_enabled",
+    "eval_gate_identical_threshold",
+    "eval_gate_disjoint_threshold",
+    "llm_judge_batch_size",
+)
+
+
+def _sha256_json(value: object) -> str:
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def resolve_seed(seed: int | None) -> int:
+    """``seed``, else QA_SEED, else a fresh random seed (recorded so the run can be repeated)."""
+    if seed is None:
+        seed = getattr(settings, "qa_seed", None)
+    if seed is None:
+        seed = secrets.randbelow(2**31)
+        logger.info("Seed не задан, используется случайный: %s (--seed %s для повтора)", seed, seed)
+    return seed
+
+
+def sample_chunk_groups(
+    n_chunks: int, n_groups: int, group_size: int, *, seed: int, pdf_sha256: str
+) -> list[list[int]]:
+    """Pick ``n_groups`` disjoint groups of chunk indices, determined by seed and PDF."""
+    rng = random.Random(f"{seed}:{pdf_sha256}")
+    picked = rng.sample(range(n_chunks), n_groups * group_size)
+    return [picked[i * group_size : (i + 1) * group_size] for i in range(n_groups)]
+
+
+def settings_fingerprint(names: tuple[str, ...]) -> str:
+    return _sha256_json({name: getattr(settings, name, None) for name in names})[:16]
+
+
+def _evaluation_fingerprint() -> str:
+    from rag_med.evaluation.metrics import METRIC_VERSIONS, metric_version
+
+    versions = {name: metric_version(name) for name in METRIC_VERSIONS}
+    if getattr(settings, "llm_judge_batch_size", 1) > 1:
+        versions["llm_alignment_batch"] = metric_version("llm_alignment_batch")
+    return _sha256_json([settings_fingerprint(EVALUATION_SETTINGS), versions])[:16]
+
+
+@dataclass(frozen=True)
+class RunManifest:
+    pdf_sha256: str
+    seed: int
+    num_questions: int
+    chunk_groups: list[list[int]]
+    generation_settings: str
+    models: dict[str, str | int]
+    evaluation_settings: str | None = None
+    cleaned: bool = False
+    version: int = MANIFEST_VERSION
+    pdf_path: str | None = field(default=None, compare=False)
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        pdf_path: Path,
+        pdf_sha256: str,
+        seed: int,
+        chunk_groups: list[list[int]],
+        evaluate: bool,
+        cleaned: bool = False,
+    ) -> RunManifest:
+        models: dict[str, str | int] = {
+            "qa": getattr(settings, "metrics_llm_model_name", ""),
+        }
+        if evaluate:
+            models.update(
+                {
+                    "rag": getattr(settings, "valueai_model_name", ""),
+                    "rag_id": getattr(settings, "valueai_rag_id", 0),
+                    "metrics": getattr(settings, "metrics_llm_model_name", ""),
+                }
+            )
+        return cls(
+            pdf_sha256=pdf_sha256,
+            seed=seed,
+            num_questions=len(chunk_groups),
+            chunk_groups=chunk_groups,
+            generation_settings=settings_fingerprint(GENERATION_SETTINGS),
+            models=models,
+            evaluation_settings=_evaluation_fingerprint() if evaluate else None,
+            cleaned=cleaned,
+            pdf_path=str(pdf_path),
+        )
+
+    def _identity(self) -> dict:
+        data = asdict(self)
+        data.pop("pdf_path")
+        return data
+
+    @property
+    def key(self) -> str:
+        """Content address of the whole run (generation and evaluation)."""
+        return _sha256_json(self._identity())[:32]
+
+    @property
+    def generation_key(self) -> str:
+        """Content address of the QA pairs alone (evaluation fields excluded)."""
+        data = self._identity()
+        data.pop("evaluation_settings")
+        data["models"] = {"qa": self.models.get("qa")}
+        return _sha256_json(data)[:32]
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "key": self.key, "generation_key": self.generation_key}
+
+
+@dataclass
+class ReusedRun:
+    results: list[QAResult]
+    summary: dict | None = None
+
+
+class ManifestStore:
+    """Results of finished runs under ``root``, addressed by manifest key.
+
+    ``<key>/`` holds the manifest, the results and (evaluated runs) the summary;
+    ``generation/<generation_key>.json`` holds the QA pairs without evaluation, so an
+    evaluated run can reuse the generation of an earlier one.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _load_results(self, path: Path) -> list[QAResult] | None:
+        try:
+            return [QAResult.model_validate(r) for r in json.loads(path.read_text("utf-8"))]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Manifest results %s are unreadable, ignoring: %s", path, e)
+            return None
+
+    def load_run(self, manifest: RunManifest) -> ReusedRun | None:
+        run_dir = self.root / manifest.key
+        results = self._load_results(run_dir / "results.json")
+        if results is None:
+            return None
+        summary_file = run_dir / "summary.json"
+        summary = None
+        if summary_file.exists():
+            summary = json.loads(summary_file.read_text("utf-8"))
+        return ReusedRun(results, summary)
+
+    def load_generation(self, manifest: RunManifest) -> list[QAResult] | None:
+        return self._load_results(self.root / "generation" / f"{manifest.generation_key}.json")
+
+    def save(
+        self, manifest: RunManifest, results: list[QAResult], summary: dict | None = None
+    ) -> None:
+        generation_file = self.root / "generation" / f"{manifest.generation_key}.json"
+        generation_file.parent.mkdir(parents=True, exist_ok=True)
+        generated = [
+            r.model_copy(update={"valueai_answer": None, "evaluation_metrics": None})
+            for r in results
+        ]
+        _write_json(generation_file, [r.model_dump() for r in generated])
+        run_dir = self.root / manifest.key
+        run_dir.mkdir(parents=True, exist_ok=True)
+        _write_json(run_dir / "results.json", [r.model_dump() for r in results])
+        if summary is not None:
+            _write_json(run_dir / "summary.json", summary)
+        _write_json(run_dir / "manifest.json", manifest.to_dict())
+
+
+def _write_json(path: Path, data: object) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def get_manifest_store(enabled: bool = True) -> ManifestStore | None:
+    """Store at MANIFEST_DIR, or None when reuse is off or the path is empty."""
+    root = getattr(settings, "manifest_dir", None)
+    if not enabled or not root:
+        return None
+    return ManifestStore(Path(root))
@@ -18,3 +18,4 @@ class QAResult(BaseModel):
     evaluation_metrics: dict | None = Field(
         None, description="faithfulness (RAGAS), cosine_similarity, or error"
     )
+    source_pdf: str | None = Field(None, description="PDF the chunk was taken from (rag-med run)")
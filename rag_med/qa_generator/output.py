@@ -0,0 +1,212 @@
+"""Reading and writing QA result files: indented JSON or columnar Parquet.
+
+The format follows the file suffix. In Parquet each ``evaluation_metrics`` key is its
+own ``metric.<name>`` column (nested dicts such as ``metric_versions`` become
+``metric.<name>.<key>``), text columns are dictionary-encoded and pages are
+zstd-compressed, so metrics of many runs can be scanned without reading the text.
+pyarrow is imported only when Parquet is used.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+from pathlib import Path
+
+from configs.settings import settings
+from rag_med.qa_generator.models import QAResult
+
+OUTPUT_FORMATS = ("json", "parquet")
+METRIC_PREFIX = "metric."
+FORMAT_METADATA = {b"rag_med.format": b"qa_results/1"}
+
+INT_COLUMNS = ("chunk_index", "chunk_length_chars", "chunk_length_words")
+TEXT_COLUMNS = (
+    "chunk",
+    "question",
+    "answer",
+    "raw_model_output",
+    "valueai_answer",
+    "model_used",
+    "source_pdf",
+)
+
+
+def output_format(path: Path) -> str:
+    return "parquet" if path.suffix.lower() == ".parquet" else "json"
+
+
+def with_format(path: Path, fmt: str) -> Path:
+    """``path`` with the suffix of ``fmt`` (``qa_result.json`` → ``qa_result.parquet``)."""
+    if fmt not in OUTPUT_FORMATS:
+        msg = f"Unknown output format {fmt!r}; use one of: {', '.join(OUTPUT_FORMATS)}"
+        raise ValueError(msg)
+    if output_format(path) == fmt:
+        return path
+    return path.with_suffix(".parquet" if fmt == "parquet" else ".json")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        msg = "Parquet output needs pyarrow: pip install pyarrow"
+        raise ImportError(msg) from e
+    return pa, pq
+
+
+def _flatten_metrics(metrics: dict | None) -> dict[str, object]:
+    flat: dict[str, object] = {}
+    for name, value in (metrics or {}).items():
+        if isinstance(value, dict):
+            for key, inner in value.items():
+                flat[f"{METRIC_PREFIX}{name}.{key}"] = inner
+        else:
+            flat[f"{METRIC_PREFIX}{name}"] = value
+    return flat
+
+
+def _value_kind(value: object) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "string"
+
+
+def _merge_kinds(a: str | None, b: str) -> str:
+    """Column kind over more values: ints and floats widen to float, other mixes to string."""
+    if a is None or a == b:
+        return b
+    return "float" if {a, b} == {"int", "float"} else "string"
+
+
+def _metric_kinds(flat: Iterable[dict[str, object]]) -> dict[str, str]:
+    kinds: dict[str, str | None] = {}
+    for item in flat:
+        for name, value in item.items():
+            if value is None:
+                kinds.setdefault(name, None)
+            else:
+                kinds[name] = _merge_kinds(kinds.get(name), _value_kind(value))
+    # Columns with no value at all are strings
+    return {name: kind or "string" for name, kind in sorted(kinds.items())}
+
+
+def _metric_column(pa, values: list[object], kind: str):
+    if kind == "bool":
+        return pa.array(values, type=pa.bool_())
+    if kind == "int":
+        return pa.array(values, type=pa.int64())
+    if kind == "float":
+        return pa.array([None if v is None else float(v) for v in values], type=pa.float64())
+    return pa.array(
+        [None if v is None else v if isinstance(v, str) else json.dumps(v) for v in values],
+        type=pa.string(),
+    )
+
+
+def results_table(
+    results: Sequence[QAResult], metric_kinds: dict[str, str] | None = None
+):
+    """Arrow table of ``results`` with the metrics flattened to columns.
+
+    ``metric_kinds`` fixes the metric columns and their types (bool, int, float or string),
+    so tables of consecutive batches share one schema; by default they follow ``results``.
+    """
+    pa, _ = _pyarrow()
+    rows = [r.model_dump(exclude={"evaluation_metrics"}) for r in results]
+    flat = [_flatten_metrics(r.evaluation_metrics) for r in results]
+    columns: dict[str, object] = {}
+    for name in QAResult.model_fields:
+        if name != "evaluation_metrics":
+            field_type = pa.int64() if name in INT_COLUMNS else pa.string()
+            columns[name] = pa.array([row[name] for row in rows], type=field_type)
+    kinds = metric_kinds if metric_kinds is not None else _metric_kinds(flat)
+    for name, kind in kinds.items():
+        columns[name] = _metric_column(pa, [item.get(name) for item in flat], kind)
+    return pa.table(columns).replace_schema_metadata(FORMAT_METADATA)
+
+
+def _unflatten_metrics(row: dict[str, object]) -> dict | None:
+    metrics: dict = {}
+    for column, value in row.items():
+        if not column.startswith(METRIC_PREFIX) or value is None:
+            continue
+        name, _, key = column[len(METRIC_PREFIX) :].partition(".")
+        if key:
+            metrics.setdefault(name, {})[key] = value
+        else:
+            metrics[name] = value
+    return metrics or None
+
+
+def write_results(results: Sequence[QAResult], path: Path) -> None:
+    """Write ``results`` as JSON or Parquet, depending on the suffix of ``path``."""
+    if output_format(path) == "json":
+        with path.open("w", encoding="utf-8") as f:
+            json.dump([r.model_dump() for r in results], f, ensure_ascii=False, indent=2)
+        return
+    _, pq = _pyarrow()
+    pq.write_table(
+        results_table(results),
+        path,
+        compression=getattr(settings, "parquet_compression", "zstd"),
+        use_dictionary=list(TEXT_COLUMNS),
+    )
+
+
+def _jsonl_results(path: Path) -> Iterator[QAResult]:
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield QAResult.model_validate_json(line)
+
+
+def write_parquet_from_jsonl(source: Path, path: Path, batch_size: int = 1000) -> int:
+    """Convert a JSON-lines result file to Parquet ``batch_size`` rows at a time.
+
+    A first pass collects the metric columns, so at most one batch of results is held in
+    memory. Returns the number of rows written.
+    """
+    _, pq = _pyarrow()
+    kinds = _metric_kinds(_flatten_metrics(r.evaluation_metrics) for r in _jsonl_results(source))
+    rows = 0
+    writer = None
+    try:
+        results = _jsonl_results(source)
+        while batch := list(islice(results, batch_size)):
+            table = results_table(batch, kinds)
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    path,
+                    table.schema,
+                    compression=getattr(settings, "parquet_compression", "zstd"),
+                    use_dictionary=list(TEXT_COLUMNS),
+                )
+            writer.write_table(table)
+            rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        write_results([], path)
+    return rows
+
+
+def read_results(path: Path) -> list[QAResult]:
+    """QA results from a JSON or Parquet result file (null metrics are left out)."""
+    if output_format(path) == "json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return [QAResult.model_validate(item) for item in data]
+    _, pq = _pyarrow()
+    out = []
+    for row in pq.read_table(path).to_pylist():
+        fields = {k: v for k, v in row.items() if not k.startswith(METRIC_PREFIX)}
+        metrics = _unflatten_metrics(row)
+        out.append(QAResult.model_validate({**fields, "evaluation_metrics": metrics}))
+    return out
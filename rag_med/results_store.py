@@ -0,0 +1,533 @@
+"""Indexed SQLite history of runs, items and metric values (``rag-med runs``).
+
+``generate``, ``run`` and ``evaluate`` record every invocation here when it finishes
+(a run answered from the manifest store is recorded with ``reused`` set); older result
+files are backfilled with ``rag-med runs ingest``. Each run stores a hash of its
+results, and a backfill whose results are already stored adds nothing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Sequence
+from pathlib import Path
+
+from rag_med.qa_generator.models import QAResult
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_key TEXT NOT NULL UNIQUE,
+        kind TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        source TEXT,
+        pdf_sha256 TEXT,
+        rag_id INTEGER,
+        rag_model TEXT,
+        qa_model TEXT,
+        seed INTEGER,
+        manifest_key TEXT,
+        results_file TEXT,
+        summary_file TEXT,
+        item_count INTEGER NOT NULL,
+        evaluated_count INTEGER NOT NULL,
+        results_hash TEXT,
+        reused INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS items (
+        run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+        item_index INTEGER NOT NULL,
+        chunk_index INTEGER NOT NULL,
+        source_pdf TEXT,
+        question TEXT NOT NULL,
+        question_hash TEXT NOT NULL,
+        status TEXT NOT NULL,
+        PRIMARY KEY (run_id, item_index)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS metrics (
+        run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+        item_index INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        value REAL NOT NULL,
+        PRIMARY KEY (run_id, item_index, name)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at)",
+    "CREATE INDEX IF NOT EXISTS runs_rag_created ON runs (rag_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS runs_source ON runs (source)",
+    "CREATE INDEX IF NOT EXISTS runs_results_hash ON runs (results_hash)",
+    "CREATE INDEX IF NOT EXISTS items_question ON items (question_hash)",
+    "CREATE INDEX IF NOT EXISTS metrics_name_run ON metrics (name, run_id, value)",
+)
+
+# Columns added after the first schema: (name, definition) for ALTER TABLE on older stores
+_ADDED_RUN_COLUMNS = (("results_hash", "TEXT"), ("reused", "INTEGER NOT NULL DEFAULT 0"))
+
+# Run columns taken from ``meta`` (see run_meta)
+_META_COLUMNS = ("pdf_sha256", "rag_id", "rag_model", "qa_model", "seed", "manifest_key")
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _ResultsHasher:
+    """``results_key`` fed one result at a time (the same hash as the whole JSON list)."""
+
+    def __init__(self) -> None:
+        self._hash = hashlib.sha256(b"[")
+        self._empty = True
+
+    def update(self, r: QAResult) -> None:
+        if not self._empty:
+            self._hash.update(b", ")
+        self._empty = False
+        self._hash.update(json.dumps(r.model_dump(), sort_keys=True).encode("utf-8"))
+
+    def hexdigest(self) -> str:
+        done = self._hash.copy()
+        done.update(b"]")
+        return done.hexdigest()
+
+
+def results_key(results: Sequence[QAResult]) -> str:
+    """Content hash of a result list (same results → same run)."""
+    hasher = _ResultsHasher()
+    for r in results:
+        hasher.update(r)
+    return hasher.hexdigest()
+
+
+def _item_status(r: QAResult) -> str:
+    metrics = r.evaluation_metrics or {}
+    if "error" in metrics:
+        return "error"
+    if "skipped" in metrics:
+        return "skipped"
+    return "evaluated" if r.valueai_answer and metrics else "generated"
+
+
+def _numeric_metrics(metrics: dict | None) -> list[tuple[str, float]]:
+    return [
+        (name, float(value))
+        for name, value in (metrics or {}).items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    ]
+
+
+def run_meta(
+    summary: dict | None = None, manifest: dict | None = None, *, use_settings: bool = True
+) -> dict:
+    """Run columns from a summary / manifest; models missing there come from the settings."""
+    from configs.settings import settings
+
+    manifest = manifest or (summary or {}).get("manifest") or {}
+    models = manifest.get("models") or {}
+    configured = {
+        "rag_id": getattr(settings, "valueai_rag_id", None),
+        "rag": getattr(settings, "valueai_model_name", None),
+        "qa": getattr(settings, "metrics_llm_model_name", None),
+    }
+    if not use_settings:
+        configured = {}
+    return {
+        "pdf_sha256": manifest.get("pdf_sha256"),
+        "seed": manifest.get("seed"),
+        "manifest_key": manifest.get("key"),
+        "rag_id": models.get("rag_id", configured.get("rag_id")),
+        "rag_model": models.get("rag", configured.get("rag")),
+        "qa_model": models.get("qa", configured.get("qa")),
+    }
+
+
+class ResultsStore:
+    """SQLite store of runs with per-item metric rows, indexed for history queries."""
+
+    def __init__(self, path: Path):
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.execute(_SCHEMA[0])
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(runs)")}
+            for name, definition in _ADDED_RUN_COLUMNS:
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE runs ADD COLUMN {name} {definition}")
+            for statement in _SCHEMA[1:]:
+                self._conn.execute(statement)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def add_run(
+        self,
+        results: Sequence[QAResult],
+        *,
+        kind: str,
+        source: str | None = None,
+        results_file: Path | None = None,
+        summary_file: Path | None = None,
+        meta: dict | None = None,
+        created_at: float | None = None,
+        reused: bool = False,
+        dedup: bool = False,
+    ) -> int | None:
+        """Insert a run with its items and metrics; returns its id.
+
+        Every call is a new run. With ``dedup`` (backfills) nothing is added and None is
+        returned when a run with the same results is stored already.
+        """
+        content = results_key(results)
+        row = self._run_row(
+            kind=kind,
+            source=source,
+            results_file=results_file,
+            summary_file=summary_file,
+            meta=meta,
+            created_at=created_at,
+            reused=reused,
+            run_key=content if dedup else None,
+        )
+        row["results_hash"] = content
+        with self._lock, self._conn:
+            if dedup and self._conn.execute(
+                "SELECT 1 FROM runs WHERE results_hash = ? OR run_key = ?", (content, content)
+            ).fetchone():
+                return None
+            cur = self._conn.execute(
+                f"INSERT OR IGNORE INTO runs ({', '.join(row)}) "
+                f"VALUES ({', '.join('?' * len(row))})",
+                tuple(row.values()),
+            )
+            if cur.rowcount == 0:
+                return None
+            run_id = cur.lastrowid
+            self._insert_items(run_id, results, 0)
+        return run_id
+
+    def start_run(
+        self,
+        *,
+        kind: str,
+        source: str | None = None,
+        results_file: Path | None = None,
+        meta: dict | None = None,
+        reused: bool = False,
+    ) -> int:
+        """Insert an empty run whose items arrive through ``add_items`` (streamed runs)."""
+        row = self._run_row(
+            kind=kind, source=source, results_file=results_file, meta=meta, reused=reused
+        )
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                tuple(row.values()),
+            )
+        return cur.lastrowid
+
+    def add_items(self, run_id: int, results: Sequence[QAResult], start: int) -> None:
+        """Append items ``start``, ``start + 1``, ... of a started run."""
+        with self._lock, self._conn:
+            self._insert_items(run_id, results, start)
+
+    def finish_run(
+        self, run_id: int, *, results_hash: str, summary_file: Path | None = None
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET results_hash = ?, summary_file = ? WHERE run_id = ?",
+                (results_hash, str(summary_file) if summary_file is not None else None, run_id),
+            )
+
+    @staticmethod
+    def _run_row(
+        *,
+        kind: str,
+        source: str | None = None,
+        results_file: Path | None = None,
+        summary_file: Path | None = None,
+        meta: dict | None = None,
+        created_at: float | None = None,
+        reused: bool = False,
+        run_key: str | None = None,
+    ) -> dict:
+        meta = meta or {}
+        return {
+            "run_key": run_key or uuid.uuid4().hex,
+            "reused": int(reused),
+            "kind": kind,
+            "created_at": created_at if created_at is not None else time.time(),
+            "source": source,
+            "results_file": str(results_file) if results_file is not None else None,
+            "summary_file": str(summary_file) if summary_file is not None else None,
+            "item_count": 0,
+            "evaluated_count": 0,
+            **{k: meta.get(k) for k in _META_COLUMNS},
+        }
+
+    def _insert_items(self, run_id: int, results: Sequence[QAResult], start: int) -> None:
+        """Items, metrics and run counts; the caller holds the lock and the transaction."""
+        self._conn.executemany(
+            "INSERT INTO items (run_id, item_index, chunk_index, source_pdf, question, "
+            "question_hash, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run_id,
+                    i,
+                    r.chunk_index,
+                    r.source_pdf,
+                    r.question,
+                    _sha256(r.question)[:16],
+                    _item_status(r),
+                )
+                for i, r in enumerate(results, start)
+            ],
+        )
+        self._conn.executemany(
+            "INSERT INTO metrics (run_id, item_index, name, value) VALUES (?, ?, ?, ?)",
+            [
+                (run_id, i, name, value)
+                for i, r in enumerate(results, start)
+                for name, value in _numeric_metrics(r.evaluation_metrics)
+            ],
+        )
+        evaluated = sum(1 for r in results if _item_status(r) == "evaluated")
+        self._conn.execute(
+            "UPDATE runs SET item_count = item_count + ?, evaluated_count = evaluated_count + ? "
+            "WHERE run_id = ?",
+            (len(results), evaluated, run_id),
+        )
+
+    def ingest_file(self, path: Path) -> int | None:
+        """Backfill a saved result file (its ``_valueai_eval`` / ``_manifest`` siblings too)."""
+        from rag_med.qa_generator.output import read_results
+
+        results = read_results(path)
+        if not results:
+            return None
+        return self.add_run(
+            results,
+            kind="backfill",
+            results_file=path,
+            created_at=path.stat().st_mtime,
+            dedup=True,
+            **result_file_meta(path, results),
+        )
+
+    def get_run(self, run_id: int) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def list_runs(
+        self,
+        *,
+        rag_id: int | None = None,
+        source: str | None = None,
+        kind: str | None = None,
+        metric: str = "ragas_faithfulness",
+        limit: int = 20,
+    ) -> list[dict]:
+        """Newest runs first, with the mean of ``metric`` per run."""
+        where, params = [], []
+        for column, value in (("rag_id", rag_id), ("kind", kind)):
+            if value is not None:
+                where.append(f"r.{column} = ?")
+                params.append(value)
+        if source is not None:
+            where.append("r.source LIKE ?")
+            params.append(f"%{source}%")
+        sql = (
+            "SELECT r.*, (SELECT AVG(m.value) FROM metrics m "
+            "WHERE m.name = ? AND m.run_id = r.run_id) AS metric_mean FROM runs r"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + " ORDER BY r.created_at DESC, r.run_id DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (metric, *params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def metric_means(self, run_id: int) -> dict[str, dict]:
+        """``{metric: {count, mean, min, max}}`` over the items of a run."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, COUNT(*) AS n, AVG(value) AS mean, MIN(value) AS lo, "
+                "MAX(value) AS hi FROM metrics WHERE run_id = ? GROUP BY name ORDER BY name",
+                (run_id,),
+            ).fetchall()
+        return {
+            r["name"]: {"count": r["n"], "mean": r["mean"], "min": r["lo"], "max": r["hi"]}
+            for r in rows
+        }
+
+    def diff(self, run_a: int, run_b: int) -> list[dict]:
+        """Per metric: means of both runs and the mean change over questions present in both."""
+        means_a, means_b = self.metric_means(run_a), self.metric_means(run_b)
+        with self._lock:
+            paired = self._conn.execute(
+                "SELECT ma.name, COUNT(*) AS n, AVG(mb.value - ma.value) AS delta FROM items ia "
+                "JOIN items ib ON ib.run_id = ? AND ib.question_hash = ia.question_hash "
+                "JOIN metrics ma ON ma.run_id = ia.run_id AND ma.item_index = ia.item_index "
+                "JOIN metrics mb ON mb.run_id = ib.run_id AND mb.item_index = ib.item_index "
+                "AND mb.name = ma.name WHERE ia.run_id = ? GROUP BY ma.name",
+                (run_b, run_a),
+            ).fetchall()
+        by_name = {r["name"]: (r["n"], r["delta"]) for r in paired}
+        out = []
+        for name in sorted(set(means_a) | set(means_b)):
+            a = means_a.get(name, {}).get("mean")
+            b = means_b.get(name, {}).get("mean")
+            n_paired, paired_delta = by_name.get(name, (0, None))
+            out.append(
+                {
+                    "metric": name,
+                    "a": a,
+                    "b": b,
+                    "delta": b - a if a is not None and b is not None else None,
+                    "paired": n_paired,
+                    "paired_delta": paired_delta,
+                }
+            )
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def result_file_meta(path: Path, results: Sequence[QAResult]) -> dict:
+    """``source``, ``summary_file`` and ``meta`` of a saved result file from its siblings."""
+    summary_file = path.with_name(f"{path.stem}_valueai_eval.json")
+    summary = _read_json(summary_file)
+    manifest = _read_json(path.with_name(f"{path.stem}_manifest.json"))
+    # Old files do not record which RAG answered: unknown stays NULL
+    meta = run_meta(summary, manifest, use_settings=False)
+    if meta["qa_model"] is None and results:
+        meta["qa_model"] = results[0].model_used
+    return {
+        "source": (summary or {}).get("pdf_path") or (manifest or {}).get("pdf_path"),
+        "summary_file": summary_file if summary is not None else None,
+        "meta": meta,
+    }
+
+
+_stores: dict[str, ResultsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore | None:
+    """Store at RESULTS_DB_PATH (None when the path is empty)."""
+    from configs.settings import settings
+
+    path = getattr(settings, "results_db_path", None)
+    if not path:
+        return None
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ResultsStore(Path(path))
+        return store
+
+
+class RunRecorder:
+    """Records a streamed run: results reach the store ``batch_size`` at a time.
+
+    Store failures are logged once and end the recording; the run itself goes on.
+    """
+
+    def __init__(self, store: ResultsStore, run_id: int, batch_size: int = 200):
+        self._store: ResultsStore | None = store
+        self.run_id = run_id
+        self._batch_size = max(1, batch_size)
+        self._pending: list[QAResult] = []
+        self._count = 0
+        self._hasher = _ResultsHasher()
+
+    def add(self, r: QAResult) -> None:
+        if self._store is None:
+            return
+        self._hasher.update(r)
+        self._pending.append(r)
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if self._store is None or not batch:
+            return
+        try:
+            self._store.add_items(self.run_id, batch, self._count)
+        except (OSError, sqlite3.Error):
+            logger.warning("Could not record the run in the results store", exc_info=True)
+            self._store = None
+        self._count += len(batch)
+
+    def finish(self, summary_file: Path | None = None) -> int | None:
+        """Write the last batch and the results hash; returns the run id (None on failure)."""
+        self._flush()
+        store = self._store
+        if store is None:
+            return None
+        try:
+            store.finish_run(
+                self.run_id, results_hash=self._hasher.hexdigest(), summary_file=summary_file
+            )
+        except (OSError, sqlite3.Error):
+            logger.warning("Could not record the run in the results store", exc_info=True)
+            return None
+        logger.info("Run %s recorded in results store: %s", self.run_id, store.path)
+        return self.run_id
+
+
+def start_run_recording(**kwargs: object) -> RunRecorder | None:
+    """``start_run`` on the default store; None when recording is off or the store fails."""
+    try:
+        store = get_results_store()
+        if store is None:
+            return None
+        run_id = store.start_run(**kwargs)
+    except (OSError, sqlite3.Error):
+        logger.warning("Could not record the run in the results store", exc_info=True)
+        return None
+    return RunRecorder(store, run_id)
+
+
+def record_run(results: Sequence[QAResult], **kwargs: object) -> int | None:
+    """``add_run`` on the default store; failures are logged, never raised into the run."""
+    try:
+        store = get_results_store()
+        if store is None:
+            return None
+        run_id = store.add_run(results, **kwargs)
+    except (OSError, sqlite3.Error):
+        logger.warning("Could not record the run in the results store", exc_info=True)
+        return None
+    if run_id is not None:
+        logger.info("Run %s recorded in results store: %s", run_id, store.path)
+    return run_id
@@ -0,0 +1,304 @@
+"""Warm local HTTP service (``rag-med serve``) for QA generation, RAG answers and scoring.
+
+One long-lived process keeps what every CLI call would otherwise rebuild: the imported
+RAGAS/langchain modules, the Faithfulness and FactualCorrectness scorers, ValueAI tokens,
+the RAG client and the metric cache. Concurrent ``/score`` requests are micro-batched per
+metric into the batch scoring functions.
+
+Endpoints (JSON in and out):
+
+- ``POST /generate`` ``{"chunk": ..., "chunk_index": 1}`` → a QAResult
+- ``POST /ask`` ``{"question": ...}`` → ``{"answer": ...}``
+- ``POST /score`` ``{"question", "reference", "candidate", "context"}`` or ``{"items": [...]}``
+  → ``{"metrics": ...}`` / ``{"items": [...]}`` in the ``evaluation_metrics`` layout
+- ``GET /health``, ``GET /stats``
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from configs.settings import settings
+from rag_med.evaluation import metrics as _metrics
+from rag_med.evaluation.batching import MicroBatcher
+from rag_med.evaluation.cache import metric_cache_stats
+from rag_med.qa_generator import generator as _generator
+from rag_med.valueai.singleflight import singleflight_stats
+from rag_med.valueai.telemetry import get_recorder
+
+logger = logging.getLogger(__name__)
+
+_SCORE_FIELDS = ("question", "reference", "candidate")
+
+
+class BadRequest(ValueError):
+    """Invalid request body (answered with 400)."""
+
+
+def _require_str(body: dict, name: str) -> str:
+    value = body.get(name)
+    if not isinstance(value, str) or not value.strip():
+        msg = f"{name!r} must be a non-empty string"
+        raise BadRequest(msg)
+    return value
+
+
+class QAService:
+    """Generation, RAG and scoring calls behind the HTTP handler, with their warm state.
+
+    RAGAS Faithfulness and the text metrics of concurrent items are scored by one batch
+    call per ``batch_size`` items (or after ``batch_wait`` seconds); the alignment judge is
+    batched the same way when LLM_JUDGE_BATCH_SIZE > 1.
+    """
+
+    def __init__(self, *, batch_size: int = 8, batch_wait: float = 0.05):
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._ragas = MicroBatcher(
+            self._ragas_batch, max_batch=batch_size, max_wait=batch_wait, name="serve-ragas"
+        )
+        self._text = MicroBatcher(
+            self._text_batch, max_batch=batch_size, max_wait=batch_wait, name="serve-text"
+        )
+        self._judge = _generator._make_judge_batcher()
+        # Three metric calls per item wait on the batchers at once
+        self._pool = ThreadPoolExecutor(max_workers=3 * batch_size, thread_name_prefix="serve")
+        self.started_at = time.monotonic()
+
+    @staticmethod
+    def _ragas_batch(samples: list[tuple[str, str, list[str]]]) -> list[dict]:
+        return _metrics.evaluate_answer_pairs_ragas_batch(samples)
+
+    @staticmethod
+    def _text_batch(pairs: list[tuple[str, str]]) -> list[dict]:
+        return _metrics.compare_two_answers_batch(pairs)
+
+    def _judge_one(self, question: str, reference: str, candidate: str, context: str) -> dict:
+        if self._judge is not None:
+            return self._judge.submit((question, reference, candidate, context))
+        return _metrics.evaluate_answer_pair_llm_alignment(
+            question=question, etalon_answer=reference, rag_answer=candidate, context=context
+        )
+
+    def rag_client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = _generator._build_valueai_client()
+            return self._client
+
+    def warm_up(self) -> None:
+        """Authenticate and build the scorers now instead of on the first request."""
+        steps = {
+            "rag client": lambda: self.rag_client()._get_headers(),
+            "faithfulness scorer": _metrics._get_faithfulness_scorer,
+            "factual correctness scorer": _metrics._get_factual_correctness_scorer,
+        }
+        for name, step in steps.items():
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.warning("Warm-up of %s failed (retried on first use): %s", name, e)
+            else:
+                logger.info("Warm-up: %s ready in %.1fs", name, time.perf_counter() - started)
+
+    def generate(self, body: dict) -> dict:
+        chunk = _require_str(body, "chunk")
+        chunk_index = body.get("chunk_index", 1)
+        if not isinstance(chunk_index, int):
+            raise BadRequest("'chunk_index' must be an integer")
+        return _generator.generate_qa(chunk, chunk_index).model_dump()
+
+    def ask(self, body: dict) -> dict:
+        return {"answer": self.rag_client().ask(_require_str(body, "question"))}
+
+    def _score_futures(self, item: object) -> tuple:
+        if not isinstance(item, dict):
+            raise BadRequest("score items must be objects")
+        question, reference, candidate = (_require_str(item, name) for name in _SCORE_FIELDS)
+        context = item.get("context") or ""
+        return (
+            self._pool.submit(self._ragas.submit, (question, candidate, [reference])),
+            self._pool.submit(self._text.submit, (reference, candidate)),
+            self._pool.submit(self._judge_one, question, reference, candidate, context),
+        )
+
+    def score(self, body: dict) -> dict:
+        """Metrics of one pair, or of every pair in ``items`` (scored as one batch)."""
+        items = body.get("items")
+        if items is None:
+            ragas, text, judge = self._score_futures(body)
+            return {
+                "metrics": _generator._merge_item_metrics(
+                    ragas.result(), text.result(), judge.result()
+                )
+            }
+        if not isinstance(items, list) or not items:
+            raise BadRequest("'items' must be a non-empty list")
+        futures = [self._score_futures(item) for item in items]
+        return {
+            "items": [
+                _generator._merge_item_metrics(ragas.result(), text.result(), judge.result())
+                for ragas, text, judge in futures
+            ]
+        }
+
+    def stats(self) -> dict:
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+            "metric_cache": metric_cache_stats(),
+            "llm_gating": _metrics.gate_stats(),
+            "llm_judge": _metrics.judge_call_stats(),
+            "singleflight": singleflight_stats(),
+            "valueai_latency": get_recorder().snapshot(),
+        }
+
+    def close(self) -> None:
+        self._ragas.close()
+        self._text.close()
+        if self._judge is not None:
+            self._judge.close()
+        self._pool.shutdown(wait=True)
+
+
+class _QAHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], service: QAService):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.lock = threading.Lock()
+        self.requests: dict[str, int] = {}
+
+    def count(self, endpoint: str, status: int) -> None:
+        key = f"{endpoint} {status}"
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def request_counts(self) -> dict[str, int]:
+        with self.lock:
+            return dict(self.requests)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _QAHTTPServer
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("serve: " + format, *args)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            data = json.loads(raw or b"{}")
+        except json.JSONDecodeError as e:
+            msg = f"Invalid JSON: {e}"
+            raise BadRequest(msg) from e
+        if not isinstance(data, dict):
+            raise BadRequest("Request body must be a JSON object")
+        return data
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method: str) -> None:
+        service = self.server.service
+        path = self.path.split("?", 1)[0].rstrip("/")
+        routes = {
+            ("GET", "/health"): lambda _: {"status": "ok"},
+            ("GET", "/stats"): lambda _: {
+                **service.stats(),
+                "requests": self.server.request_counts(),
+            },
+            ("POST", "/generate"): service.generate,
+            ("POST", "/ask"): service.ask,
+            ("POST", "/score"): service.score,
+        }
+        try:
+            # The body is read even for unknown paths so the connection can be reused
+            body = self._read_json() if method == "POST" else {}
+            route = routes.get((method, path))
+            if route is None:
+                status, out = 404, {"detail": "Not found"}
+            else:
+                status, out = 200, route(body)
+        except BadRequest as e:
+            status, out = 400, {"detail": str(e)}
+        except Exception as e:
+            logger.exception("Request %s %s failed", method, path)
+            status, out = 500, {"detail": f"{type(e).__name__}: {e}"}
+        self._send(status, out)
+        self.server.count(path, status)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+
+class QAServer:
+    """The warm service on ``host:port`` (port 0 picks a free one).
+
+    Example:
+        with QAServer(port=0) as srv:
+            httpx.post(f"{srv.base_url}/score", json={...})
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        service: QAService | None = None,
+    ):
+        self.service = service or QAService(
+            batch_size=getattr(settings, "serve_batch_size", 8),
+            batch_wait=getattr(settings, "serve_batch_wait_seconds", 0.05),
+        )
+        address = (
+            host if host is not None else getattr(settings, "serve_host", "127.0.0.1"),
+            port if port is not None else getattr(settings, "serve_port", 8765),
+        )
+        self._httpd = _QAHTTPServer(address, self.service)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until ``stop`` (or Ctrl+C)."""
+        self._httpd.serve_forever()
+
+    def start(self) -> QAServer:
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="rag-med-serve", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join(timeout=5)
+        self._httpd.server_close()
+        self.service.close()
+
+    def __enter__(self) -> QAServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
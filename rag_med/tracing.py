@@ -0,0 +1,290 @@
+"""Structured tracing: spans and events in a ring buffer, flushed by a background writer.
+
+Disabled by default (TRACE_ENABLED); then ``span()`` / ``event()`` return immediately.
+When enabled, records go to an in-memory ring buffer (oldest dropped when full) and a
+daemon thread appends them as JSON lines to TRACE_PATH. Root spans are sampled with
+TRACE_SAMPLE_RATE and their children follow the decision; errors are always kept.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# (trace_id, span_id, sampled) of the innermost open span
+_current: contextvars.ContextVar[tuple[str, str, bool] | None] = contextvars.ContextVar(
+    "rag_med_trace_span", default=None
+)
+
+
+def _new_id() -> str:
+    return os.urandom(8).hex()
+
+
+class Span:
+    """Open span; recorded once, when it ends."""
+
+    __slots__ = ("_tracer", "name", "level", "attrs", "_ids", "_token", "_start", "_start_wall")
+
+    def __init__(self, tracer: Tracer, name: str, level: str, attrs: dict):
+        self._tracer = tracer
+        self.name = name
+        self.level = level
+        self.attrs = attrs
+        self._ids: tuple[str, str, str | None, bool] | None = None
+        self._token: contextvars.Token | None = None
+
+    def set(self, **attrs: object) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> Span:
+        parent = _current.get()
+        if parent is None:
+            trace_id, parent_id, sampled = _new_id(), None, self._tracer.sample()
+        else:
+            trace_id, parent_id, sampled = parent[0], parent[1], parent[2]
+        span_id = _new_id()
+        self._ids = (trace_id, span_id, parent_id, sampled)
+        self._token = _current.set((trace_id, span_id, sampled))
+        self._start_wall = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        duration = time.perf_counter() - self._start
+        _current.reset(self._token)
+        trace_id, span_id, parent_id, sampled = self._ids
+        level = "error" if exc is not None else self.level
+        if not sampled and level != "error":
+            return
+        record = {
+            "type": "span",
+            "ts": self._start_wall,
+            "name": self.name,
+            "level": level,
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "duration_ms": round(duration * 1000, 3),
+            "status": "error" if exc is not None else "ok",
+            "attrs": self.attrs,
+        }
+        if exc is not None:
+            record["error"] = f"{type(exc).__name__}: {exc}"[:500]
+        self._tracer.emit(record)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs: object) -> None:
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Ring-buffered tracer; ``path`` None keeps records in memory only."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        level: str = "info",
+        sample_rate: float = 1.0,
+        buffer_size: int = 10_000,
+        flush_interval: float = 1.0,
+    ):
+        self.path = Path(path) if path else None
+        self.min_level = LEVELS.get(level.lower(), LEVELS["info"])
+        self.sample_rate = sample_rate
+        self._buffer: deque[dict] = deque(maxlen=buffer_size)
+        self._dropped = 0
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flush_interval = flush_interval
+        self._writer: threading.Thread | None = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = threading.Thread(target=self._run_writer, name="trace-writer", daemon=True)
+            self._writer.start()
+
+    def enabled_for(self, level: str) -> bool:
+        return LEVELS.get(level, LEVELS["info"]) >= self.min_level
+
+    def sample(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def span(self, name: str, level: str = "info", **attrs: object) -> Span | _NoopSpan:
+        if not self.enabled_for(level):
+            return _NOOP_SPAN
+        return Span(self, name, level, attrs)
+
+    def event(self, name: str, level: str = "info", **attrs: object) -> None:
+        if not self.enabled_for(level):
+            return
+        parent = _current.get()
+        if parent is None:
+            trace_id, parent_id, sampled = None, None, self.sample()
+        else:
+            trace_id, parent_id, sampled = parent
+        if not sampled and level != "error":
+            return
+        self.emit(
+            {
+                "type": "event",
+                "ts": time.time(),
+                "name": name,
+                "level": level,
+                "trace_id": trace_id,
+                "parent_id": parent_id,
+                "attrs": attrs,
+            }
+        )
+
+    def emit(self, record: dict) -> None:
+        record["thread"] = threading.current_thread().name
+        if len(self._buffer) == self._buffer.maxlen:
+            self._dropped += 1
+        self._buffer.append(record)
+
+    def records(self) -> list[dict]:
+        """Buffered records not yet flushed (all recent records when there is no path)."""
+        return list(self._buffer)
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        with self._flush_lock:
+            lines = []
+            while True:
+                try:
+                    record = self._buffer.popleft()
+                except IndexError:
+                    break
+                lines.append(json.dumps(record, ensure_ascii=False, default=str))
+            if not lines:
+                return
+            try:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                logger.warning("Trace flush to %s failed: %s", self.path, e)
+
+    def _run_writer(self) -> None:
+        while not self._stop.wait(self._flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        self.flush()
+
+
+class _NoopTracer:
+    """Tracer used when tracing is disabled."""
+
+    path = None
+    dropped = 0
+
+    def span(self, name: str, level: str = "info", **attrs: object) -> _NoopSpan:
+        return _NOOP_SPAN
+
+    def event(self, name: str, level: str = "info", **attrs: object) -> None:
+        pass
+
+    def records(self) -> list[dict]:
+        return []
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+_NOOP_TRACER = _NoopTracer()
+_tracer: Tracer | _NoopTracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def configure_tracing(
+    enabled: bool,
+    path: Path | None = None,
+    level: str = "info",
+    sample_rate: float = 1.0,
+    buffer_size: int = 10_000,
+) -> Tracer | _NoopTracer:
+    """Replace the process tracer (the previous one is flushed and closed)."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is not None:
+            _tracer.close()
+        _tracer = (
+            Tracer(path, level=level, sample_rate=sample_rate, buffer_size=buffer_size)
+            if enabled
+            else _NOOP_TRACER
+        )
+        return _tracer
+
+
+def get_tracer() -> Tracer | _NoopTracer:
+    """Process tracer, configured from settings (TRACE_*) on first use."""
+    tracer = _tracer
+    if tracer is not None:
+        return tracer
+    from configs.settings import settings
+
+    path = getattr(settings, "trace_path", None)
+    return configure_tracing(
+        enabled=getattr(settings, "trace_enabled", False),
+        path=Path(path) if path else None,
+        level=getattr(settings, "trace_level", "info"),
+        sample_rate=getattr(settings, "trace_sample_rate", 1.0),
+        buffer_size=getattr(settings, "trace_buffer_size", 10_000),
+    )
+
+
+def span(name: str, level: str = "info", **attrs: object) -> Span | _NoopSpan:
+    """Context manager timing a block (``with span("valueai.rag.ask", model=m): ...``)."""
+    return get_tracer().span(name, level, **attrs)
+
+
+def event(name: str, level: str = "info", **attrs: object) -> None:
+    """Point-in-time record attached to the current span."""
+    get_tracer().event(name, level, **attrs)
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if _tracer is not None:
+        _tracer.close()
@@ -8,8 +8,17 @@ from dataclasses import dataclass
 
 import requests
 
+from rag_med.valueai.journal import JournalEntry, PredictJournal, request_fingerprint
+from rag_med.valueai.singleflight import SingleFlight
+from rag_med.valueai.telemetry import PredictTrace, TokenTimer, get_recorder
+
 logger = logging.getLogger(__name__)
 
+_RAG_FLIGHT = SingleFlight("rag_ask")
+
+# Poll errors worth waiting out; any other HTTP error ends polling at once
+_RETRYABLE_POLL_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
 
 @dataclass(frozen=True)
 class ValueAIRagClientConfig:
@@ -30,9 +39,10 @@ class ValueAIRagClientConfig:
 class ValueAIRagClient:
     """Client for ValueAI RAG external API."""
 
-    def __init__(self, config: ValueAIRagClientConfig):
+    def __init__(self, config: ValueAIRagClientConfig, journal: PredictJournal | None = None):
         self._config = config
         self._token: str | None = None
+        self._journal = journal
 
     def _get_headers(self) -> dict[str, str]:
         if not self._token:
@@ -47,7 +57,8 @@ class ValueAIRagClient:
         logger.debug(f"Getting token from {url}")
 
         try:
-            r = requests.post(url, json=payload, timeout=30)
+            with TokenTimer(get_recorder()):
+                r = requests.post(url, json=payload, timeout=30)
             r.raise_for_status()
             data = r.json()
             token = data.get("authorization_token")
@@ -63,11 +74,8 @@ class ValueAIRagClient:
             logger.debug("Token received successfully")
             return token
 
-    def create_predict(self, question: str) -> int:
-        """Create a RAG prediction task and return its id."""
-        url = f"{self._config.base_url}/rag/predict"
-        headers = self._get_headers()
-        payload = {
+    def _predict_payload(self, question: str) -> dict:
+        return {
             "model_name": self._config.model_name,
             "request": question,
             "instructions": self._config.instructions,
@@ -76,10 +84,19 @@ class ValueAIRagClient:
             "return_context": self._config.return_context,
         }
 
+    def create_predict(self, question: str) -> int:
+        """Create a RAG prediction task and return its id (a rejected token is renewed once)."""
+        url = f"{self._config.base_url}/rag/predict"
+        payload = self._predict_payload(question)
+
         logger.debug(f"Creating predict task for question: {question[:50]}...")
 
         try:
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
+            r = requests.post(url, headers=self._get_headers(), json=payload, timeout=60)
+            if r.status_code == 401:
+                logger.debug("Token expired, refreshing...")
+                self._token = None
+                r = requests.post(url, headers=self._get_headers(), json=payload, timeout=60)
             r.raise_for_status()
             data = r.json()
             predict_id = int(data["id"])
@@ -92,7 +109,7 @@ class ValueAIRagClient:
         else:
             return predict_id
 
-    def poll_result(self, predict_id: int) -> dict:
+    def poll_result(self, predict_id: int, trace: PredictTrace | None = None) -> dict:
         """Poll a prediction until it is completed or failed."""
         url = f"{self._config.base_url}/rag/predicts/{predict_id}"
         deadline = time.monotonic() + self._config.timeout_seconds
@@ -116,6 +133,8 @@ class ValueAIRagClient:
                 status = data.get("status")
 
                 logger.debug(f"Task {predict_id} status: {status}")
+                if trace is not None:
+                    trace.polled(status)
 
                 if status == "completed":
                     return data
@@ -129,16 +148,71 @@ class ValueAIRagClient:
 
                 time.sleep(self._config.poll_interval_seconds)
 
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else None
+                if status_code not in _RETRYABLE_POLL_STATUSES:
+                    raise
+                logger.exception("Error polling task")
+                time.sleep(self._config.poll_interval_seconds)
             except requests.exceptions.RequestException:
                 logger.exception("Error polling task")
                 time.sleep(self._config.poll_interval_seconds)
 
     def ask(self, question: str) -> str:
-        """Ask a question to ValueAI RAG and return the final response string."""
-        logger.info(f"Asking ValueAI: {question[:100]}...")
+        """Ask a question to ValueAI RAG and return the final response string.
+
+        Concurrent identical questions (same RAG config) share one prediction.
+        """
+        fingerprint = request_fingerprint(
+            f"{self._config.base_url}/rag/predict", self._predict_payload(question)
+        )
+        return _RAG_FLIGHT.do(fingerprint, lambda: self._ask_once(question, fingerprint))
 
+    def _submit(self, question: str, fingerprint: str, trace: PredictTrace) -> int:
         predict_id = self.create_predict(question)
-        data = self.poll_result(predict_id)
+        trace.submitted()
+        if self._journal is not None:
+            self._journal.record_submitted(fingerprint, "/rag/predict", predict_id)
+        return predict_id
+
+    def _submit_and_poll(
+        self, question: str, fingerprint: str, entry: JournalEntry | None, trace: PredictTrace
+    ) -> dict:
+        if entry is None:
+            return self.poll_result(self._submit(question, fingerprint, trace), trace)
+        logger.info("Re-attaching to ValueAI RAG predict %s (journal)", entry.predict_id)
+        try:
+            return self.poll_result(entry.predict_id, trace)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code not in (404, 410):
+                raise
+        logger.info("ValueAI RAG predict %s is gone, resubmitting", entry.predict_id)
+        return self.poll_result(self._submit(question, fingerprint, trace), trace)
+
+    def _ask_once(self, question: str, fingerprint: str) -> str:
+        logger.info(f"Asking ValueAI: {question[:100]}...")
+
+        journal = self._journal
+        entry = None
+        if journal is not None:
+            entry = journal.lookup(fingerprint)
+
+        trace = PredictTrace(get_recorder(), "/rag/predict", self._config.model_name)
+        ok = False
+        try:
+            try:
+                data = self._submit_and_poll(question, fingerprint, entry, trace)
+            except (RuntimeError, TimeoutError, requests.exceptions.HTTPError) as e:
+                # The next run resubmits instead of re-attaching to a dead predict
+                if journal is not None:
+                    journal.record_failed(fingerprint, str(e))
+                raise
+            ok = data.get("status") == "completed"
+        finally:
+            trace.finished(ok=ok)
+        # The predict is finished either way: nothing is left to re-attach to
+        if journal is not None:
+            journal.record_completed(fingerprint)
 
         if data.get("status") != "completed":
             msg = f"ValueAI RAG task failed: {data}"
@@ -0,0 +1,401 @@
+"""Local stand-in for the ValueAI external API (load and latency testing)."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+_RAG_POLL_RE = re.compile(r"^/rag/predicts/(\d+)$")
+_LLM_POLL_RE = re.compile(r"^/llm/predicts/(\d+)$")
+
+LLM_RESPONSE_MODES = ("json", "fenced", "truncated", "mixed")
+
+
+@dataclass(frozen=True)
+class LatencySpec:
+    """Latency distribution in seconds.
+
+    ``kind`` is one of ``fixed`` (``a``), ``uniform`` (``a``..``b``),
+    ``lognormal`` (median ``a``, sigma ``b``) or ``exp`` (mean ``a``).
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> LatencySpec:
+        """Parse ``"kind:a[,b]"`` (e.g. ``"uniform:0.05,0.2"``) or a bare number."""
+        spec = spec.strip()
+        if ":" not in spec:
+            return cls("fixed", float(spec))
+        kind, _, params = spec.partition(":")
+        values = [float(p) for p in params.split(",") if p.strip()]
+        if kind not in ("fixed", "uniform", "lognormal", "exp") or not values:
+            msg = f"Invalid latency spec: {spec!r}"
+            raise ValueError(msg)
+        return cls(kind, values[0], values[1] if len(values) > 1 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return self.a * rng.lognormvariate(0.0, self.b) if self.a > 0 else 0.0
+        if self.kind == "exp":
+            return rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        return self.a
+
+
+@dataclass(frozen=True)
+class FakeServerConfig:
+    """Behaviour of the fake ValueAI server.
+
+    ``compute`` is the time from submit until a predict is ready; polls before
+    that see ``pending``. Rates are probabilities per request in [0, 1].
+    """
+
+    token_latency: LatencySpec = field(default_factory=LatencySpec)
+    submit_latency: LatencySpec = field(default_factory=LatencySpec)
+    poll_latency: LatencySpec = field(default_factory=LatencySpec)
+    compute: LatencySpec = field(default_factory=LatencySpec)
+    error_rate: float = 0.0
+    unauthorized_rate: float = 0.0
+    task_failure_rate: float = 0.0
+    token_ttl_seconds: float | None = None
+    llm_response_mode: str = "json"
+    rag_response: str = "Ответ тестового RAG: препарат назначают по показаниям."
+    canned_llm_responses: tuple[tuple[str, str], ...] = ()
+    seed: int | None = None
+
+
+@dataclass
+class _Task:
+    kind: str
+    request: str
+    created_at: float
+    ready_at: float
+    failed: bool
+    served_at: float | None = None
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    """One request handled by the fake server."""
+
+    endpoint: str
+    method: str
+    status_code: int
+    duration_seconds: float
+
+
+def _qa_payload() -> dict:
+    return {
+        "question": "Какие препараты первой линии рекомендованы при артериальной гипертензии?",
+        "answer": "Рекомендованы ингибиторы АПФ, БРА, антагонисты кальция и тиазидные диуретики.",
+    }
+
+
+def _render_llm_response(mode: str, payload: dict) -> str:
+    text = json.dumps(payload, ensure_ascii=False)
+    if mode == "fenced":
+        return f"Вот результат:\n```json\n{text}\n```"
+    if mode == "truncated":
+        return text[: max(1, len(text) - len(text) // 4)]
+    return text
+
+
+class _FakeValueAIHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], config: FakeServerConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.tasks: dict[int, _Task] = {}
+        self.tokens: dict[str, float] = {}
+        self.records: list[RequestRecord] = []
+        self.connections = 0
+        self._next_id = 1
+        self._next_token = 1
+
+    def sample(self, spec: LatencySpec) -> float:
+        with self.lock:
+            return spec.sample(self.rng)
+
+    def chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < rate
+
+    def issue_token(self) -> str:
+        with self.lock:
+            token = f"fake-token-{self._next_token}"
+            self._next_token += 1
+            self.tokens[token] = time.monotonic()
+            return token
+
+    def token_valid(self, token: str) -> bool:
+        with self.lock:
+            issued = self.tokens.get(token)
+        if issued is None:
+            return False
+        ttl = self.config.token_ttl_seconds
+        return ttl is None or time.monotonic() - issued <= ttl
+
+    def create_task(self, kind: str, request: str) -> int:
+        compute = self.sample(self.config.compute)
+        failed = self.chance(self.config.task_failure_rate)
+        with self.lock:
+            task_id = self._next_id
+            self._next_id += 1
+            now = time.monotonic()
+            self.tasks[task_id] = _Task(kind, request, now, now + compute, failed)
+            return task_id
+
+    def llm_result(self, request: str) -> str:
+        for needle, response in self.config.canned_llm_responses:
+            if needle in request:
+                return response
+        if "alignment_score" in request:
+            return json.dumps(
+                {"alignment_score": 7, "comment": "Ответ близок к эталону."}, ensure_ascii=False
+            )
+        mode = self.config.llm_response_mode
+        if mode == "mixed":
+            with self.lock:
+                mode = self.rng.choice(LLM_RESPONSE_MODES[:-1])
+        return _render_llm_response(mode, _qa_payload())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _FakeValueAIHTTPServer
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("fake-valueai: " + format, *args)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            data = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        auth = self.headers.get("Authorization") or ""
+        token = auth.removeprefix("Bearer ").strip()
+        if not self.server.token_valid(token):
+            return False
+        return not self.server.chance(self.server.config.unauthorized_rate)
+
+    def _handle(self, method: str) -> None:
+        started = time.monotonic()
+        path = self.path.split("?", 1)[0].rstrip("/")
+        endpoint, status = self._dispatch(method, path)
+        with self.server.lock:
+            self.server.records.append(
+                RequestRecord(endpoint, method, status, time.monotonic() - started)
+            )
+
+    def _dispatch(self, method: str, path: str) -> tuple[str, int]:
+        srv = self.server
+        cfg = srv.config
+        body = self._read_json() if method == "POST" else {}
+
+        if method == "POST" and path == "/token":
+            time.sleep(srv.sample(cfg.token_latency))
+            if not body.get("username") or not body.get("password"):
+                self._send(401, {"detail": "Invalid credentials"})
+                return "/token", 401
+            self._send(200, {"authorization_token": srv.issue_token()})
+            return "/token", 200
+
+        if method == "POST" and path in ("/rag/predict", "/llm/predict"):
+            time.sleep(srv.sample(cfg.submit_latency))
+            status = self._precheck()
+            if status:
+                return path, status
+            task_id = srv.create_task(path.split("/")[1], str(body.get("request") or ""))
+            self._send(200, {"id": task_id})
+            return path, 200
+
+        for regex, kind in ((_RAG_POLL_RE, "rag"), (_LLM_POLL_RE, "llm")):
+            match = regex.match(path)
+            if method == "GET" and match:
+                endpoint = f"/{kind}/predicts/{{id}}"
+                time.sleep(srv.sample(cfg.poll_latency))
+                status = self._precheck()
+                if status:
+                    return endpoint, status
+                return endpoint, self._poll(kind, int(match.group(1)))
+
+        self._send(404, {"detail": "Not found"})
+        return path, 404
+
+    def _precheck(self) -> int:
+        if not self._authorized():
+            self._send(401, {"detail": "Not authenticated"})
+            return 401
+        if self.server.chance(self.server.config.error_rate):
+            self._send(500, {"detail": "Injected failure"})
+            return 500
+        return 0
+
+    def _poll(self, kind: str, task_id: int) -> int:
+        srv = self.server
+        with srv.lock:
+            task = srv.tasks.get(task_id)
+        if task is None or task.kind != kind:
+            self._send(404, {"detail": "Predict not found"})
+            return 404
+        if time.monotonic() < task.ready_at:
+            self._send(200, {"id": task_id, "status": "pending", "result": None})
+            return 200
+        with srv.lock:
+            if task.served_at is None:
+                task.served_at = time.monotonic()
+        if task.failed:
+            self._send(
+                200, {"id": task_id, "status": "failed", "result": {"message": "Injected failure"}}
+            )
+            return 200
+        if kind == "rag":
+            result: dict = {"response": srv.config.rag_response, "context": []}
+        else:
+            result = {"text": srv.llm_result(task.request)}
+        self._send(200, {"id": task_id, "status": "completed", "result": result})
+        return 200
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile (``q`` in [0, 100]); None for empty input."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _latency_summary(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+class FakeValueAIServer:
+    """Fake ValueAI gateway running in a background thread.
+
+    Example:
+        with FakeValueAIServer(FakeServerConfig(compute=LatencySpec("fixed", 0.2))) as srv:
+            client = ValueAIRagClient(ValueAIRagClientConfig(base_url=srv.base_url, ...))
+    """
+
+    def __init__(
+        self,
+        config: FakeServerConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self._httpd = _FakeValueAIHTTPServer((host, port), config or FakeServerConfig())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def connection_count(self) -> int:
+        """Number of TCP connections accepted so far."""
+        return self._httpd.connections
+
+    @property
+    def records(self) -> list[RequestRecord]:
+        with self._httpd.lock:
+            return list(self._httpd.records)
+
+    def start(self) -> FakeValueAIServer:
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-valueai", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> FakeValueAIServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stats(self) -> dict:
+        """Per-endpoint request counts, status codes and latency percentiles."""
+        with self._httpd.lock:
+            records = list(self._httpd.records)
+            tasks = list(self._httpd.tasks.values())
+        endpoints: dict[str, dict] = {}
+        for rec in records:
+            entry = endpoints.setdefault(
+                rec.endpoint, {"requests": 0, "status_codes": {}, "_durations": []}
+            )
+            entry["requests"] += 1
+            code = str(rec.status_code)
+            entry["status_codes"][code] = entry["status_codes"].get(code, 0) + 1
+            entry["_durations"].append(rec.duration_seconds)
+        for entry in endpoints.values():
+            entry["latency_seconds"] = _latency_summary(entry.pop("_durations"))
+        predicts: dict[str, dict] = {}
+        for kind in ("rag", "llm"):
+            done = [t.served_at - t.created_at for t in tasks if t.kind == kind and t.served_at]
+            predicts[kind] = {
+                "submitted": sum(1 for t in tasks if t.kind == kind),
+                "latency_seconds": _latency_summary(done),
+            }
+        return {
+            "requests": len(records),
+            "connections": self._httpd.connections,
+            "endpoints": endpoints,
+            "predicts": predicts,
+        }
@@ -0,0 +1,149 @@
+"""Durable journal of in-flight ValueAI predicts (resume polling after a restart)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+STATE_SUBMITTED = "submitted"
+STATE_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predicts (
+    fingerprint TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    predict_id INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def request_fingerprint(endpoint: str, payload: dict) -> str:
+    """Stable hash of an endpoint and its JSON payload."""
+    canonical = json.dumps(
+        {"endpoint": endpoint, "payload": payload}, sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """Journaled predict."""
+
+    fingerprint: str
+    endpoint: str
+    predict_id: int
+    state: str
+    created_at: float
+
+
+class PredictJournal:
+    """SQLite journal of predict ids keyed by request fingerprint.
+
+    A ``submitted`` entry means the server already works on the request: callers
+    re-attach by polling ``predict_id`` instead of resubmitting. Once the caller has
+    the result the entry is removed, so a later identical request is predicted anew
+    (results are reused only by the metric cache, which ``--refresh`` bypasses).
+    ``failed`` and expired entries are ignored.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float | None = None):
+        self._path = Path(path)
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def lookup(self, fingerprint: str) -> JournalEntry | None:
+        """Return the in-flight (submitted, not expired) entry for a fingerprint."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, endpoint, predict_id, state, created_at "
+                "FROM predicts WHERE fingerprint = ?",
+                (fingerprint,),
+            ).fetchone()
+        if row is None or row[3] != STATE_SUBMITTED:
+            return None
+        if self._ttl is not None and time.time() - row[4] > self._ttl:
+            return None
+        return JournalEntry(row[0], row[1], int(row[2]), row[3], row[4])
+
+    def record_submitted(self, fingerprint: str, endpoint: str, predict_id: int) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO predicts "
+                "(fingerprint, endpoint, predict_id, state, result, error, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, NULL, NULL, ?, ?)",
+                (fingerprint, endpoint, int(predict_id), STATE_SUBMITTED, now, now),
+            )
+
+    def record_completed(self, fingerprint: str) -> None:
+        """Drop the entry: the caller has the result and nothing is left to resume."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM predicts WHERE fingerprint = ?", (fingerprint,))
+
+    def record_failed(self, fingerprint: str, error: str) -> None:
+        self._update(fingerprint, STATE_FAILED, error=error)
+
+    def _update(self, fingerprint: str, state: str, error: str | None = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE predicts SET state = ?, error = ?, updated_at = ? WHERE fingerprint = ?",
+                (state, error, time.time(), fingerprint),
+            )
+
+    def pending(self) -> list[JournalEntry]:
+        """Entries still marked as submitted (in flight when the process stopped)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT fingerprint, endpoint, predict_id, state, created_at "
+                "FROM predicts WHERE state = ?",
+                (STATE_SUBMITTED,),
+            ).fetchall()
+        return [JournalEntry(r[0], r[1], int(r[2]), r[3], r[4]) for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_journals: dict[str, PredictJournal] = {}
+_default_lock = threading.Lock()
+
+
+def get_default_journal() -> PredictJournal | None:
+    """Journal configured by VALUEAI_JOURNAL_PATH (None when disabled)."""
+    from configs.settings import settings
+
+    path = getattr(settings, "valueai_journal_path", None)
+    if not path:
+        return None
+    with _default_lock:
+        journal = _default_journals.get(path)
+        if journal is None:
+            journal = PredictJournal(
+                Path(path), ttl_seconds=getattr(settings, "valueai_journal_ttl_seconds", None)
+            )
+            _default_journals[path] = journal
+            logger.debug("Predict journal: %s", path)
+        return journal
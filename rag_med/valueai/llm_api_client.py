@@ -1,18 +1,29 @@
 from __future__ import annotations
+import logging
+import threading
 import time
+import weakref
+from collections.abc import Awaitable, Callable
 from types import SimpleNamespace
 import httpx
 from openai import AsyncOpenAI
 
+from rag_med.valueai.journal import PredictJournal, request_fingerprint
+from rag_med.valueai.singleflight import AsyncSingleFlight, SingleFlight
+from rag_med.valueai.telemetry import PredictTrace, TokenTimer, get_recorder
+
+logger = logging.getLogger(__name__)
+
 
 def get_token(base_url: str, username: str, password: str) -> str:
     url = f"{base_url.rstrip('/')}/token"
-    r = httpx.post(
-        url,
-        json={"username": username, "password": password},
-        headers={"Accept": "application/json", "Content-Type": "application/json"},
-        timeout=30.0,
-    )
+    with TokenTimer(get_recorder()):
+        r = httpx.post(
+            url,
+            json={"username": username, "password": password},
+            headers={"Accept": "application/json", "Content-Type": "application/json"},
+            timeout=30.0,
+        )
     r.raise_for_status()
     data = r.json()
     token = data.get("authorization_token")
@@ -21,6 +32,83 @@ def get_token(base_url: str, username: str, password: str) -> str:
     return token
 
 
+_TOKENS: dict[tuple[str, str], tuple[str, float]] = {}
+_TOKENS_LOCK = threading.Lock()
+
+
+def get_cached_token(base_url: str, username: str, password: str, max_age: float) -> str:
+    """``get_token``, reusing a token issued less than ``max_age`` seconds ago (0 = no reuse)."""
+    if max_age <= 0:
+        return get_token(base_url, username, password)
+    key = (base_url.rstrip("/"), username)
+    now = time.monotonic()
+    with _TOKENS_LOCK:
+        cached = _TOKENS.get(key)
+    if cached is not None and now - cached[1] < max_age:
+        return cached[0]
+    token = get_token(base_url, username, password)
+    with _TOKENS_LOCK:
+        _TOKENS[key] = (token, now)
+    return token
+
+
+def invalidate_token(token: str) -> None:
+    """Drop ``token`` from the cache (the API rejected it)."""
+    with _TOKENS_LOCK:
+        for key, (cached, _) in list(_TOKENS.items()):
+            if cached == token:
+                del _TOKENS[key]
+
+
+class _TokenSource:
+    """Token of an async adapter: fixed, or re-read from ``get_cached_token`` per request.
+
+    With credentials the token follows the cache (renewed after ``max_age`` or once the
+    API rejected it), so a long-lived client outlives its first token.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        username: str | None = None,
+        password: str | None = None,
+        max_age: float = 0.0,
+    ):
+        self._base_url = base_url
+        self._token = token
+        self._credentials = (username, password) if username and password else None
+        self._max_age = max_age
+
+    async def get(self) -> str:
+        if self._credentials is None:
+            return self._token
+        import asyncio
+
+        # The token endpoint is blocking httpx; keep it off the event loop
+        return await asyncio.to_thread(
+            get_cached_token, self._base_url, *self._credentials, self._max_age
+        )
+
+    async def call(self, fn: Callable[[str], Awaitable[str]]) -> str:
+        """``await fn(token)``; on 401 retried once with a renewed token (with credentials)."""
+        token = await self.get()
+        try:
+            return await fn(token)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 401 or self._credentials is None:
+                raise
+            logger.info("ValueAI token rejected, requesting a new one")
+        # _raise_for_status dropped the rejected token from the cache
+        return await fn(await self.get())
+
+
+def _raise_for_status(r: httpx.Response, token: str) -> None:
+    if r.status_code == 401:
+        invalidate_token(token)
+    r.raise_for_status()
+
+
 def _messages_to_instructions_request(messages: list[dict]) -> tuple[str, str]:
     """Convert OpenAI-style messages to instructions (system) + request (user text)."""
     instructions_parts = []
@@ -58,6 +146,34 @@ def _extract_result_text(result: str | dict | None) -> str:
     return str(result)
 
 
+def _llm_payload(
+    model_name: str,
+    request_text: str,
+    instructions: str,
+    max_tokens: int,
+    temperature: float | None,
+) -> dict:
+    return {
+        "model_name": model_name,
+        "request": request_text,
+        "instructions": instructions or None,
+        "temperature": temperature,
+        "tokens_response_limit": max_tokens,
+    }
+
+
+def _journal_lookup(journal: PredictJournal | None, fingerprint: str) -> int | None:
+    """Return the in-flight predict_id to re-attach to from the journal."""
+    if journal is None:
+        return None
+    entry = journal.lookup(fingerprint)
+    return entry.predict_id if entry is not None else None
+
+
+_LLM_SYNC_FLIGHT = SingleFlight("llm_predict_sync")
+_LLM_ASYNC_FLIGHT = AsyncSingleFlight("llm_predict_async")
+
+
 def predict_sync(
     base_url: str,
     token: str,
@@ -67,22 +183,120 @@ def predict_sync(
     temperature: float | None = 0.0,
     poll_interval: float = 2.0,
     timeout: float = 120.0,
+    journal: PredictJournal | None = None,
 ) -> str:
-    """Send messages to v1/llm/predict and poll until result is ready. Returns response text."""
+    """Send messages to v1/llm/predict and poll until result is ready. Returns response text.
+
+    With a ``journal``, a request already submitted (e.g. by a crashed run) is
+    re-attached to by its predict id instead of being resubmitted.
+    Concurrent identical requests are coalesced onto one server prediction.
+    """
     instructions, request_text = _messages_to_instructions_request(messages)
     if not request_text:
         return ""
 
     url = f"{base_url.rstrip('/')}/llm/predict"
-    payload = {
-        "model_name": model_name,
-        "request": request_text,
-        "instructions": instructions or None,
-        "temperature": temperature,
-        "tokens_response_limit": max_tokens,
-    }
+    payload = _llm_payload(model_name, request_text, instructions, max_tokens, temperature)
+    fingerprint = request_fingerprint(url, payload)
+    return _LLM_SYNC_FLIGHT.do(
+        fingerprint,
+        lambda: _predict_sync_once(
+            base_url, token, payload, fingerprint, poll_interval, timeout, journal
+        ),
+    )
+
+
+def _predict_sync_once(
+    base_url: str,
+    token: str,
+    payload: dict,
+    fingerprint: str,
+    poll_interval: float,
+    timeout: float,
+    journal: PredictJournal | None,
+) -> str:
+    predict_id = _journal_lookup(journal, fingerprint)
+    trace = PredictTrace(get_recorder(), "/llm/predict", payload["model_name"])
+    ok = False
+    try:
+        text = _predict_sync_poll(
+            base_url,
+            token,
+            payload,
+            fingerprint,
+            poll_interval,
+            timeout,
+            journal,
+            predict_id,
+            trace,
+        )
+        ok = True
+        return text
+    finally:
+        trace.finished(ok=ok)
+
+
+def _journal_failed(journal: PredictJournal | None, fingerprint: str, error: str) -> None:
+    if journal is not None:
+        journal.record_failed(fingerprint, error)
+
+
+def _reattach_gone(e: httpx.HTTPStatusError, reattached: bool) -> bool:
+    """True when a predict id taken from the journal is unknown to the server (purged)."""
+    return reattached and e.response.status_code in (404, 410)
+
+
+def _predict_sync_poll(
+    base_url: str,
+    token: str,
+    payload: dict,
+    fingerprint: str,
+    poll_interval: float,
+    timeout: float,
+    journal: PredictJournal | None,
+    predict_id: int | None,
+    trace: PredictTrace,
+) -> str:
+    """Submit (unless re-attaching to ``predict_id``) and poll.
+
+    A journal entry whose predict is gone, timed out or rejected is marked failed so the
+    next run resubmits; a purged re-attached id is resubmitted once right away.
+    """
+    reattached = predict_id is not None
+    try:
+        if predict_id is None:
+            predict_id = _submit_sync(base_url, token, payload, fingerprint, journal, trace)
+        try:
+            return _poll_sync(
+                base_url, token, predict_id, fingerprint, poll_interval, timeout, journal, trace
+            )
+        except httpx.HTTPStatusError as e:
+            if not _reattach_gone(e, reattached):
+                raise
+        _journal_failed(journal, fingerprint, f"predict {predict_id} not found")
+        predict_id = _submit_sync(base_url, token, payload, fingerprint, journal, trace)
+        return _poll_sync(
+            base_url, token, predict_id, fingerprint, poll_interval, timeout, journal, trace
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 401:
+            _journal_failed(journal, fingerprint, f"HTTP {e.response.status_code}")
+        raise
+    except TimeoutError as e:
+        _journal_failed(journal, fingerprint, str(e))
+        raise
+
+
+def _submit_sync(
+    base_url: str,
+    token: str,
+    payload: dict,
+    fingerprint: str,
+    journal: PredictJournal | None,
+    trace: PredictTrace,
+) -> int:
     r = httpx.post(
-        url,
+        f"{base_url.rstrip('/')}/llm/predict",
         json=payload,
         headers={
             "Accept": "application/json",
@@ -91,12 +305,27 @@ def predict_sync(
         },
         timeout=120.0,
     )
-    r.raise_for_status()
+    _raise_for_status(r, token)
     data = r.json()
     predict_id = data.get("id")
     if predict_id is None:
         raise RuntimeError("Predict response has no id")
+    trace.submitted()
+    if journal is not None:
+        journal.record_submitted(fingerprint, "/llm/predict", predict_id)
+    return predict_id
+
 
+def _poll_sync(
+    base_url: str,
+    token: str,
+    predict_id: int,
+    fingerprint: str,
+    poll_interval: float,
+    timeout: float,
+    journal: PredictJournal | None,
+    trace: PredictTrace,
+) -> str:
     predict_url = f"{base_url.rstrip('/')}/llm/predicts/{predict_id}"
     deadline = time.monotonic() + timeout
     while time.monotonic() < deadline:
@@ -105,13 +334,18 @@ def predict_sync(
             headers={"Accept": "application/json", "Authorization": f"Bearer {token}"},
             timeout=120.0,
         )
-        r2.raise_for_status()
+        _raise_for_status(r2, token)
         body = r2.json()
         status = (body.get("status") or "").lower()
         result = body.get("result")
+        trace.polled(status or ("completed" if result is not None else ""))
         if result is not None:
-            return _extract_result_text(result)
+            text = _extract_result_text(result)
+            if journal is not None:
+                journal.record_completed(fingerprint)
+            return text
         if status in ("failed", "error", "cancelled"):
+            _journal_failed(journal, fingerprint, status)
             raise RuntimeError(f"Predict failed with status: {status}")
         time.sleep(poll_interval)
 
@@ -127,64 +361,234 @@ async def predict_async(
     temperature: float | None = 0.0,
     poll_interval: float = 2.0,
     timeout: float = 120.0,
+    journal: PredictJournal | None = None,
+    http_client: httpx.AsyncClient | None = None,
 ) -> str:
-    """Async: send messages to v1/llm/predict and poll until result is ready."""
-    import asyncio
+    """Async: send messages to v1/llm/predict and poll until result is ready.
 
+    Submit and poll requests go through ``http_client`` when given (pooled
+    connections); otherwise a single client is opened for this call.
+    Concurrent identical requests on one event loop share one server prediction.
+    """
     instructions, request_text = _messages_to_instructions_request(messages)
     if not request_text:
         return ""
 
     url = f"{base_url.rstrip('/')}/llm/predict"
-    payload = {
-        "model_name": model_name,
-        "request": request_text,
-        "instructions": instructions or None,
-        "temperature": temperature,
-        "tokens_response_limit": max_tokens,
-    }
-    async with httpx.AsyncClient() as client:
-        r = await client.post(
-            url,
-            json=payload,
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {token}",
-            },
-            timeout=120.0,
+    payload = _llm_payload(model_name, request_text, instructions, max_tokens, temperature)
+    fingerprint = request_fingerprint(url, payload)
+
+    async def run() -> str:
+        if http_client is not None:
+            return await _predict_async_once(
+                http_client, base_url, token, payload, fingerprint, poll_interval, timeout, journal
+            )
+        async with httpx.AsyncClient() as client:
+            return await _predict_async_once(
+                client, base_url, token, payload, fingerprint, poll_interval, timeout, journal
+            )
+
+    return await _LLM_ASYNC_FLIGHT.do(fingerprint, run)
+
+
+async def _predict_async_once(
+    http_client: httpx.AsyncClient,
+    base_url: str,
+    token: str,
+    payload: dict,
+    fingerprint: str,
+    poll_interval: float,
+    timeout: float,
+    journal: PredictJournal | None,
+) -> str:
+    predict_id = _journal_lookup(journal, fingerprint)
+    trace = PredictTrace(get_recorder(), "/llm/predict", payload["model_name"])
+    ok = False
+    try:
+        text = await _predict_async_poll(
+            http_client,
+            base_url,
+            token,
+            payload,
+            fingerprint,
+            poll_interval,
+            timeout,
+            journal,
+            predict_id,
+            trace,
         )
-    r.raise_for_status()
+        ok = True
+        return text
+    finally:
+        trace.finished(ok=ok)
+
+
+async def _predict_async_poll(
+    http_client: httpx.AsyncClient,
+    base_url: str,
+    token: str,
+    payload: dict,
+    fingerprint: str,
+    poll_interval: float,
+    timeout: float,
+    journal: PredictJournal | None,
+    predict_id: int | None,
+    trace: PredictTrace,
+) -> str:
+    """Async ``_predict_sync_poll`` (same journal handling)."""
+    reattached = predict_id is not None
+    try:
+        if predict_id is None:
+            predict_id = await _submit_async(
+                http_client, base_url, token, payload, fingerprint, journal, trace
+            )
+        try:
+            return await _poll_async(
+                http_client,
+                base_url,
+                token,
+                predict_id,
+                fingerprint,
+                poll_interval,
+                timeout,
+                journal,
+                trace,
+            )
+        except httpx.HTTPStatusError as e:
+            if not _reattach_gone(e, reattached):
+                raise
+        _journal_failed(journal, fingerprint, f"predict {predict_id} not found")
+        predict_id = await _submit_async(
+            http_client, base_url, token, payload, fingerprint, journal, trace
+        )
+        return await _poll_async(
+            http_client,
+            base_url,
+            token,
+            predict_id,
+            fingerprint,
+            poll_interval,
+            timeout,
+            journal,
+            trace,
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 401:
+            _journal_failed(journal, fingerprint, f"HTTP {e.response.status_code}")
+        raise
+    except TimeoutError as e:
+        _journal_failed(journal, fingerprint, str(e))
+        raise
+
+
+async def _submit_async(
+    http_client: httpx.AsyncClient,
+    base_url: str,
+    token: str,
+    payload: dict,
+    fingerprint: str,
+    journal: PredictJournal | None,
+    trace: PredictTrace,
+) -> int:
+    r = await http_client.post(
+        f"{base_url.rstrip('/')}/llm/predict",
+        json=payload,
+        headers={
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}",
+        },
+        timeout=120.0,
+    )
+    _raise_for_status(r, token)
     data = r.json()
     predict_id = data.get("id")
     if predict_id is None:
         raise RuntimeError("Predict response has no id")
+    trace.submitted()
+    if journal is not None:
+        journal.record_submitted(fingerprint, "/llm/predict", predict_id)
+    return predict_id
+
+
+async def _poll_async(
+    http_client: httpx.AsyncClient,
+    base_url: str,
+    token: str,
+    predict_id: int,
+    fingerprint: str,
+    poll_interval: float,
+    timeout: float,
+    journal: PredictJournal | None,
+    trace: PredictTrace,
+) -> str:
+    import asyncio
 
     predict_url = f"{base_url.rstrip('/')}/llm/predicts/{predict_id}"
     deadline = time.monotonic() + timeout
-    async with httpx.AsyncClient() as client:
-        while time.monotonic() < deadline:
-            r2 = await client.get(
-                predict_url,
-                headers={
-                    "Accept": "application/json",
-                    "Authorization": f"Bearer {token}",
-                },
-                timeout=120.0,
-            )
-            r2.raise_for_status()
-            body = r2.json()
-            status = (body.get("status") or "").lower()
-            result = body.get("result")
-            if result is not None:
-                return _extract_result_text(result)
-            if status in ("failed", "error", "cancelled"):
-                raise RuntimeError(f"Predict failed with status: {status}")
-            await asyncio.sleep(poll_interval)
+    while time.monotonic() < deadline:
+        r2 = await http_client.get(
+            predict_url,
+            headers={
+                "Accept": "application/json",
+                "Authorization": f"Bearer {token}",
+            },
+            timeout=120.0,
+        )
+        _raise_for_status(r2, token)
+        body = r2.json()
+        status = (body.get("status") or "").lower()
+        result = body.get("result")
+        trace.polled(status or ("completed" if result is not None else ""))
+        if result is not None:
+            text = _extract_result_text(result)
+            if journal is not None:
+                journal.record_completed(fingerprint)
+            return text
+        if status in ("failed", "error", "cancelled"):
+            _journal_failed(journal, fingerprint, status)
+            raise RuntimeError(f"Predict failed with status: {status}")
+        await asyncio.sleep(poll_interval)
 
     raise TimeoutError(f"Predict {predict_id} did not complete within {timeout}s")
 
 
+class _AsyncHTTPPool:
+    """One pooled ``httpx.AsyncClient`` per event loop.
+
+    Connections are bound to the loop that opened them, so each loop using the
+    owner (RAGAS sync ``score()`` runs ``asyncio.run`` per call, possibly from
+    several evaluation threads at once) gets its own client.
+    """
+
+    def __init__(self, max_connections: int = 32):
+        self._limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._lock = threading.Lock()
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def get(self) -> httpx.AsyncClient:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(limits=self._limits, timeout=120.0)
+                self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close the client of the running loop (others die with their loops)."""
+        import asyncio
+
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
 def make_async_chat_completion(content: str):
     """Build a minimal ChatCompletion-like object with choices[0].message.content and finish_reason."""
     msg = SimpleNamespace(content=content)
@@ -203,16 +607,32 @@ class ValueAIAsyncClient:
         max_tokens: int = 8192,
         poll_interval: float = 2.0,
         timeout: float = 120.0,
+        journal: PredictJournal | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        token_ttl: float = 0.0,
     ):
         self._base_url = base_url.rstrip("/")
-        self._token = token
+        self._tokens = _TokenSource(self._base_url, token, username, password, token_ttl)
         self._model_name = model_name
         self._max_tokens = max_tokens
         self._poll_interval = poll_interval
         self._timeout = timeout
+        self._journal = journal
+        self._http = _AsyncHTTPPool()
         self.chat = self
         self.completions = self
 
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections."""
+        await self._http.aclose()
+
+    async def __aenter__(self) -> ValueAIAsyncClient:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
     async def create(
         self,
         model: str | None = None,
@@ -224,15 +644,19 @@ class ValueAIAsyncClient:
         model_name = model or self._model_name
         messages = messages or []
         max_tok = max_tokens if max_tokens is not None else self._max_tokens
-        text = await predict_async(
-            self._base_url,
-            self._token,
-            model_name,
-            messages,
-            max_tokens=max_tok,
-            temperature=temperature,
-            poll_interval=self._poll_interval,
-            timeout=self._timeout,
+        text = await self._tokens.call(
+            lambda token: predict_async(
+                self._base_url,
+                token,
+                model_name,
+                messages,
+                max_tokens=max_tok,
+                temperature=temperature,
+                poll_interval=self._poll_interval,
+                timeout=self._timeout,
+                journal=self._journal,
+                http_client=self._http.get(),
+            )
         )
         return make_async_chat_completion(text)
 
@@ -246,15 +670,19 @@ class _ValueAICompletions:
         model_name = model or self._client._valueai_model
         messages = messages or []
         max_tok = max_tokens or self._client._valueai_max_tokens
-        text = await predict_async(
-            self._client._valueai_base_url,
-            self._client._valueai_token,
-            model_name,
-            messages,
-            max_tokens=max_tok,
-            temperature=temperature,
-            poll_interval=self._client._valueai_poll_interval,
-            timeout=self._client._valueai_timeout,
+        text = await self._client._valueai_tokens.call(
+            lambda token: predict_async(
+                self._client._valueai_base_url,
+                token,
+                model_name,
+                messages,
+                max_tokens=max_tok,
+                temperature=temperature,
+                poll_interval=self._client._valueai_poll_interval,
+                timeout=self._client._valueai_timeout,
+                journal=self._client._valueai_journal,
+                http_client=self._client._valueai_http.get(),
+            )
         )
         return make_async_chat_completion(text)
 
@@ -276,6 +704,10 @@ class ValueAIAsyncOpenAI(AsyncOpenAI):
         max_tokens: int = 8192,
         poll_interval: float = 2.0,
         timeout: float = 120.0,
+        journal: PredictJournal | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        token_ttl: float = 0.0,
         **kwargs,
     ):
         super().__init__(
@@ -285,13 +717,24 @@ class ValueAIAsyncOpenAI(AsyncOpenAI):
             **kwargs,
         )
         self._valueai_base_url = base_url.rstrip("/")
-        self._valueai_token = token
+        # With credentials each request takes the current cached token (renewed on 401)
+        self._valueai_tokens = _TokenSource(
+            self._valueai_base_url, token, username, password, token_ttl
+        )
         self._valueai_model = model_name
         self._valueai_max_tokens = max_tokens
         self._valueai_poll_interval = poll_interval
         self._valueai_timeout = timeout
+        self._valueai_journal = journal
+        self._valueai_http = _AsyncHTTPPool()
+        self._valueai_chat = _ValueAIChat(self)
 
     @property
     def chat(self):
-        return _ValueAIChat(self)
+        return self._valueai_chat
+
+    async def close(self) -> None:
+        """Close pooled ValueAI connections and the underlying OpenAI client."""
+        await self._valueai_http.aclose()
+        await super().close()
 
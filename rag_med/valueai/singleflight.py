@@ -0,0 +1,128 @@
+"""Single-flight coalescing of concurrent identical ValueAI requests."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+_groups: dict[str, _Counters] = {}
+_groups_lock = threading.Lock()
+
+
+class _Counters:
+    def __init__(self, name: str):
+        self.name = name
+        self._counter_lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        with _groups_lock:
+            _groups[name] = self
+
+    def _count(self, *, leader: bool) -> None:
+        with self._counter_lock:
+            self.calls += 1
+            if leader:
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+    def stats(self) -> dict:
+        """Calls seen, calls executed and calls saved by coalescing."""
+        with self._counter_lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+            }
+
+    def reset_stats(self) -> None:
+        with self._counter_lock:
+            self.calls = self.executions = self.coalesced = 0
+
+
+class _Call:
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(_Counters):
+    """Thread-based single flight: concurrent ``do(key, fn)`` calls share one ``fn()``."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lock = threading.Lock()
+        self._inflight: dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if call is None:
+                call = self._inflight[key] = _Call()
+        self._count(leader=leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight(_Counters):
+    """Asyncio single flight; waiters on the same event loop share one coroutine."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple[int, str], asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        with self._lock:
+            fut = self._inflight.get(slot)
+            leader = fut is None
+            if fut is None:
+                fut = self._inflight[slot] = loop.create_future()
+        self._count(leader=leader)
+
+        if not leader:
+            return await asyncio.shield(fut)
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else waits
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(slot, None)
+
+
+def singleflight_stats() -> dict[str, dict]:
+    """Counters of every single-flight group, keyed by group name."""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {g.name: g.stats() for g in groups}
@@ -0,0 +1,198 @@
+"""Latency breakdown of ValueAI calls (submit, queueing, result, polls, auth)."""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import threading
+import time
+
+from rag_med.tracing import event as trace_event
+
+SUBMIT_RTT = "submit_rtt_seconds"
+FIRST_NONPENDING = "time_to_first_nonpending_seconds"
+TIME_TO_RESULT = "time_to_result_seconds"
+POLL_COUNT = "poll_count"
+TOKEN_FETCH = "token_fetch_seconds"
+
+_PENDING_STATUSES = frozenset({"", "pending", "queued", "created", "new", "waiting"})
+_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Count/sum/min/max plus a bounded uniform reservoir for quantiles."""
+
+    def __init__(self, reservoir_size: int = 4096):
+        self._size = reservoir_size
+        self._samples: list[float] = []
+        self._rng = random.Random(0)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._samples) < self._size:
+            self._samples.append(value)
+        else:
+            j = self._rng.randrange(self.count)
+            if j < self._size:
+                self._samples[j] = value
+
+    def quantile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+        return ordered[rank]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class LatencyRecorder:
+    """Thread-safe histograms keyed by (metric, endpoint, model)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str, str], Histogram] = {}
+        self._in_flight: dict[str, int] = {}
+
+    def observe(self, metric: str, value: float, *, endpoint: str, model: str = "") -> None:
+        key = (metric, endpoint, model)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(value)
+
+    def track_in_flight(self, endpoint: str, delta: int) -> None:
+        with self._lock:
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + delta
+
+    def in_flight(self) -> dict[str, int]:
+        """Predicts currently submitted or polled, per endpoint."""
+        with self._lock:
+            return dict(sorted(self._in_flight.items()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        """``{metric: [{"endpoint", "model", count, sum, mean, min, max, p50, p95, p99}]}``."""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            out: dict[str, list[dict]] = {}
+            for (metric, endpoint, model), hist in items:
+                out.setdefault(metric, []).append(
+                    {"endpoint": endpoint, "model": model, **hist.summary()}
+                )
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = "valueai_") -> str:
+        """Prometheus text exposition (one ``summary`` per metric)."""
+        lines: list[str] = []
+        for metric, series in self.snapshot().items():
+            name = prefix + metric
+            lines.append(f"# TYPE {name} summary")
+            for s in series:
+                labels = f'endpoint="{_escape(s["endpoint"])}",model="{_escape(s["model"])}"'
+                for q in _QUANTILES:
+                    value = s[f"p{round(q * 100)}"]
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {_fmt(value)}')
+                lines.append(f"{name}_sum{{{labels}}} {_fmt(s['sum'])}")
+                lines.append(f"{name}_count{{{labels}}} {s['count']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(value: float | None) -> str:
+    return "NaN" if value is None else repr(float(value))
+
+
+class PredictTrace:
+    """Timings of one predict: submit RTT, first non-pending status, result and polls."""
+
+    def __init__(self, recorder: LatencyRecorder, endpoint: str, model: str):
+        self._recorder = recorder
+        self._endpoint = endpoint
+        self._model = model
+        self._started = time.perf_counter()
+        self._nonpending_seen = False
+        self.polls = 0
+        recorder.track_in_flight(endpoint, 1)
+
+    def _observe(self, metric: str, value: float) -> None:
+        self._recorder.observe(metric, value, endpoint=self._endpoint, model=self._model)
+
+    def submitted(self) -> None:
+        self._observe(SUBMIT_RTT, time.perf_counter() - self._started)
+
+    def polled(self, status: str | None) -> None:
+        self.polls += 1
+        if not self._nonpending_seen and (status or "").lower() not in _PENDING_STATUSES:
+            self._nonpending_seen = True
+            self._observe(FIRST_NONPENDING, time.perf_counter() - self._started)
+
+    def finished(self, *, ok: bool) -> None:
+        elapsed = time.perf_counter() - self._started
+        self._recorder.track_in_flight(self._endpoint, -1)
+        if ok:
+            self._observe(TIME_TO_RESULT, elapsed)
+        self._observe(POLL_COUNT, float(self.polls))
+        trace_event(
+            "valueai.predict",
+            level="info" if ok else "error",
+            endpoint=self._endpoint,
+            model=self._model,
+            ok=ok,
+            polls=self.polls,
+            duration_ms=round(elapsed * 1000, 3),
+        )
+
+
+class TokenTimer:
+    """Context manager recording token-fetch time."""
+
+    def __init__(self, recorder: LatencyRecorder, endpoint: str = "/token"):
+        self._recorder = recorder
+        self._endpoint = endpoint
+        self._started = 0.0
+
+    def __enter__(self) -> TokenTimer:
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._recorder.observe(
+            TOKEN_FETCH, time.perf_counter() - self._started, endpoint=self._endpoint
+        )
+
+
+_recorder = LatencyRecorder()
+
+
+def get_recorder() -> LatencyRecorder:
+    """Process-wide recorder used by the ValueAI clients."""
+    return _recorder
@@ -0,0 +1,26 @@
+"""Shared job queue for generation and evaluation across hosts (``rag-med worker``)."""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from .queue import Job, JobQueue
+
+if TYPE_CHECKING:
+    from .coordinator import coordinate_pdf, get_job_queue
+    from .worker import Worker
+
+__all__ = ["Job", "JobQueue", "Worker", "coordinate_pdf", "get_job_queue"]
+
+_LAZY = {"Worker": ".worker", "coordinate_pdf": ".coordinator", "get_job_queue": ".coordinator"}
+
+
+def __getattr__(name: str) -> object:
+    # The worker and coordinator import the generator, PDF and metrics modules
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,299 @@
+"""Publish a PDF's work to the job queue and merge the finished jobs into result files.
+
+The batch ID is the run manifest key, so running the coordinator again for the same
+PDF, seed and settings attaches to the existing batch instead of publishing it twice;
+if that batch has finished, its failed jobs are queued again.
+The merged results, the evaluation summary and the manifest file have the same layout
+as those of ``rag-med generate``; the summary also gets a ``workqueue`` section.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from configs.settings import settings
+from rag_med.evaluation.stats import MetricAggregator
+from rag_med.qa_generator.generator import (
+    CHUNKS_PER_QA,
+    _averaged_metrics,
+    _eval_summary_path,
+    _generation_failed,
+    _merge_item_metrics,
+    _read_pdf_text,
+    _split_text_chunks,
+)
+from rag_med.qa_generator.dedup import dedup_stats
+from rag_med.qa_generator.manifest import (
+    RunManifest,
+    file_sha256,
+    resolve_seed,
+    sample_chunk_groups,
+)
+from rag_med.qa_generator.models import QAResult
+from rag_med.qa_generator.output import write_results
+from rag_med.results_store import record_run, run_meta
+from rag_med.workqueue.queue import STATE_DONE, Job, JobQueue
+from rag_med.workqueue.tasks import (
+    DISTRIBUTED_METRICS,
+    KIND_GENERATE,
+    KIND_METRIC,
+    KIND_RAG,
+    generate_job,
+)
+from rag_med.workqueue.worker import Worker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Batch:
+    batch_id: str
+    manifest: RunManifest
+    pdf_path: Path
+    evaluate: bool
+    attached: bool = False
+
+
+def get_job_queue(path: Path | None = None) -> JobQueue:
+    """Queue at ``path`` or WORKQUEUE_PATH."""
+    return JobQueue(
+        Path(path or getattr(settings, "workqueue_path", ".rag_med/workqueue.sqlite3")),
+        max_attempts=getattr(settings, "workqueue_max_attempts", 3),
+        retry_delay=getattr(settings, "workqueue_retry_delay_seconds", 5.0),
+    )
+
+
+def publish_pdf(
+    queue: JobQueue,
+    pdf_path: Path,
+    *,
+    num_questions: int | None = None,
+    evaluate: bool = False,
+    seed: int | None = None,
+) -> Batch:
+    """Split the PDF, sample the seeded chunk groups and publish one generate job per group."""
+    if not pdf_path.exists():
+        msg = f"PDF файл не найден: {pdf_path}"
+        raise FileNotFoundError(msg)
+    text_chunks = _split_text_chunks(_read_pdf_text(pdf_path))
+    max_questions = len(text_chunks) // CHUNKS_PER_QA
+    if max_questions <= 0:
+        msg = (
+            f"Не найдено достаточно chunk-ов: нужно минимум {CHUNKS_PER_QA}, "
+            f"сейчас {len(text_chunks)}."
+        )
+        raise ValueError(msg)
+    if num_questions is None:
+        num_questions = min(settings.num_chunks_to_select, max_questions)
+    if not (1 <= num_questions <= max_questions):
+        msg = f"num_questions must be in range 1..{max_questions}. Got: {num_questions}"
+        raise ValueError(msg)
+
+    seed = resolve_seed(seed)
+    pdf_sha256 = file_sha256(pdf_path)
+    groups = sample_chunk_groups(
+        len(text_chunks), num_questions, CHUNKS_PER_QA, seed=seed, pdf_sha256=pdf_sha256
+    )
+    manifest = RunManifest.build(
+        pdf_path=pdf_path,
+        pdf_sha256=pdf_sha256,
+        seed=seed,
+        chunk_groups=groups,
+        evaluate=evaluate,
+    )
+    batch_id = manifest.key
+    if queue.batch_counts(batch_id):
+        # A rerun after failures retries them instead of merging the same errors again
+        retried = queue.retry_failed(batch_id) if queue.batch_finished(batch_id) else 0
+        if retried:
+            logger.info("Батч %s: повторный запуск %s упавших заданий", batch_id[:12], retried)
+        else:
+            logger.info("Батч %s уже опубликован, ожидание его завершения", batch_id[:12])
+        return Batch(batch_id, manifest, pdf_path, evaluate, attached=True)
+    queue.enqueue(
+        batch_id,
+        [
+            generate_job(idx + 1, "\n\n".join(text_chunks[i] for i in group), evaluate)
+            for idx, group in enumerate(groups)
+        ],
+    )
+    logger.info(
+        "Опубликовано %s заданий генерации, батч %s (seed %s)", len(groups), batch_id[:12], seed
+    )
+    return Batch(batch_id, manifest, pdf_path, evaluate)
+
+
+def wait_for_batch(
+    queue: JobQueue,
+    batch_id: str,
+    *,
+    poll_seconds: float = 2.0,
+    timeout: float | None = None,
+    log_interval: float = 30.0,
+) -> None:
+    """Block until no job of the batch is pending or leased."""
+    started = last_log = time.monotonic()
+    while not queue.batch_finished(batch_id):
+        now = time.monotonic()
+        if timeout is not None and now - started > timeout:
+            msg = f"Batch {batch_id[:12]} not finished after {timeout:.0f}s"
+            raise TimeoutError(msg)
+        if now - last_log >= log_interval:
+            logger.info("Батч %s: %s", batch_id[:12], queue.batch_counts(batch_id))
+            last_log = now
+        time.sleep(poll_seconds)
+
+
+def _failed_generation(job: Job) -> QAResult:
+    chunk = job.payload["chunk"]
+    return QAResult(
+        chunk_index=job.payload["chunk_index"],
+        chunk=chunk,
+        chunk_length_chars=len(chunk),
+        chunk_length_words=len(chunk.split()),
+        model_used=getattr(settings, "metrics_llm_model_name", ""),
+        question="Ошибка",
+        answer="Ошибка",
+        raw_model_output=f"Ошибка: модель не ответила - {job.error}",
+    )
+
+
+def merge_batch(queue: JobQueue, batch: Batch) -> tuple[list[QAResult], dict | None]:
+    """QA results of a finished batch by chunk index, plus aggregate metrics if evaluated."""
+    results = [
+        QAResult.model_validate(job.result) if job.state == STATE_DONE else _failed_generation(job)
+        for job in queue.batch_jobs(batch.batch_id, KIND_GENERATE)
+    ]
+    results.sort(key=lambda r: r.chunk_index)
+    if not batch.evaluate:
+        return results, None
+
+    answers: dict[int, Job] = {}
+    for job in queue.batch_jobs(batch.batch_id, KIND_RAG):
+        answers[job.payload["result"]["chunk_index"]] = job
+    item_metrics: dict[int, dict[str, Job]] = {}
+    for job in queue.batch_jobs(batch.batch_id, KIND_METRIC):
+        chunk_index = job.payload["result"]["chunk_index"]
+        item_metrics.setdefault(chunk_index, {})[job.payload["metric"]] = job
+
+    averaged = _averaged_metrics(with_lexical=False)
+    stats = MetricAggregator(averaged.values())
+    n_evaluated = 0
+    for r in results:
+        r.valueai_answer = None
+        if _generation_failed(r):
+            r.evaluation_metrics = {"skipped": "generation failed"}
+            continue
+        rag_job = answers.get(r.chunk_index)
+        metric_jobs = item_metrics.get(r.chunk_index, {})
+        failed = [j for j in (rag_job, *metric_jobs.values()) if j and j.state != STATE_DONE]
+        if rag_job is None or failed or set(metric_jobs) != set(DISTRIBUTED_METRICS):
+            error = failed[0].error if failed else "evaluation jobs missing"
+            logger.error("ValueAI error for chunk %s: %s", r.chunk_index, error)
+            r.evaluation_metrics = {"error": error}
+            continue
+        metrics = _merge_item_metrics(
+            metric_jobs["ragas"].result["value"],
+            metric_jobs["text"].result["value"],
+            metric_jobs["llm_judge"].result["value"],
+        )
+        r.valueai_answer = rag_job.result["valueai_answer"]
+        r.evaluation_metrics = metrics
+        stats.add(metrics)
+        n_evaluated += 1
+
+    aggregate = {
+        "count": len(results),
+        **{name: stats.mean(key) for name, key in averaged.items()},
+        "evaluated_count": n_evaluated,
+        "metric_stats": stats.summary(),
+    }
+    return results, aggregate
+
+
+def write_batch(
+    queue: JobQueue,
+    batch: Batch,
+    output_file: Path,
+    summary_file: Path | None = None,
+) -> list[QAResult]:
+    """Merge a finished batch and write the results, manifest and (evaluated) summary files."""
+    results, aggregate = merge_batch(queue, batch)
+    manifest_file = output_file.with_name(f"{output_file.stem}_manifest.json")
+    manifest_file.write_text(
+        json.dumps(batch.manifest.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    write_results(results, output_file)
+    logger.info(f"Готово! Результаты сохранены в: {output_file}")
+    if aggregate is not None:
+        summary_file = _eval_summary_path(output_file, summary_file)
+        summary = {
+            "pdf_path": str(batch.pdf_path),
+            "num_questions": batch.manifest.num_questions,
+            "aggregate_metrics": aggregate,
+            "manifest": batch.manifest.to_dict(),
+            "chunk_dedup": dedup_stats(),
+            "workqueue": {
+                "batch": batch.batch_id,
+                "queue": str(queue.path),
+                "jobs": queue.batch_counts(batch.batch_id),
+                "metrics": list(DISTRIBUTED_METRICS),
+            },
+        }
+        summary_file.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+        logger.info("ValueAI evaluation summary saved to: %s", summary_file)
+    record_run(
+        results,
+        kind="distributed",
+        source=str(batch.pdf_path),
+        results_file=output_file,
+        summary_file=summary_file if aggregate is not None else None,
+        meta=run_meta(manifest=batch.manifest.to_dict()),
+    )
+    return results
+
+
+def coordinate_pdf(
+    pdf_path: Path,
+    output_file: Path,
+    *,
+    num_questions: int | None = None,
+    evaluate: bool = False,
+    summary_file: Path | None = None,
+    seed: int | None = None,
+    queue: JobQueue | None = None,
+    local_workers: int = 0,
+    timeout: float | None = None,
+) -> list[QAResult]:
+    """Publish the PDF's jobs, wait for the workers and write the merged result files.
+
+    With ``local_workers`` this process drains the queue on that many threads as well.
+    """
+    queue = queue or get_job_queue()
+    batch = publish_pdf(
+        queue, pdf_path, num_questions=num_questions, evaluate=evaluate, seed=seed
+    )
+    poll_seconds = getattr(settings, "workqueue_poll_seconds", 2.0)
+    stop = threading.Event()
+    local = None
+    if local_workers > 0:
+        worker = Worker(
+            queue,
+            lease_seconds=getattr(settings, "workqueue_lease_seconds", 120.0),
+            poll_seconds=poll_seconds,
+            concurrency=local_workers,
+        )
+        local = threading.Thread(target=worker.run, kwargs={"stop": stop}, daemon=True)
+        local.start()
+    try:
+        wait_for_batch(queue, batch.batch_id, poll_seconds=poll_seconds, timeout=timeout)
+    finally:
+        stop.set()
+        if local is not None:
+            local.join()
+    return write_batch(queue, batch, output_file, summary_file)
@@ -0,0 +1,312 @@
+"""SQLite job queue with leases, heartbeats and bounded retries.
+
+Workers on any host that can open the database file take jobs with ``lease``. A
+lease expires unless renewed by ``heartbeat``; an expired job goes back to the
+queue (counting as an attempt), so a crashed worker's work is picked up by another.
+``complete`` can publish follow-up jobs in the same transaction, which is how a
+generated QA pair becomes a RAG job and a RAG answer becomes metric jobs.
+
+The database uses SQLite's rollback journal rather than WAL: WAL needs shared
+memory and is unsafe when workers reach the file over a network filesystem.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+STATE_PENDING = "pending"
+STATE_LEASED = "leased"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        batch TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        payload TEXT NOT NULL,
+        state TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        available_at REAL NOT NULL,
+        lease_owner TEXT,
+        lease_expires REAL,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority DESC, available_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch, kind, state)",
+)
+
+
+@dataclass(frozen=True)
+class Job:
+    job_id: int
+    batch: str
+    kind: str
+    payload: dict
+    state: str
+    attempts: int
+    max_attempts: int
+    result: object | None = None
+    error: str | None = None
+
+
+def _job(row: sqlite3.Row) -> Job:
+    return Job(
+        job_id=row["job_id"],
+        batch=row["batch"],
+        kind=row["kind"],
+        payload=json.loads(row["payload"]),
+        state=row["state"],
+        attempts=row["attempts"],
+        max_attempts=row["max_attempts"],
+        result=json.loads(row["result"]) if row["result"] is not None else None,
+        error=row["error"],
+    )
+
+
+class JobQueue:
+    """Jobs grouped by ``batch``; higher ``priority`` is leased first, then oldest.
+
+    A job that fails (or whose lease expires) is retried after ``retry_delay``
+    seconds times the attempt number until ``max_attempts``, then marked failed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+    ):
+        self._path = Path(path)
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self._path), check_same_thread=False, timeout=60, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._write():
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the database write lock up front, so two processes
+        # cannot lease the same job
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _insert(
+        self, conn: sqlite3.Connection, batch: str, jobs: Iterable[tuple[str, dict, int]]
+    ) -> list[int]:
+        now = time.time()
+        ids = []
+        for kind, payload, priority in jobs:
+            cur = conn.execute(
+                "INSERT INTO jobs (batch, kind, priority, payload, state, max_attempts, "
+                "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    batch,
+                    kind,
+                    priority,
+                    json.dumps(payload, ensure_ascii=False),
+                    STATE_PENDING,
+                    self._max_attempts,
+                    now,
+                    now,
+                    now,
+                ),
+            )
+            ids.append(cur.lastrowid)
+        return ids
+
+    def enqueue(self, batch: str, jobs: Sequence[tuple[str, dict, int]]) -> list[int]:
+        """Add ``(kind, payload, priority)`` jobs to ``batch``; returns their ids."""
+        with self._write() as conn:
+            return self._insert(conn, batch, jobs)
+
+    def lease(
+        self, owner: str, *, lease_seconds: float, kinds: Sequence[str] | None = None
+    ) -> Job | None:
+        """Take the next ready job (pending, or leased with an expired lease)."""
+        now = time.time()
+        kind_filter = ""
+        params: list[object] = [STATE_PENDING, now, STATE_LEASED, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        with self._write() as conn:
+            self._fail_exhausted(conn, now)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE ((state = ? AND available_at <= ?) "
+                "OR (state = ? AND lease_expires < ?))"
+                f"{kind_filter} ORDER BY priority DESC, available_at, job_id LIMIT 1",
+                params,
+            ).fetchone()
+            if row is None:
+                return None
+            if row["state"] == STATE_LEASED:
+                logger.warning(
+                    "Lease of job %s (%s) by %s expired, re-leasing",
+                    row["job_id"],
+                    row["kind"],
+                    row["lease_owner"],
+                )
+            conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                (STATE_LEASED, owner, now + lease_seconds, now, row["job_id"]),
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+        return _job(row)
+
+    def _fail_exhausted(self, conn: sqlite3.Connection, now: float) -> None:
+        # Expired leases that used their last attempt are not retried
+        conn.execute(
+            "UPDATE jobs SET state = ?, error = COALESCE(error, 'lease expired'), "
+            "lease_owner = NULL, updated_at = ? "
+            "WHERE state = ? AND lease_expires < ? AND attempts >= max_attempts",
+            (STATE_FAILED, now, STATE_LEASED, now),
+        )
+
+    def heartbeat(self, job_id: int, owner: str, *, lease_seconds: float) -> bool:
+        """Extend the lease; False when ``owner`` lost it (expired and re-leased)."""
+        now = time.time()
+        with self._write() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, STATE_LEASED, owner),
+            )
+        return cur.rowcount == 1
+
+    def complete(
+        self,
+        job: Job,
+        owner: str,
+        result: object,
+        follow_ups: Sequence[tuple[str, dict, int]] = (),
+    ) -> bool:
+        """Store the result and enqueue ``follow_ups``; False (nothing stored) without the lease."""
+        now = time.time()
+        with self._write() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, error = NULL, lease_owner = NULL, "
+                "updated_at = ? WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                (
+                    STATE_DONE,
+                    json.dumps(result, ensure_ascii=False),
+                    now,
+                    job.job_id,
+                    STATE_LEASED,
+                    owner,
+                ),
+            )
+            if cur.rowcount != 1:
+                return False
+            self._insert(conn, job.batch, follow_ups)
+        return True
+
+    def fail(self, job: Job, owner: str, error: str) -> None:
+        """Release the job for a retry, or mark it failed after its last attempt."""
+        now = time.time()
+        final = job.attempts >= job.max_attempts
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, lease_owner = NULL, available_at = ?, "
+                "updated_at = ? WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                (
+                    STATE_FAILED if final else STATE_PENDING,
+                    error[:2000],
+                    now + self._retry_delay * job.attempts,
+                    now,
+                    job.job_id,
+                    STATE_LEASED,
+                    owner,
+                ),
+            )
+
+    def retry_failed(self, batch: str) -> int:
+        """Put the failed jobs of ``batch`` back in the queue with fresh attempts."""
+        now = time.time()
+        with self._write() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, available_at = ?, updated_at = ? "
+                "WHERE batch = ? AND state = ?",
+                (STATE_PENDING, now, now, batch, STATE_FAILED),
+            )
+        return cur.rowcount
+
+    def batch_counts(self, batch: str) -> dict[str, dict[str, int]]:
+        """``{kind: {state: count}}`` of a batch."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, state, COUNT(*) AS n FROM jobs WHERE batch = ? GROUP BY kind, state",
+                (batch,),
+            ).fetchall()
+        counts: dict[str, dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row["kind"], {})[row["state"]] = row["n"]
+        return counts
+
+    def active_count(self) -> int:
+        """Pending and leased jobs across all batches."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)", (STATE_PENDING, STATE_LEASED)
+            ).fetchone()
+        return row[0]
+
+    def batch_finished(self, batch: str) -> bool:
+        """True once the batch has jobs and none of them is pending or leased."""
+        counts = self.batch_counts(batch)
+        if not counts:
+            return False
+        return not any(
+            states.get(STATE_PENDING) or states.get(STATE_LEASED) for states in counts.values()
+        )
+
+    def batch_jobs(self, batch: str, kind: str | None = None) -> list[Job]:
+        """Done and failed jobs of a batch, in publication order."""
+        sql = "SELECT * FROM jobs WHERE batch = ? AND state IN (?, ?)"
+        params: list[object] = [batch, STATE_DONE, STATE_FAILED]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY job_id", params).fetchall()
+        return [_job(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
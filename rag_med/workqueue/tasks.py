@@ -0,0 +1,101 @@
+"""Job handlers: one generated QA pair, one RAG answer, one metric of one answer.
+
+A handler returns ``(result, follow_ups)``; the queue stores the result and publishes
+the follow-ups atomically. Every payload carries what its job needs (chunk text,
+QA pair, RAG answer), so a worker needs the settings but not the PDF.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+
+from rag_med.qa_generator.models import QAResult
+from rag_med.workqueue.queue import Job
+
+logger = logging.getLogger(__name__)
+
+KIND_GENERATE = "generate"
+KIND_RAG = "rag"
+KIND_METRIC = "metric"
+JOB_KINDS = (KIND_GENERATE, KIND_RAG, KIND_METRIC)
+
+# Later stages first, so items finish (and leases free up) before new ones start
+PRIORITIES = {KIND_GENERATE: 0, KIND_RAG: 1, KIND_METRIC: 2}
+
+# The lexical metric needs the corpus index of the whole PDF and stays local-only
+DISTRIBUTED_METRICS = ("ragas", "text", "llm_judge")
+
+FollowUps = list[tuple[str, dict, int]]
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def generate_job(chunk_index: int, chunk: str, evaluate: bool) -> tuple[str, dict, int]:
+    payload = {"chunk_index": chunk_index, "chunk": chunk, "evaluate": evaluate}
+    return KIND_GENERATE, payload, PRIORITIES[KIND_GENERATE]
+
+
+def _rag_client():
+    # One client per worker process: it holds the session token
+    global _client
+    with _client_lock:
+        if _client is None:
+            from rag_med.qa_generator.generator import _build_valueai_client
+
+            _client = _build_valueai_client()
+        return _client
+
+
+def handle_generate(job: Job) -> tuple[dict, FollowUps]:
+    """Generate one QA pair; a failed generation is retried while attempts remain."""
+    from rag_med.qa_generator.generator import _generation_failed, generate_qa
+    from rag_med.profiling import profile_stage
+
+    payload = job.payload
+    with profile_stage("llm:generate"):
+        result = generate_qa(payload["chunk"], payload["chunk_index"])
+    failed = _generation_failed(result)
+    if failed and job.attempts < job.max_attempts:
+        msg = f"QA generation failed for chunk {payload['chunk_index']}: {result.raw_model_output}"
+        raise RuntimeError(msg)
+    follow_ups: FollowUps = []
+    if payload.get("evaluate") and not failed:
+        follow_ups.append((KIND_RAG, {"result": result.model_dump()}, PRIORITIES[KIND_RAG]))
+    return result.model_dump(), follow_ups
+
+
+def handle_rag(job: Job) -> tuple[dict, FollowUps]:
+    """Ask the RAG the generated question; each metric of the answer becomes a job."""
+    from rag_med.profiling import profile_stage
+
+    result = QAResult.model_validate(job.payload["result"])
+    with profile_stage("llm:rag"):
+        answer = _rag_client().ask(result.question)
+    follow_ups: FollowUps = [
+        (
+            KIND_METRIC,
+            {"metric": name, "result": job.payload["result"], "valueai_answer": answer},
+            PRIORITIES[KIND_METRIC],
+        )
+        for name in DISTRIBUTED_METRICS
+    ]
+    return {"chunk_index": result.chunk_index, "valueai_answer": answer}, follow_ups
+
+
+def handle_metric(job: Job) -> tuple[dict, FollowUps]:
+    from rag_med.qa_generator.generator import _item_metric_fns
+
+    name = job.payload["metric"]
+    result = QAResult.model_validate(job.payload["result"])
+    value = _item_metric_fns()[name](result, job.payload["valueai_answer"])
+    return {"chunk_index": result.chunk_index, "metric": name, "value": value}, []
+
+
+HANDLERS: dict[str, Callable[[Job], tuple[object, FollowUps]]] = {
+    KIND_GENERATE: handle_generate,
+    KIND_RAG: handle_rag,
+    KIND_METRIC: handle_metric,
+}
@@ -0,0 +1,126 @@
+"""Worker process loop for ``rag-med worker``."""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from collections.abc import Callable, Sequence
+
+from rag_med.workqueue.queue import Job, JobQueue
+from rag_med.workqueue.tasks import HANDLERS, FollowUps
+
+logger = logging.getLogger(__name__)
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Worker:
+    """Lease jobs from ``queue`` on ``concurrency`` threads and run their handlers.
+
+    A heartbeat thread renews every held lease each ``lease_seconds / 3``. A handler
+    that raises releases its job for a retry; a result whose lease was lost meanwhile
+    (another worker took the job over) is dropped.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        *,
+        owner: str | None = None,
+        kinds: Sequence[str] | None = None,
+        lease_seconds: float = 120.0,
+        poll_seconds: float = 2.0,
+        concurrency: int = 1,
+        handlers: dict[str, Callable[[Job], tuple[object, FollowUps]]] | None = None,
+    ):
+        self.queue = queue
+        self.owner = owner or default_owner()
+        self.kinds = list(kinds) if kinds else None
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.concurrency = max(1, concurrency)
+        self.handlers = handlers or HANDLERS
+        self.processed = 0
+        self.failed = 0
+        self._held: dict[int, Job] = {}
+        self._lock = threading.Lock()
+
+    def _heartbeat(self, stop: threading.Event) -> None:
+        while not stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                held = list(self._held)
+            for job_id in held:
+                if not self.queue.heartbeat(job_id, self.owner, lease_seconds=self.lease_seconds):
+                    logger.warning("Lost the lease of job %s", job_id)
+
+    def process(self, job: Job) -> None:
+        with self._lock:
+            self._held[job.job_id] = job
+        try:
+            result, follow_ups = self.handlers[job.kind](job)
+        except Exception as e:
+            logger.warning(
+                "Job %s (%s) failed, attempt %s/%s: %s",
+                job.job_id,
+                job.kind,
+                job.attempts,
+                job.max_attempts,
+                e,
+            )
+            self.queue.fail(job, self.owner, f"{type(e).__name__}: {e}")
+            with self._lock:
+                self.failed += 1
+            return
+        finally:
+            with self._lock:
+                self._held.pop(job.job_id, None)
+        if not self.queue.complete(job, self.owner, result, follow_ups):
+            logger.warning("Job %s finished after its lease was lost, result dropped", job.job_id)
+            return
+        with self._lock:
+            self.processed += 1
+
+    def _loop(self, stop: threading.Event, until_idle: bool) -> None:
+        while not stop.is_set():
+            job = self.queue.lease(self.owner, lease_seconds=self.lease_seconds, kinds=self.kinds)
+            if job is None:
+                if until_idle and self.queue.active_count() == 0:
+                    return
+                stop.wait(self.poll_seconds)
+                continue
+            self.process(job)
+
+    def run(self, *, until_idle: bool = False, stop: threading.Event | None = None) -> int:
+        """Process jobs until ``stop`` is set (or, with ``until_idle``, the queue is drained).
+
+        Returns the number of completed jobs.
+        """
+        stop = stop or threading.Event()
+        beat_stop = threading.Event()
+        beat = threading.Thread(
+            target=self._heartbeat, args=(beat_stop,), name="workqueue-heartbeat", daemon=True
+        )
+        beat.start()
+        threads = [
+            threading.Thread(
+                target=self._loop, args=(stop, until_idle), name=f"workqueue-worker-{i}"
+            )
+            for i in range(self.concurrency)
+        ]
+        logger.info(
+            "Worker %s: %s threads, kinds %s", self.owner, len(threads), self.kinds or "all"
+        )
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            stop.set()
+            beat_stop.set()
+            beat.join()
+        return self.processed
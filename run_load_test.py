@@ -0,0 +1,183 @@
+"""Load test: drive `rag-med generate --valueai-eval` against the local fake ValueAI server.
+
+Usage:
+    python run_load_test.py --runs 3 --num-questions 4 --compute lognormal:0.3,0.5
+    python run_load_test.py --pdf document.pdf --concurrency 4 --error-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from rag_med.valueai.fake_server import (
+    LLM_RESPONSE_MODES,
+    FakeServerConfig,
+    FakeValueAIServer,
+    LatencySpec,
+    percentile,
+)
+
+OUTPUT_JSON = ROOT / "load_test_result.json"
+
+_FILLER = (
+    "Patients with arterial hypertension should receive first line therapy with ACE inhibitors "
+    "or angiotensin receptor blockers, calcium channel blockers and thiazide diuretics. "
+    "Dose titration is performed every two to four weeks under blood pressure control. "
+)
+
+
+def _make_pdf(path: Path, num_questions: int) -> None:
+    """Write a synthetic PDF large enough for `num_questions` chunk groups."""
+    import fitz
+
+    doc = fitz.open()
+    pages = max(4, num_questions * 4)
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (36, 36, -36, -36), f"Section {i + 1}. " + _FILLER * 12)
+    doc.save(path)
+    doc.close()
+
+
+def _run_generate(pdf: Path, out_dir: Path, index: int, num_questions: int, env: dict) -> dict:
+    output = out_dir / f"qa_result_{index}.json"
+    cmd = [
+        sys.executable,
+        "-m",
+        "rag_med.cli",
+        "generate",
+        str(pdf),
+        "--num-questions",
+        str(num_questions),
+        "--valueai-eval",
+        "--output",
+        str(output),
+    ]
+    started = time.monotonic()
+    proc = subprocess.run(  # nosec
+        cmd, cwd=ROOT, env=env, capture_output=True, text=True, check=False
+    )
+    elapsed = time.monotonic() - started
+    return {"index": index, "returncode": proc.returncode, "seconds": elapsed, "stderr": proc.stderr[-2000:]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", type=Path, default=None, help="PDF to use (default: synthetic)")
+    parser.add_argument("--runs", type=int, default=2, help="Total `rag-med generate` runs")
+    parser.add_argument("--concurrency", type=int, default=1, help="Runs executed in parallel")
+    parser.add_argument("--num-questions", type=int, default=2)
+    parser.add_argument("--token-latency", default="fixed:0.01")
+    parser.add_argument("--submit-latency", default="uniform:0.01,0.05")
+    parser.add_argument("--poll-latency", default="fixed:0.005")
+    parser.add_argument("--compute", default="lognormal:0.2,0.5", help="Time until predict ready")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--unauthorized-rate", type=float, default=0.0)
+    parser.add_argument("--task-failure-rate", type=float, default=0.0)
+    parser.add_argument("--llm-response-mode", choices=LLM_RESPONSE_MODES, default="mixed")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="Client poll interval")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", type=Path, default=OUTPUT_JSON)
+    args = parser.parse_args()
+
+    config = FakeServerConfig(
+        token_latency=LatencySpec.parse(args.token_latency),
+        submit_latency=LatencySpec.parse(args.submit_latency),
+        poll_latency=LatencySpec.parse(args.poll_latency),
+        compute=LatencySpec.parse(args.compute),
+        error_rate=args.error_rate,
+        unauthorized_rate=args.unauthorized_rate,
+        task_failure_rate=args.task_failure_rate,
+        llm_response_mode=args.llm_response_mode,
+        seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp, FakeValueAIServer(config) as server:
+        tmp_dir = Path(tmp)
+        pdf = args.pdf.resolve() if args.pdf is not None else None
+        if pdf is None:
+            pdf = tmp_dir / "synthetic.pdf"
+            _make_pdf(pdf, args.num_questions)
+
+        env = {
+            **os.environ,
+            "VALUEAI_BASE_URL": server.base_url,
+            "VALUEAI_USERNAME": "load-test",
+            "VALUEAI_PASSWORD": "load-test",
+            "VALUEAI_POLL_INTERVAL_SECONDS": str(args.poll_interval),
+            "METRICS_LLM_POLL_INTERVAL_SECONDS": str(args.poll_interval),
+            "MIN_CHUNK_WORDS": "5",
+            # Stores of the runs live in the temp dir: real caches, journals and run
+            # history neither answer load-test requests nor record them
+            "VALUEAI_JOURNAL_PATH": str(tmp_dir / "predict_journal.sqlite3"),
+            "METRIC_CACHE_PATH": str(tmp_dir / "metric_cache.sqlite3"),
+            "MANIFEST_DIR": str(tmp_dir / "manifests"),
+            "RESULTS_DB_PATH": str(tmp_dir / "results.sqlite3"),
+            "LEXICAL_INDEX_DIR": str(tmp_dir / "lexical_index"),
+            "TRACE_PATH": str(tmp_dir / "trace.jsonl"),
+        }
+        print(f"Fake ValueAI at {server.base_url}; {args.runs} run(s), concurrency {args.concurrency}")
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            runs = list(
+                pool.map(
+                    lambda i: _run_generate(pdf, tmp_dir, i, args.num_questions, env),
+                    range(args.runs),
+                )
+            )
+        wall = time.monotonic() - started
+        server_stats = server.stats()
+
+    run_seconds = [r["seconds"] for r in runs]
+    ok = [r for r in runs if r["returncode"] == 0]
+    questions = len(ok) * args.num_questions
+    report = {
+        "runs": args.runs,
+        "succeeded": len(ok),
+        "wall_seconds": wall,
+        "throughput": {
+            "runs_per_second": len(ok) / wall if wall else None,
+            "questions_per_second": questions / wall if wall else None,
+            "requests_per_second": server_stats["requests"] / wall if wall else None,
+        },
+        "run_latency_seconds": {
+            "p50": percentile(run_seconds, 50),
+            "p95": percentile(run_seconds, 95),
+            "p99": percentile(run_seconds, 99),
+        },
+        "server": server_stats,
+        "failures": [r for r in runs if r["returncode"] != 0],
+    }
+
+    print(f"Succeeded: {len(ok)}/{args.runs} runs in {wall:.2f}s")
+    print(f"Throughput: {report['throughput']['questions_per_second'] or 0:.2f} questions/s, "
+          f"{report['throughput']['requests_per_second'] or 0:.1f} requests/s")
+    for endpoint, entry in sorted(server_stats["endpoints"].items()):
+        lat = entry["latency_seconds"]
+        print(f"  {endpoint:24s} n={entry['requests']:5d}  p50={lat['p50'] or 0:.3f}s  "
+              f"p95={lat['p95'] or 0:.3f}s  p99={lat['p99'] or 0:.3f}s  codes={entry['status_codes']}")
+    for kind, entry in server_stats["predicts"].items():
+        lat = entry["latency_seconds"]
+        print(f"  predict[{kind}] submitted={entry['submitted']}  "
+              f"p50={lat['p50'] or 0:.3f}s  p95={lat['p95'] or 0:.3f}s  p99={lat['p99'] or 0:.3f}s")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nReport saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
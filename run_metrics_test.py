@@ -14,10 +14,12 @@ if str(ROOT) not in sys.path:
 # Config must load before rag_med.evaluation (uses configs.settings)
 import configs.settings  # noqa: F401
 
+from rag_med.evaluation.cache import configure_metric_cache, metric_cache_stats
 from rag_med.evaluation.metrics import (
-    compare_two_answers,
+    compare_two_answers_batch,
+    gate_stats,
     evaluate_answer_pair_llm_alignment,
-    evaluate_answer_pair_ragas_extended,
+    evaluate_answer_pairs_ragas_batch,
 )
 
 OUTPUT_JSON = ROOT / "test_metrics_result.json"
@@ -25,6 +27,10 @@ OUTPUT_TXT = ROOT / "test_metrics_result.txt"
 
 
 def main() -> None:
+    # RUN_METRICS_TEST_CACHE=off disables the metric cache, =refresh rescores every pair
+    cache_mode = os.environ.get("RUN_METRICS_TEST_CACHE", "on").lower()
+    configure_metric_cache(enabled=cache_mode != "off", refresh=cache_mode == "refresh")
+
     sample_path = Path(os.environ.get("RUN_METRICS_TEST_JSON", ROOT / "test_qa_sample.json"))
     if not sample_path.is_absolute():
         sample_path = ROOT / sample_path
@@ -55,6 +61,17 @@ def main() -> None:
     log(f"Items: {len(samples)}")
     log()
 
+    # RAGAS metrics of all complete items are scored up front, concurrently
+    complete = [item for item in samples if item.get("answer") and item.get("valueai_answer")]
+    ragas_results = iter(
+        evaluate_answer_pairs_ragas_batch(
+            [(it.get("question", ""), it["valueai_answer"], [it["answer"]]) for it in complete]
+        )
+    )
+    text_results = iter(
+        compare_two_answers_batch([(it["answer"], it["valueai_answer"]) for it in complete])
+    )
+
     for i, item in enumerate(samples):
         question = item.get("question", "")
         etalon = item.get("answer", "")
@@ -75,12 +92,7 @@ def main() -> None:
 
             # RAGAS: faithfulness only (etalon = context, ValueAI = response)
             log("RAGAS (etalon = context, ValueAI = response)")
-            ragas = evaluate_answer_pair_ragas_extended(
-                question=question,
-                response=valueai,
-                retrieved_contexts=[etalon],
-                reference_answer=None,
-            )
+            ragas = next(ragas_results)
             all_metrics["ragas_faithfulness"] = ragas.get("faithfulness")
             if ragas.get("error"):
                 all_metrics["ragas_error"] = ragas["error"]
@@ -91,10 +103,17 @@ def main() -> None:
 
             # Text overlap (etalon vs ValueAI): cosine_similarity, factual_correctness
             log("Text overlap (etalon vs ValueAI)")
-            text = compare_two_answers(reference=etalon, candidate=valueai)
+            text = next(text_results)
             all_metrics["cosine_similarity"] = text.get("cosine_similarity")
+            for key in ("token_f1", "rouge_l", "char_ngram_f1", "factual_gate"):
+                if text.get(key) is not None:
+                    all_metrics[key] = text[key]
             all_metrics["factual_correctness"] = text.get("factual_correctness")
             log(f"  cosine_similarity:   {text.get('cosine_similarity')}  (bag-of-words)")
+            log(
+                f"  token_f1 / rouge_l / char_ngram_f1: {text.get('token_f1')} / "
+                f"{text.get('rouge_l')} / {text.get('char_ngram_f1')}"
+            )
             log(f"  factual_correctness: {text.get('factual_correctness')}  (RAGAS, ref vs candidate)")
             if text.get("factual_error"):
                 log(f"  factual_error: {text['factual_error'][:150]}...")
@@ -112,6 +131,8 @@ def main() -> None:
             all_metrics["llm_alignment_comment"] = llm_judge.get("alignment_comment")
             if llm_judge.get("alignment_error"):
                 all_metrics["llm_alignment_error"] = llm_judge["alignment_error"]
+            if llm_judge.get("alignment_gate"):
+                all_metrics["llm_alignment_gate"] = llm_judge["alignment_gate"]
             log(
                 f"  alignment_score:     {llm_judge.get('alignment_score')}  "
                 "(1–10, RAG vs etalon, LLM judge)"
@@ -128,6 +149,8 @@ def main() -> None:
         results.append(sample_result)
 
     log("=" * 60)
+    log(f"Metric cache: {metric_cache_stats()}")
+    log(f"LLM calls avoided by the local gate: {gate_stats()}")
     log("Done.")
 
     # Save JSON (full result for reuse)
@@ -17,3 +17,19 @@ def sample_pdf_path(test_data_dir: Path) -> Path:
     if not pdf_path.exists():
         pytest.skip(f"Sample PDF not found at {pdf_path}")
     return pdf_path
+
+
+@pytest.fixture(autouse=True)
+def _isolated_run_history(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep every store written by tests (run history, manifests, metric cache, predict
+    journal, lexical indexes, job queue, traces) out of the project's ``.rag_med``."""
+    from configs.settings import settings
+
+    state = tmp_path / ".rag_med"
+    monkeypatch.setattr(settings, "results_db_path", str(state / "results.sqlite3"))
+    monkeypatch.setattr(settings, "manifest_dir", str(state / "manifests"))
+    monkeypatch.setattr(settings, "metric_cache_path", str(state / "metric_cache.sqlite3"))
+    monkeypatch.setattr(settings, "valueai_journal_path", str(state / "predict_journal.sqlite3"))
+    monkeypatch.setattr(settings, "lexical_index_dir", str(state / "lexical_index"))
+    monkeypatch.setattr(settings, "workqueue_path", str(state / "workqueue.sqlite3"))
+    monkeypatch.setattr(settings, "trace_path", str(state / "trace.jsonl"))
@@ -0,0 +1,55 @@
+"""Tests for micro-batching of concurrent calls."""
+
+import threading
+import time
+
+import pytest
+
+from rag_med.evaluation.batching import MicroBatcher
+
+
+def _submit_all(batcher: MicroBatcher, items: list) -> list:
+    results: dict = {}
+
+    def call(item: int) -> None:
+        try:
+            results[item] = batcher.submit(item)
+        except Exception as e:
+            results[item] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in items]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [results[i] for i in items]
+
+
+def test_concurrent_submits_share_batches() -> None:
+    batches: list[list[int]] = []
+
+    def fn(batch: list[int]) -> list[int]:
+        batches.append(batch)
+        return [x * 2 for x in batch]
+
+    with MicroBatcher(fn, max_batch=3, max_wait=0.5) as batcher:
+        assert _submit_all(batcher, list(range(6))) == [0, 2, 4, 6, 8, 10]
+    assert sorted(len(b) for b in batches) == [3, 3]
+
+
+def test_partial_batch_flushes_after_wait() -> None:
+    with MicroBatcher(lambda batch: batch, max_batch=10, max_wait=0.05) as batcher:
+        started = time.monotonic()
+        assert batcher.submit("x") == "x"
+        assert time.monotonic() - started < 1.0
+
+
+def test_batch_errors_reach_every_caller() -> None:
+    def fn(batch: list[int]) -> list[int]:
+        raise RuntimeError("judge down")
+
+    with MicroBatcher(fn, max_batch=2, max_wait=0.5) as batcher:
+        results = _submit_all(batcher, [1, 2])
+    assert all(isinstance(r, RuntimeError) for r in results)
+    with pytest.raises(ValueError):
+        MicroBatcher(fn, max_batch=0)
@@ -10,3 +10,15 @@ def test_version():
     result = runner.invoke(app, ["version"])
     assert result.exit_code == 0
     assert "RAG_MED" in result.stdout
+
+
+def test_refresh_disables_run_reuse(mocker, tmp_path):
+    generate = mocker.patch("rag_med.qa_generator.generate_qa_from_pdf", return_value=[])
+    mocker.patch("rag_med.evaluation.cache.configure_metric_cache")
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+
+    args = ["generate", str(pdf), "-n", "1", "-o", str(tmp_path / "qa.json"), "--no-dashboard"]
+    assert runner.invoke(app, args).exit_code == 0
+    assert runner.invoke(app, [*args, "--refresh"]).exit_code == 0
+    assert [c.kwargs["reuse"] for c in generate.call_args_list] == [True, False]
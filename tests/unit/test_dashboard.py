@@ -0,0 +1,66 @@
+"""Tests for progress tracking and the live dashboard."""
+
+import io
+import json
+import logging
+
+import pytest
+from rich.console import Console
+
+from rag_med.dashboard import LiveDashboard, ProgressTracker, render_progress
+from rag_med.valueai.telemetry import LatencyRecorder, PredictTrace
+
+
+def test_tracker_counts_rates_and_errors() -> None:
+    tracker = ProgressTracker()
+    tracker.add_total("rag", 4)
+    tracker.watch_queue("rag", lambda: 3)
+    ok = tracker.wrap("rag", lambda x: x)
+    assert ok(1) == 1 and ok(2) == 2
+    with pytest.raises(RuntimeError), tracker.track("rag"):
+        raise RuntimeError("boom")
+    tracker.started("rag")
+
+    st = tracker.snapshot()["stages"]["rag"]
+    assert (st["total"], st["done"], st["in_flight"], st["queued"]) == (4, 3, 1, 3)
+    assert st["errors"] == 1 and st["error_rate"] == pytest.approx(1 / 3)
+    assert st["items_per_second"] > 0 and st["eta_seconds"] is not None
+
+
+def test_predict_trace_tracks_in_flight() -> None:
+    recorder = LatencyRecorder()
+    trace = PredictTrace(recorder, "/llm/predict", "m")
+    assert recorder.in_flight() == {"/llm/predict": 1}
+    trace.finished(ok=True)
+    assert recorder.in_flight() == {"/llm/predict": 0}
+
+
+def test_render_progress() -> None:
+    tracker = ProgressTracker()
+    tracker.add_total("generate", 2)
+    with tracker.track("generate"):
+        pass
+    console = Console(file=io.StringIO(), width=120)
+    console.print(
+        render_progress(
+            tracker.snapshot(),
+            {"valueai_in_flight": {"/rag/predict": 2}, "metric_cache_hit_rate": 0.5},
+        )
+    )
+    out = console.file.getvalue()
+    assert "generate" in out and "1/2" in out
+    assert "/rag/predict: 2" in out and "50%" in out
+
+
+def test_non_terminal_falls_back_to_log_lines(caplog) -> None:
+    tracker = ProgressTracker()
+    console = Console(file=io.StringIO(), force_terminal=False)
+    with caplog.at_level(logging.INFO, logger="rag_med.dashboard"):
+        with LiveDashboard(tracker, console, log_interval=0.01):
+            with tracker.track("score"):
+                pass
+    lines = [r.getMessage() for r in caplog.records if r.getMessage().startswith("progress ")]
+    assert lines
+    payload = json.loads(lines[-1].removeprefix("progress "))
+    assert payload["stages"]["score"]["done"] == 1
+    assert "valueai_in_flight" in payload
@@ -0,0 +1,54 @@
+"""Tests for the near-duplicate chunk filter."""
+
+import random
+
+from rag_med.qa_generator import generator
+from rag_med.qa_generator.dedup import (
+    dedup_stats,
+    drop_near_duplicates,
+    lsh_bands,
+    near_duplicates,
+    reset_dedup_stats,
+)
+
+_VOCAB = [f"слово{i}" for i in range(2000)]
+
+
+def _text(seed: int, n_words: int = 200) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_VOCAB) for _ in range(n_words))
+
+
+def test_lsh_bands_cover_signature_near_threshold() -> None:
+    bands, rows = lsh_bands(128, 0.85)
+    assert bands * rows == 128
+    assert abs((1 / bands) ** (1 / rows) - 0.85) < 0.05
+
+
+def test_near_duplicates_keep_first_of_each_group() -> None:
+    a, b = _text(1), _text(2)
+    # The same table repeated with one word changed at the end
+    a_copy = a.rsplit(" ", 1)[0] + " дозировка"
+    texts = [a, b, a_copy, a.upper(), ""]
+    assert near_duplicates(texts, 0.85) == [2, 3]
+    assert near_duplicates([a, b], 0.85) == []
+
+
+def test_drop_near_duplicates_counts_dropped_chunks() -> None:
+    reset_dedup_stats()
+    chunks = [_text(i) for i in range(300)]
+    chunks += [c + " конец" for c in chunks[:50]]
+    kept = drop_near_duplicates(chunks, 0.8)
+    assert kept == chunks[:300]
+    assert dedup_stats() == {"documents": 1, "chunks": 350, "dropped": 50}
+
+
+def test_split_text_chunks_drops_repeated_sections(mocker) -> None:
+    section = _text(7, 60)
+    text = "\n\n".join([section, _text(8, 60), section, _text(9, 60)])
+    mocker.patch.object(generator.settings, "chunk_size", 500)
+    mocker.patch.object(generator.settings, "chunk_overlap", 0)
+    mocker.patch.object(generator.settings, "chunk_dedup_threshold", 0.85)
+    deduped = generator._split_text_chunks(text)
+    mocker.patch.object(generator.settings, "chunk_dedup_threshold", None)
+    assert len(generator._split_text_chunks(text)) == len(deduped) + 1
@@ -0,0 +1,65 @@
+"""Tests for the concurrent evaluation executor."""
+
+import threading
+import time
+
+from rag_med.evaluation.executor import EvaluationExecutor
+
+
+def test_metrics_of_an_item_run_concurrently() -> None:
+    def slow_metric(item: int, prepared: int) -> int:
+        time.sleep(0.2)
+        return prepared
+
+    started = time.monotonic()
+    outcomes = EvaluationExecutor(max_concurrent_items=4).run(
+        [1, 2, 3, 4],
+        prepare=lambda item: item * 10,
+        metrics={"a": slow_metric, "b": slow_metric, "c": slow_metric},
+    )
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.5
+    assert [o.metrics for o in outcomes] == [{"a": v, "b": v, "c": v} for v in (10, 20, 30, 40)]
+
+
+def test_item_concurrency_is_bounded() -> None:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def prepare(item: int) -> int:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return item
+
+    EvaluationExecutor(max_concurrent_items=2).run(
+        list(range(8)), prepare=prepare, metrics={"m": lambda item, p: p}
+    )
+    assert peak == 2
+
+
+def test_skip_and_errors() -> None:
+    def boom(item: int, prepared: int) -> int:
+        raise RuntimeError("metric failed")
+
+    def prepare(item: int) -> int:
+        if item == 2:
+            raise ValueError("rag failed")
+        return item
+
+    outcomes = EvaluationExecutor().run(
+        [0, 1, 2],
+        prepare=prepare,
+        metrics={"ok": lambda item, p: p, "bad": boom},
+        skip=lambda item: item == 0,
+    )
+    assert outcomes[0] is None
+    assert isinstance(outcomes[1].error, RuntimeError)
+    assert outcomes[1].metrics == {"ok": 1}
+    assert isinstance(outcomes[2].error, ValueError)
@@ -0,0 +1,94 @@
+"""Tests for the local fake ValueAI server."""
+
+import json
+import time
+
+import pytest
+import requests
+
+from rag_med.valueai.client import ValueAIRagClient, ValueAIRagClientConfig
+from rag_med.valueai.fake_server import (
+    FakeServerConfig,
+    FakeValueAIServer,
+    LatencySpec,
+    percentile,
+)
+from rag_med.valueai.llm_api_client import get_token, predict_sync
+
+
+def _rag_client(base_url: str) -> ValueAIRagClient:
+    return ValueAIRagClient(
+        ValueAIRagClientConfig(
+            base_url=base_url,
+            username="user",
+            password="pass",
+            rag_id=1,
+            model_name="m",
+            poll_interval_seconds=0.01,
+            timeout_seconds=5,
+        )
+    )
+
+
+def test_rag_and_llm_roundtrip() -> None:
+    config = FakeServerConfig(compute=LatencySpec("fixed", 0.05), rag_response="rag answer")
+    with FakeValueAIServer(config) as srv:
+        assert _rag_client(srv.base_url).ask("вопрос") == "rag answer"
+
+        token = get_token(srv.base_url, "user", "pass")
+        text = predict_sync(
+            srv.base_url, token, "m", [{"role": "user", "content": "q"}], poll_interval=0.01
+        )
+        assert set(json.loads(text)) == {"question", "answer"}
+
+        stats = srv.stats()
+    assert stats["predicts"]["rag"]["submitted"] == 1
+    assert stats["predicts"]["llm"]["submitted"] == 1
+    assert stats["endpoints"]["/rag/predicts/{id}"]["requests"] >= 2
+
+
+def test_expired_token_is_rejected() -> None:
+    config = FakeServerConfig(compute=LatencySpec("fixed", 0.05), token_ttl_seconds=-1.0)
+    with FakeValueAIServer(config) as srv:
+        client = _rag_client(srv.base_url)
+        with pytest.raises(requests.HTTPError):
+            client.ask("вопрос")
+        codes = srv.stats()["endpoints"]["/rag/predict"]["status_codes"]
+    # The submit is retried once with a fresh token, which is rejected as well
+    assert codes == {"401": 2}
+
+
+def test_rag_client_renews_expired_token() -> None:
+    config = FakeServerConfig(compute=LatencySpec("fixed", 0.01), token_ttl_seconds=0.2)
+    with FakeValueAIServer(config) as srv:
+        client = _rag_client(srv.base_url)
+        assert client.ask("первый вопрос")
+        time.sleep(0.3)
+        assert client.ask("второй вопрос")
+        stats = srv.stats()
+    assert stats["endpoints"]["/rag/predict"]["status_codes"] == {"200": 2, "401": 1}
+    assert stats["endpoints"]["/token"]["requests"] == 2
+
+
+@pytest.mark.parametrize("mode", ["fenced", "truncated"])
+def test_canned_llm_modes(mode: str) -> None:
+    with FakeValueAIServer(FakeServerConfig(llm_response_mode=mode)) as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        text = predict_sync(
+            srv.base_url, token, "m", [{"role": "user", "content": "q"}], poll_interval=0.01
+        )
+    if mode == "fenced":
+        assert "```json" in text
+    else:
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(text)
+
+
+def test_latency_spec_parse_and_percentile() -> None:
+    assert LatencySpec.parse("0.5") == LatencySpec("fixed", 0.5)
+    assert LatencySpec.parse("uniform:0.1,0.2") == LatencySpec("uniform", 0.1, 0.2)
+    with pytest.raises(ValueError):
+        LatencySpec.parse("gamma:1")
+    assert percentile([], 50) is None
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
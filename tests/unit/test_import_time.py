@@ -0,0 +1,63 @@
+"""Import-time budget of the CLI (``python -X importtime``)."""
+
+import json
+import os
+import subprocess
+import sys
+
+import rag_med
+
+# Cumulative import time of rag_med.cli in a fresh interpreter; override for slow machines
+IMPORT_BUDGET_MS = float(os.environ.get("RAG_MED_IMPORT_BUDGET_MS", "600"))
+
+# Loaded only by the commands that need them
+HEAVY_MODULES = (
+    "fitz",
+    "pypdf",
+    "langchain_text_splitters",
+    "openai",
+    "httpx",
+    "ragas",
+    "pydantic_settings",
+    "rag_med.evaluation.metrics",
+    "rag_med.qa_generator.generator",
+)
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+def _cumulative_us(importtime_log: str, module: str) -> int:
+    # "import time: self [us] | cumulative | imported package"
+    for line in importtime_log.splitlines():
+        parts = [p.strip() for p in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not in -X importtime output")
+
+
+def test_cli_import_skips_heavy_dependencies() -> None:
+    code = (
+        "import json, sys, rag_med.cli; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    assert json.loads(_run(code).stdout) == []
+
+
+def test_cli_import_time_budget() -> None:
+    best = min(
+        _cumulative_us(_run("import rag_med.cli", "-X", "importtime").stderr, "rag_med.cli")
+        for _ in range(3)
+    )
+    assert best / 1000 <= IMPORT_BUDGET_MS, f"rag_med.cli imports in {best / 1000:.0f} ms"
+
+
+def test_lazy_public_names_resolve() -> None:
+    from rag_med.qa_generator.generator import generate_qa_from_pdf
+
+    assert rag_med.generate_qa_from_pdf is generate_qa_from_pdf
+    assert isinstance(rag_med.__version__, str)
+    assert "clean_pdf" in dir(rag_med)
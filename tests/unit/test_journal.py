@@ -0,0 +1,146 @@
+"""Tests for the durable predict-id journal."""
+
+from pathlib import Path
+
+import httpx
+import pytest
+
+from rag_med.valueai.client import ValueAIRagClient, ValueAIRagClientConfig
+from rag_med.valueai.fake_server import FakeServerConfig, FakeValueAIServer, LatencySpec
+from rag_med.valueai.journal import STATE_SUBMITTED, PredictJournal, request_fingerprint
+from rag_med.valueai.llm_api_client import _llm_payload, get_token, predict_sync
+
+_MESSAGES = [{"role": "user", "content": "вопрос"}]
+
+
+def test_journal_states_and_ttl(tmp_path: Path) -> None:
+    journal = PredictJournal(tmp_path / "j.sqlite3")
+    fp = request_fingerprint("/llm/predict", {"request": "q"})
+    assert journal.lookup(fp) is None
+
+    journal.record_submitted(fp, "/llm/predict", 7)
+    entry = journal.lookup(fp)
+    assert entry is not None
+    assert (entry.state, entry.predict_id) == (STATE_SUBMITTED, 7)
+    assert [e.predict_id for e in journal.pending()] == [7]
+
+    assert PredictJournal(tmp_path / "j.sqlite3", ttl_seconds=-1).lookup(fp) is None
+
+    journal.record_failed(fp, "boom")
+    assert journal.lookup(fp) is None
+
+    journal.record_submitted(fp, "/llm/predict", 8)
+    journal.record_completed(fp)
+    assert PredictJournal(tmp_path / "j.sqlite3").lookup(fp) is None
+    assert journal.pending() == []
+
+
+def test_predict_sync_reattaches_instead_of_resubmitting(tmp_path: Path) -> None:
+    journal = PredictJournal(tmp_path / "j.sqlite3")
+    with FakeValueAIServer(FakeServerConfig(compute=LatencySpec("fixed", 0.05))) as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        payload = _llm_payload("m", "вопрос", "", 8192, 0.0)
+        # Simulate a run that submitted the predict and crashed before polling.
+        r = httpx.post(
+            f"{srv.base_url}/llm/predict",
+            json=payload,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        fp = request_fingerprint(f"{srv.base_url}/llm/predict", payload)
+        journal.record_submitted(fp, "/llm/predict", r.json()["id"])
+
+        text = predict_sync(srv.base_url, token, "m", _MESSAGES, poll_interval=0.01, journal=journal)
+        again = predict_sync(srv.base_url, token, "m", _MESSAGES, poll_interval=0.01, journal=journal)
+        stats = srv.stats()
+
+    assert text == again
+    # The crashed run's predict is polled, not resubmitted; a finished request is
+    # predicted anew rather than replayed from the journal
+    assert stats["predicts"]["llm"]["submitted"] == 2
+    assert journal.pending() == []
+
+
+def test_rag_client_does_not_replay_completed_predict(tmp_path: Path) -> None:
+    journal = PredictJournal(tmp_path / "j.sqlite3")
+    with FakeValueAIServer() as srv:
+        config = ValueAIRagClientConfig(
+            base_url=srv.base_url,
+            username="user",
+            password="pass",
+            rag_id=1,
+            model_name="m",
+            poll_interval_seconds=0.01,
+        )
+        first = ValueAIRagClient(config, journal=journal).ask("вопрос")
+        second = ValueAIRagClient(config, journal=journal).ask("вопрос")
+        submitted = srv.stats()["predicts"]["rag"]["submitted"]
+
+    assert first == second
+    assert submitted == 2
+    assert journal.pending() == []
+
+
+def test_purged_predict_id_is_resubmitted(tmp_path: Path) -> None:
+    journal = PredictJournal(tmp_path / "j.sqlite3")
+    with FakeValueAIServer() as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        payload = _llm_payload("m", "вопрос", "", 8192, 0.0)
+        fp = request_fingerprint(f"{srv.base_url}/llm/predict", payload)
+        # An id from an earlier run that the server no longer knows
+        journal.record_submitted(fp, "/llm/predict", 9999)
+        text = predict_sync(
+            srv.base_url, token, "m", _MESSAGES, poll_interval=0.01, journal=journal
+        )
+
+        config = ValueAIRagClientConfig(
+            base_url=srv.base_url,
+            username="user",
+            password="pass",
+            rag_id=1,
+            model_name="m",
+            poll_interval_seconds=0.01,
+        )
+        client = ValueAIRagClient(config, journal=journal)
+        rag_fp = request_fingerprint(
+            f"{srv.base_url}/rag/predict", client._predict_payload("вопрос")
+        )
+        journal.record_submitted(rag_fp, "/rag/predict", 9999)
+        answer = client.ask("вопрос")
+        stats = srv.stats()
+
+    assert text
+    assert answer
+    assert stats["predicts"]["llm"]["submitted"] == 1
+    assert stats["predicts"]["rag"]["submitted"] == 1
+    assert journal.lookup(fp) is None
+    assert journal.lookup(rag_fp) is None
+
+
+def test_timed_out_predict_is_not_reattached(tmp_path: Path) -> None:
+    journal = PredictJournal(tmp_path / "j.sqlite3")
+    with FakeValueAIServer(FakeServerConfig(compute=LatencySpec("fixed", 5.0))) as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        with pytest.raises(TimeoutError):
+            predict_sync(
+                srv.base_url,
+                token,
+                "m",
+                _MESSAGES,
+                poll_interval=0.01,
+                timeout=0.1,
+                journal=journal,
+            )
+
+        config = ValueAIRagClientConfig(
+            base_url=srv.base_url,
+            username="user",
+            password="pass",
+            rag_id=1,
+            model_name="m",
+            poll_interval_seconds=0.01,
+            timeout_seconds=0.1,
+        )
+        with pytest.raises(TimeoutError):
+            ValueAIRagClient(config, journal=journal).ask("вопрос")
+
+    assert journal.pending() == []
@@ -0,0 +1,55 @@
+"""Tests for the corpus TF-IDF / BM25 lexical index."""
+
+import pytest
+
+from rag_med.evaluation.lexical_index import LexicalIndex, load_or_build_index
+from rag_med.evaluation.metrics import lexical_similarity
+
+CORPUS = [
+    "пациент принимает аспирин при головной боли",
+    "пациент жалуется на боль в груди",
+    "пациент принимает метформин при диабете",
+    "аспирин снижает риск тромбоза",
+]
+
+
+def test_rare_terms_weigh_more_than_common_ones() -> None:
+    index = LexicalIndex.build(CORPUS)
+    assert index.n_docs == 4
+    assert index.idf("метформин") > index.idf("пациент")
+    assert index.idf("неизвестное") >= index.idf("метформин")
+
+    reference = "пациент принимает метформин"
+    rare_match = index.tfidf_cosine(reference, "метформин")
+    common_match = index.tfidf_cosine(reference, "пациент")
+    assert rare_match > common_match
+    assert index.bm25_similarity(reference, "метформин") > index.bm25_similarity(reference, "пациент")
+
+
+def test_similarity_bounds() -> None:
+    index = LexicalIndex.build(CORPUS)
+    text = "аспирин при головной боли"
+    assert index.tfidf_cosine(text, text) == pytest.approx(1.0)
+    assert index.bm25_similarity(text, text) == pytest.approx(1.0)
+    assert index.tfidf_cosine(text, "") == 0.0
+    assert index.bm25_similarity("", "") == 1.0
+    assert lexical_similarity(text, "диабет", index) == {
+        "tfidf_cosine": 0.0,
+        "bm25_similarity": 0.0,
+    }
+
+
+def test_persisted_index_is_reused(tmp_path) -> None:
+    built = load_or_build_index(CORPUS, tmp_path)
+    files = list(tmp_path.glob("*.json.gz"))
+    assert len(files) == 1
+
+    loaded = LexicalIndex.load(files[0])
+    assert loaded.doc_freq == built.doc_freq
+    assert loaded.avg_doc_len == built.avg_doc_len
+    pair = ("аспирин при боли", "аспирин")
+    assert loaded.bm25_similarity(*pair) == built.bm25_similarity(*pair)
+
+    load_or_build_index(CORPUS, tmp_path)
+    load_or_build_index(CORPUS[:2], tmp_path)
+    assert len(list(tmp_path.glob("*.json.gz"))) == 2
@@ -0,0 +1,115 @@
+"""Tests for the ValueAI LLM API async adapters (pooled connections)."""
+
+import asyncio
+
+from rag_med.valueai.fake_server import FakeServerConfig, FakeValueAIServer, LatencySpec
+from rag_med.valueai.llm_api_client import (
+    ValueAIAsyncClient,
+    ValueAIAsyncOpenAI,
+    get_cached_token,
+    get_token,
+    invalidate_token,
+)
+
+_MESSAGES = [{"role": "user", "content": "вопрос"}]
+
+
+def test_async_openai_reuses_connections_across_calls() -> None:
+    config = FakeServerConfig(compute=LatencySpec("fixed", 0.02))
+    with FakeValueAIServer(config) as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        before = srv.connection_count
+
+        async def main() -> list[str]:
+            async with ValueAIAsyncOpenAI(
+                base_url=srv.base_url, token=token, model_name="m", poll_interval=0.01
+            ) as client:
+                texts = []
+                for _ in range(10):
+                    resp = await client.chat.completions.create(messages=_MESSAGES)
+                    texts.append(resp.choices[0].message.content)
+                return texts
+
+        texts = asyncio.run(main())
+        opened = srv.connection_count - before
+        requests = srv.stats()["requests"]
+
+    assert len(texts) == 10
+    assert all(texts)
+    assert requests > 20
+    assert opened == 1
+
+
+def test_async_client_concurrent_calls_share_pool() -> None:
+    config = FakeServerConfig(compute=LatencySpec("fixed", 0.05))
+    with FakeValueAIServer(config) as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        before = srv.connection_count
+
+        async def main() -> int:
+            async with ValueAIAsyncClient(
+                srv.base_url, token, "m", poll_interval=0.01
+            ) as client:
+                await asyncio.gather(
+                    *(client.chat.completions.create(messages=_MESSAGES) for _ in range(4))
+                )
+                first_round = srv.connection_count
+                await asyncio.gather(
+                    *(client.chat.completions.create(messages=_MESSAGES) for _ in range(4))
+                )
+                return first_round
+
+        first_round = asyncio.run(main())
+        after = srv.connection_count
+
+    assert first_round - before <= 4
+    assert after == first_round
+
+
+def test_pool_is_rebuilt_for_a_new_event_loop() -> None:
+    with FakeValueAIServer() as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        client = ValueAIAsyncClient(srv.base_url, token, "m", poll_interval=0.01)
+        for _ in range(2):
+            resp = asyncio.run(client.create(messages=_MESSAGES))
+            assert resp.choices[0].finish_reason == "stop"
+
+
+def test_cached_token_is_reused_until_rejected() -> None:
+    with FakeValueAIServer() as srv:
+        token = get_cached_token(srv.base_url, "cache-user", "pass", max_age=60)
+        assert get_cached_token(srv.base_url, "cache-user", "pass", max_age=60) == token
+        assert srv.stats()["endpoints"]["/token"]["requests"] == 1
+        invalidate_token(token)
+        assert get_cached_token(srv.base_url, "cache-user", "pass", max_age=60) != token
+        assert get_cached_token(srv.base_url, "cache-user", "pass", max_age=0) != token
+        assert srv.stats()["endpoints"]["/token"]["requests"] == 3
+
+
+def test_async_openai_renews_an_expired_token() -> None:
+    config = FakeServerConfig(token_ttl_seconds=0.2)
+    with FakeValueAIServer(config) as srv:
+        token = get_cached_token(srv.base_url, "renew-user", "pass", max_age=60)
+
+        async def main() -> list[str]:
+            async with ValueAIAsyncOpenAI(
+                base_url=srv.base_url,
+                token=token,
+                model_name="m",
+                poll_interval=0.01,
+                username="renew-user",
+                password="pass",
+                token_ttl=60,
+            ) as client:
+                first = await client.chat.completions.create(messages=_MESSAGES)
+                await asyncio.sleep(0.3)
+                # The server expired the token the cache still holds: 401, renew, retry
+                second = await client.chat.completions.create(messages=_MESSAGES)
+                return [first.choices[0].message.content, second.choices[0].message.content]
+
+        texts = asyncio.run(main())
+        stats = srv.stats()
+
+    assert all(texts)
+    assert stats["endpoints"]["/token"]["requests"] == 2
+    assert stats["endpoints"]["/llm/predict"]["status_codes"].get("401") == 1
@@ -0,0 +1,104 @@
+"""Tests for seeded sampling and run manifests."""
+
+import json
+
+from rag_med.qa_generator import generator
+from rag_med.qa_generator.manifest import RunManifest, sample_chunk_groups
+from rag_med.qa_generator.models import QAResult
+from rag_med.results_store import get_results_store
+
+
+def _qa(chunk: str, chunk_index: int) -> QAResult:
+    return QAResult(
+        chunk_index=chunk_index,
+        chunk=chunk,
+        chunk_length_chars=len(chunk),
+        chunk_length_words=1,
+        model_used="m",
+        question=f"вопрос {chunk_index}",
+        answer="ответ",
+        raw_model_output="{}",
+    )
+
+
+def test_sampling_is_determined_by_seed_and_pdf() -> None:
+    groups = sample_chunk_groups(40, 3, 4, seed=1, pdf_sha256="a")
+    assert groups == sample_chunk_groups(40, 3, 4, seed=1, pdf_sha256="a")
+    assert groups != sample_chunk_groups(40, 3, 4, seed=2, pdf_sha256="a")
+    assert groups != sample_chunk_groups(40, 3, 4, seed=1, pdf_sha256="b")
+    flat = [i for g in groups for i in g]
+    assert len(groups) == 3 and len(set(flat)) == 12
+
+
+def test_manifest_keys(tmp_path) -> None:
+    def build(**kw) -> RunManifest:
+        args = {
+            "pdf_path": tmp_path / "a.pdf",
+            "pdf_sha256": "h",
+            "seed": 1,
+            "chunk_groups": [[0, 1, 2, 3]],
+            "evaluate": False,
+        }
+        return RunManifest.build(**{**args, **kw})
+
+    base = build()
+    assert build(pdf_path=tmp_path / "copy.pdf").key == base.key
+    assert build(seed=2).key != base.key
+    evaluated = build(evaluate=True)
+    assert evaluated.key != base.key and evaluated.generation_key == base.generation_key
+    assert build(cleaned=True).generation_key != base.generation_key
+
+
+def test_generate_reuses_identical_run(mocker, tmp_path) -> None:
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF")
+    mocker.patch.object(generator.settings, "manifest_dir", str(tmp_path / "manifests"))
+    mocker.patch.object(generator, "_read_pdf_text", return_value="text")
+    mocker.patch.object(
+        generator, "_split_text_chunks", return_value=[f"chunk {i}" for i in range(12)]
+    )
+    generate = mocker.patch.object(generator, "generate_qa", side_effect=_qa)
+
+    first = generator.generate_qa_from_pdf(pdf, tmp_path / "one.json", num_questions=2, seed=5)
+    second = generator.generate_qa_from_pdf(pdf, tmp_path / "two.json", num_questions=2, seed=5)
+
+    assert generate.call_count == 2
+    assert [r.chunk for r in second] == [r.chunk for r in first]
+    manifest = json.loads((tmp_path / "two_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["seed"] == 5 and len(manifest["chunk_groups"]) == 2
+    assert json.loads((tmp_path / "two.json").read_text(encoding="utf-8"))[0]["question"]
+
+    generator.generate_qa_from_pdf(
+        pdf, tmp_path / "three.json", num_questions=2, seed=5, reuse=False
+    )
+    assert generate.call_count == 4
+
+    # Every invocation is in the run history, the reused one marked as such
+    runs = get_results_store().list_runs(kind="generate")
+    assert [(r["results_file"], r["reused"]) for r in runs] == [
+        (str(tmp_path / "three.json"), 0),
+        (str(tmp_path / "two.json"), 1),
+        (str(tmp_path / "one.json"), 0),
+    ]
+
+
+def test_results_with_scorer_errors_are_not_reusable() -> None:
+    scored = {
+        "ragas_faithfulness": 0.9,
+        "cosine_similarity": 0.8,
+        "factual_correctness": 0.7,
+        "llm_alignment_score": 8,
+        "llm_alignment_comment": None,
+    }
+    result = _qa("chunk", 1)
+    assert generator._reusable([result])
+    result.evaluation_metrics = scored
+    assert generator._reusable([result])
+    for broken in (
+        {**scored, "ragas_faithfulness": None, "ragas_error": "timeout"},
+        {**scored, "llm_alignment_error": "bad json"},
+        {**scored, "factual_correctness": None},
+        {"error": "ValueAI down"},
+    ):
+        result.evaluation_metrics = broken
+        assert not generator._reusable([result])
@@ -0,0 +1,82 @@
+"""Tests for the persistent metric-result cache."""
+
+from rag_med.evaluation import cache as cache_module
+from rag_med.evaluation import metrics
+from rag_med.evaluation.cache import MetricCache, metric_cache_key
+
+
+def test_key_depends_on_every_component() -> None:
+    inputs = {"question": "q", "response": "r", "contexts": ["c"]}
+    base = metric_cache_key("faithfulness", "1", "m", inputs)
+    assert base == metric_cache_key("faithfulness", "1", "m", dict(inputs))
+    assert base != metric_cache_key("faithfulness", "2", "m", inputs)
+    assert base != metric_cache_key("faithfulness", "1", "other", inputs)
+    assert base != metric_cache_key("factual_correctness", "1", "m", inputs)
+    assert base != metric_cache_key("faithfulness", "1", "m", {**inputs, "contexts": ["c2"]})
+
+
+def test_lru_eviction_and_stats(tmp_path) -> None:
+    cache = MetricCache(tmp_path / "cache.sqlite3", max_entries=2)
+    cache.put("a", "m", {"value": 1})
+    cache.put("b", "m", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+    cache.put("c", "m", {"value": 3})
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+    cache.refresh = True
+    assert cache.get("a") is None
+    cache.close()
+
+
+def test_only_changed_pairs_are_rescored(mocker, tmp_path) -> None:
+    cache = MetricCache(tmp_path / "cache.sqlite3")
+    mocker.patch.object(cache_module, "get_default_cache", return_value=cache)
+    mocker.patch.object(metrics, "_use_valueai_llm", return_value=True)
+    judge = mocker.patch.object(
+        metrics, "_alignment_judge_call", return_value='{"alignment_score": 7, "comment": "ok"}'
+    )
+
+    first = metrics.evaluate_answer_pair_llm_alignment("q", "эталон", "ответ", "контекст")
+    again = metrics.evaluate_answer_pair_llm_alignment("q", "эталон", "ответ", "контекст")
+    metrics.evaluate_answer_pair_llm_alignment("q", "эталон", "другой ответ", "контекст")
+
+    assert first == again == {"alignment_score": 7, "alignment_comment": "ok"}
+    assert judge.call_count == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_failures_are_not_cached(mocker, tmp_path) -> None:
+    cache = MetricCache(tmp_path / "cache.sqlite3")
+    mocker.patch.object(cache_module, "get_default_cache", return_value=cache)
+    scorer = mocker.Mock()
+    scorer.ascore = mocker.AsyncMock(side_effect=RuntimeError("llm down"))
+    mocker.patch.object(metrics, "_get_faithfulness_scorer", return_value=scorer)
+
+    out = metrics.evaluate_answer_pair("q", "r", ["c"])
+    assert out["error"] == "llm down"
+    assert len(cache) == 0
+
+
+def test_unparsed_judge_output_is_not_cached(mocker, tmp_path) -> None:
+    cache = MetricCache(tmp_path / "cache.sqlite3")
+    mocker.patch.object(cache_module, "get_default_cache", return_value=cache)
+    mocker.patch.object(metrics, "_use_valueai_llm", return_value=True)
+    judge = mocker.patch.object(
+        metrics,
+        "_alignment_judge_call",
+        side_effect=["Оценка: семь", '{"alignment_score": 7, "comment": "ok"}'],
+    )
+
+    bad = metrics.evaluate_answer_pair_llm_alignment("q", "эталон", "ответ", "контекст")
+    assert bad["alignment_score"] is None and "alignment_error" in bad
+    assert len(cache) == 0
+
+    good = metrics.evaluate_answer_pair_llm_alignment("q", "эталон", "ответ", "контекст")
+    assert good == {"alignment_score": 7, "alignment_comment": "ok"}
+    assert judge.call_count == 2
+    assert len(cache) == 1
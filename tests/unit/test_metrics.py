@@ -1,5 +1,7 @@
 """Unit tests for evaluation metrics (RAGAS-based)."""
 
+import pytest
+
 from rag_med.evaluation.metrics import compare_two_answers, evaluate_answer_pair
 
 
@@ -33,3 +35,207 @@ def test_evaluate_answer_pair_return_keys() -> None:
     )
     assert "faithfulness" in metrics
     assert 0.0 <= metrics["faithfulness"] <= 1.0
+
+
+def _random_pairs(n: int, seed: int = 0) -> list[tuple[str, str]]:
+    import random
+
+    rng = random.Random(seed)
+    words = [f"слово{i}" for i in range(300)] + ["препарат", "доза", "АД", "мг"]
+    pairs = []
+    for _ in range(n):
+        ref = " ".join(rng.choices(words, k=rng.randint(0, 60)))
+        cand = " ".join(rng.choices(words, k=rng.randint(0, 60)))
+        pairs.append((ref, cand))
+    return pairs
+
+
+def test_cosine_similarity_batch_matches_scalar() -> None:
+    """Batch cosine equals the scalar function, including empty-text edge cases."""
+    from rag_med.evaluation.metrics import _cosine_similarity, cosine_similarity_batch
+
+    pairs = [("", ""), ("a", ""), ("", "a"), ("same", "same"), ("a b c", "x y z")]
+    pairs += _random_pairs(500)
+    assert cosine_similarity_batch(pairs) == [_cosine_similarity(r, c) for r, c in pairs]
+    assert cosine_similarity_batch([]) == []
+
+
+@pytest.mark.slow
+def test_cosine_similarity_batch_benchmark_10k(record_property) -> None:
+    """Benchmark: 10k pairs, batch vs scalar."""
+    import time
+
+    from rag_med.evaluation.metrics import _cosine_similarity, cosine_similarity_batch
+
+    pairs = _random_pairs(10_000, seed=1)
+    t0 = time.perf_counter()
+    scalar = [_cosine_similarity(r, c) for r, c in pairs]
+    t1 = time.perf_counter()
+    batch = cosine_similarity_batch(pairs)
+    t2 = time.perf_counter()
+    record_property("scalar_seconds", round(t1 - t0, 3))
+    record_property("batch_seconds", round(t2 - t1, 3))
+    assert batch == scalar
+    assert t2 - t1 < t1 - t0
+
+
+def _fake_scorer(mocker, value: float, tracker: dict):
+    import asyncio
+    import threading
+
+    async def ascore(**kwargs):
+        tracker["active"] += 1
+        tracker["peak"] = max(tracker["peak"], tracker["active"])
+        tracker["threads"].add(threading.get_ident())
+        await asyncio.sleep(0.02)
+        tracker["active"] -= 1
+        if "boom" in kwargs.get("response", ""):
+            raise RuntimeError("judge failed")
+        return mocker.Mock(value=value)
+
+    scorer = mocker.Mock()
+    scorer.ascore = ascore
+    return scorer
+
+
+def test_batch_ragas_matches_single_and_caps_concurrency(mocker) -> None:
+    from rag_med.evaluation import cache, metrics
+
+    mocker.patch.object(cache, "get_default_cache", return_value=None)
+    tracker = {"active": 0, "peak": 0, "threads": set()}
+    mocker.patch.object(metrics, "_get_faithfulness_scorer", return_value=_fake_scorer(mocker, 0.5, tracker))
+    mocker.patch.object(
+        metrics, "_get_factual_correctness_scorer", return_value=_fake_scorer(mocker, 0.75, tracker)
+    )
+
+    samples = [(f"q{i}", f"ответ {i}", [f"контекст {i}"]) for i in range(10)]
+    samples += [("q", "boom", ["c"]), ("q", "r", [])]
+    batch = metrics.evaluate_answer_pairs_ragas_batch(samples, max_concurrency=3)
+    single = [metrics.evaluate_answer_pair_ragas_extended(q, r, c) for q, r, c in samples]
+    assert batch == single
+    assert tracker["peak"] == 3
+    assert len(tracker["threads"]) == 1
+
+    pairs = [("эталон", "ответ"), ("эталон", "boom")]
+    batch_text = metrics.compare_two_answers_batch(pairs)
+    assert batch_text == [metrics.compare_two_answers(ref, cand) for ref, cand in pairs]
+    assert batch_text[1]["factual_error"] == "judge failed"
+
+
+def test_cheap_lexical_metrics() -> None:
+    from rag_med.evaluation.metrics import char_ngram_f1, rouge_l, token_f1
+
+    assert token_f1("a b c", "a b c") == 1.0
+    assert token_f1("a b c d", "a b") == pytest.approx(2 * 1.0 * 0.5 / 1.5)
+    assert token_f1("a", "") == 0.0
+    assert rouge_l("a b c d", "a x c d") == pytest.approx(0.75)
+    assert rouge_l("a b c", "c b a") == pytest.approx(1 / 3)
+    assert char_ngram_f1("таблетки", "таблетку") > char_ngram_f1("таблетки", "укол")
+    assert char_ngram_f1("", "") == 1.0
+
+
+def test_gate_short_circuits_llm_metrics(mocker) -> None:
+    from rag_med.evaluation import metrics
+
+    metrics.reset_gate_stats()
+    judge = mocker.patch.object(metrics, "_alignment_judge_call")
+    fc = mocker.patch.object(metrics, "_get_factual_correctness_scorer")
+    mocker.patch.object(metrics, "_use_valueai_llm", return_value=True)
+    etalon = "Назначают метформин 500 мг два раза в день."
+
+    refusal = metrics.evaluate_answer_pair_llm_alignment("q", etalon, "К сожалению, не могу ответить.")
+    assert (refusal["alignment_score"], refusal["alignment_gate"]) == (1, "refusal")
+    same = metrics.compare_two_answers(etalon, "назначают метформин 500 мг два раза в день")
+    assert (same["factual_correctness"], same["factual_gate"]) == (1.0, "near_identical")
+    assert same["token_f1"] == 1.0
+    batch = metrics.compare_two_answers_batch([(etalon, "   ")])
+    assert batch[0]["factual_gate"] == "empty_answer"
+
+    judge.assert_not_called()
+    fc.assert_not_called()
+    stats = metrics.gate_stats()
+    assert stats["llm_calls_avoided"] == 3
+    assert stats["by_metric"] == {"llm_alignment": 1, "factual_correctness": 2}
+
+
+def test_gate_keeps_changed_numbers_and_negations_for_the_judge() -> None:
+    from rag_med.evaluation.metrics import gate_llm_metrics
+
+    etalon = "При беременности можно принимать парацетамол по 500 мг не чаще четырех раз в сутки."
+    assert gate_llm_metrics(etalon, etalon.lower()).reason == "near_identical"
+    assert gate_llm_metrics(etalon, etalon.replace("500", "5000")) is None
+    assert gate_llm_metrics(etalon, etalon.replace("можно", "нельзя")) is None
+    assert gate_llm_metrics(etalon, etalon.replace("не чаще", "чаще")) is None
+    assert gate_llm_metrics("Доза 0,5 г.", "Доза 0.5 г.").reason == "near_identical"
+
+
+def test_batched_alignment_judge_with_fallback(mocker) -> None:
+    import json
+
+    from rag_med.evaluation import cache, metrics
+
+    mocker.patch.object(cache, "get_default_cache", return_value=None)
+    mocker.patch.object(metrics, "_use_valueai_llm", return_value=True)
+    metrics.reset_judge_stats()
+
+    def judge(prompt: str, n_items: int = 1) -> str:
+        metrics._record_judge(calls=1, items=n_items)
+        if "=== Пара" not in prompt:
+            return json.dumps({"alignment_score": 4, "comment": "single"})
+        # pair 2 is missing from the batched answer; pair 3 has no score
+        return (
+            "```json\n"
+            '[{"id": 1, "alignment_score": 9.4, "comment": "ok"}, {"id": 3, "comment": "?"}]\n'
+            "```"
+        )
+
+    call = mocker.patch.object(metrics, "_alignment_judge_call", side_effect=judge)
+    samples = [(f"q{i}", f"эталон номер {i}", f"ответ RAG {i}", "контекст") for i in range(3)]
+    outs = metrics.evaluate_answer_pairs_llm_alignment_batch(samples, batch_size=3)
+
+    assert outs[0] == {"alignment_score": 9, "alignment_comment": "ok"}
+    assert outs[1] == outs[2] == {"alignment_score": 4, "alignment_comment": "single"}
+    assert call.call_count == 3
+    stats = metrics.judge_call_stats()
+    assert (stats["llm_calls"], stats["items_scored"], stats["single_pair_fallbacks"]) == (3, 3, 2)
+
+
+def test_batched_alignment_judge_caches_under_its_own_version(mocker, tmp_path) -> None:
+    import json
+
+    from rag_med.evaluation import cache, metrics
+    from rag_med.evaluation.cache import MetricCache
+
+    store = MetricCache(tmp_path / "cache.sqlite3")
+    mocker.patch.object(cache, "get_default_cache", return_value=store)
+    mocker.patch.object(metrics, "_use_valueai_llm", return_value=True)
+
+    def judge(prompt: str, n_items: int = 1) -> str:
+        if "=== Пара" not in prompt:
+            return json.dumps({"alignment_score": 4, "comment": "single"})
+        return '[{"id": 1, "alignment_score": 8, "comment": "ok"}]'
+
+    call = mocker.patch.object(metrics, "_alignment_judge_call", side_effect=judge)
+    samples = [(f"q{i}", f"эталон номер {i}", f"ответ RAG {i}", "контекст") for i in range(2)]
+    first = metrics.evaluate_answer_pairs_llm_alignment_batch(samples, batch_size=2)
+    assert store.stats()["misses"] == 2
+    again = metrics.evaluate_answer_pairs_llm_alignment_batch(samples, batch_size=2)
+
+    assert first == again
+    assert [o["alignment_score"] for o in first] == [8, 4]
+    assert call.call_count == 2
+    assert (store.stats()["hits"], store.stats()["misses"]) == (2, 2)
+
+    # Editing the batch prompt leaves single-pair cache entries and stamps valid
+    single, batch = (metrics.metric_version(m) for m in ("llm_alignment", "llm_alignment_batch"))
+    mocker.patch.object(metrics, "_ALIGNMENT_BATCH_PROMPT", "другой промпт {items}")
+    assert metrics.metric_version("llm_alignment") == single
+    assert metrics.metric_version("llm_alignment_batch") != batch
+
+
+def test_parse_alignment_batch_recovers_truncated_array() -> None:
+    from rag_med.evaluation.metrics import _parse_alignment_batch
+
+    content = '[{"id": 1, "alignment_score": 7, "comment": "a"}, {"id": 2, "alignment_score": 3, "comm'
+    assert list(_parse_alignment_batch(content)) == [1]
+    assert _parse_alignment_batch("no json") == {}
@@ -0,0 +1,91 @@
+"""Tests for JSON/Parquet result files."""
+
+from pathlib import Path
+
+import pytest
+
+from rag_med.evaluation.rescore import discover_result_files, load_result_file
+from rag_med.qa_generator.models import QAResult
+from rag_med.qa_generator.output import (
+    read_results,
+    with_format,
+    write_parquet_from_jsonl,
+    write_results,
+)
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _qa(i: int, metrics: dict | None) -> QAResult:
+    return QAResult(
+        chunk_index=i,
+        chunk="длинный текст " * 50,
+        chunk_length_chars=700,
+        chunk_length_words=100,
+        model_used="m",
+        question=f"вопрос {i}",
+        answer="ответ",
+        raw_model_output="{}",
+        valueai_answer="rag" if metrics else None,
+        evaluation_metrics=metrics,
+    )
+
+
+def test_parquet_flattens_metrics_and_round_trips(tmp_path) -> None:
+    results = [
+        _qa(
+            1,
+            {
+                "ragas_faithfulness": 0.5,
+                "llm_alignment_score": 8,
+                "llm_alignment_comment": "ok",
+                "metric_versions": {"faithfulness": "1:ragas-0.4"},
+            },
+        ),
+        _qa(2, {"skipped": "generation failed"}),
+        _qa(3, None),
+    ]
+    path = tmp_path / "qa_result.parquet"
+    write_results(results, path)
+
+    table = pq.read_table(path, columns=["chunk_index", "metric.ragas_faithfulness"])
+    assert table.column("metric.ragas_faithfulness").to_pylist() == [0.5, None, None]
+    schema = pq.read_schema(path)
+    assert str(schema.field("metric.llm_alignment_score").type) == "int64"
+    assert "metric.metric_versions.faithfulness" in schema.names
+    column = pq.ParquetFile(path).metadata.row_group(0).column(schema.get_field_index("chunk"))
+    assert column.compression == "ZSTD" and column.has_dictionary_page
+
+    assert read_results(path) == results
+
+
+def test_parquet_from_jsonl_in_batches_matches_one_table(tmp_path) -> None:
+    results = [
+        _qa(1, {"llm_alignment_score": 8}),
+        _qa(2, None),
+        _qa(3, {"llm_alignment_score": 7.5, "factual_gate": "refusal"}),
+    ]
+    source = tmp_path / "qa_results.jsonl"
+    source.write_text("".join(r.model_dump_json() + "\n" for r in results), encoding="utf-8")
+
+    assert write_parquet_from_jsonl(source, tmp_path / "batched.parquet", batch_size=1) == 3
+    write_results(results, tmp_path / "whole.parquet")
+
+    batched = pq.read_table(tmp_path / "batched.parquet")
+    assert batched.num_rows == 3
+    assert batched.schema == pq.read_table(tmp_path / "whole.parquet").schema
+    assert pq.ParquetFile(tmp_path / "batched.parquet").num_row_groups == 3
+    assert read_results(tmp_path / "batched.parquet") == read_results(tmp_path / "whole.parquet")
+
+
+def test_format_by_suffix_and_rescore_discovery(tmp_path) -> None:
+    assert with_format(Path("qa_result.json"), "parquet") == Path("qa_result.parquet")
+    assert with_format(Path("qa_result.parquet"), "parquet") == Path("qa_result.parquet")
+    with pytest.raises(ValueError):
+        with_format(Path("qa_result.json"), "csv")
+
+    write_results([_qa(1, None)], tmp_path / "a.parquet")
+    write_results([_qa(2, None)], tmp_path / "b.json")
+    files = discover_result_files([tmp_path])
+    assert [f.name for f in files] == ["a.parquet", "b.json"]
+    assert [load_result_file(f)[0].chunk_index for f in files] == [1, 2]
@@ -0,0 +1,154 @@
+"""Tests for the streaming rag-med run pipeline."""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from rag_med.pipeline import Stage, StreamingPipeline
+from rag_med.pipeline import run as run_module
+from rag_med.qa_generator import generator
+from rag_med.qa_generator.models import QAResult
+from rag_med.qa_generator.output import read_results
+from rag_med.results_store import get_results_store
+
+
+def test_stages_stream_and_drop_failed_items() -> None:
+    def explode(x: int) -> list[int]:
+        if x == 3:
+            raise RuntimeError("bad item")
+        return [x, x * 10]
+
+    pipeline = StreamingPipeline(
+        [
+            Stage("split", explode, workers=2, queue_size=2),
+            Stage("inc", lambda x: [x + 1], workers=3, queue_size=2),
+        ]
+    )
+    out = sorted(pipeline.run(range(5)))
+    assert out == [1, 1, 2, 3, 5, 11, 21, 41]
+    stats = pipeline.stats()
+    assert stats["split"]["consumed"] == 5 and stats["split"]["errors"] == 1
+    assert stats["inc"]["produced"] == 8
+
+
+def test_bounded_queues_apply_backpressure() -> None:
+    lock = threading.Lock()
+    produced = consumed = 0
+    max_ahead = 0
+
+    def source():
+        nonlocal produced, max_ahead
+        for i in range(40):
+            with lock:
+                produced += 1
+                max_ahead = max(max_ahead, produced - consumed)
+            yield i
+
+    def slow(x: int) -> list[int]:
+        time.sleep(0.005)
+        return [x]
+
+    pipeline = StreamingPipeline(
+        [Stage("fast", lambda x: [x], queue_size=2), Stage("slow", slow, queue_size=2)]
+    )
+    for _ in pipeline.run(source()):
+        with lock:
+            consumed += 1
+    assert consumed == 40
+    # two queues of 2, the output queue of 2, one item per worker and one in the feeder
+    assert max_ahead <= 10
+
+
+def test_early_exit_stops_workers() -> None:
+    pipeline = StreamingPipeline([Stage("id", lambda x: [x], workers=2, queue_size=1)])
+    stream = pipeline.run(iter(range(1000)))
+    assert next(stream) in range(1000)
+    stream.close()
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+def test_parse_workers() -> None:
+    assert run_module.parse_workers("generate=8, rag=2") == {"generate": 8, "rag": 2}
+    with pytest.raises(ValueError, match="Invalid worker spec"):
+        run_module.parse_workers("upload=2")
+    with pytest.raises(ValueError, match="positive integer"):
+        run_module.parse_workers("rag=0")
+
+
+def test_run_pipeline_end_to_end(mocker, tmp_path) -> None:
+    pdfs = [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+    for pdf in pdfs:
+        pdf.write_bytes(b"%PDF " + pdf.name.encode())
+    mocker.patch.object(run_module, "clean_pdf", return_value=False)
+    mocker.patch.object(run_module, "_read_pdf_text", side_effect=lambda p: p.stem)
+    mocker.patch.object(
+        run_module, "_split_text_chunks", side_effect=lambda text: [f"{text}{i}" for i in range(8)]
+    )
+
+    def fake_generate(chunk: str, chunk_index: int) -> QAResult:
+        return QAResult(
+            chunk_index=chunk_index,
+            chunk=chunk,
+            chunk_length_chars=len(chunk),
+            chunk_length_words=1,
+            model_used="m",
+            question=f"вопрос {chunk_index}",
+            answer="ответ",
+            raw_model_output="{}",
+        )
+
+    generate = mocker.patch.object(run_module, "generate_qa", side_effect=fake_generate)
+    client = mocker.Mock()
+    client.ask.side_effect = lambda q: f"rag: {q}"
+    mocker.patch.object(run_module, "_build_valueai_client", return_value=client)
+    mocker.patch.object(
+        generator, "evaluate_answer_pair_ragas_extended", return_value={"faithfulness": 0.5}
+    )
+    mocker.patch.object(
+        generator,
+        "compare_two_answers",
+        return_value={"cosine_similarity": 0.25, "factual_correctness": 1.0},
+    )
+    mocker.patch.object(
+        generator,
+        "evaluate_answer_pair_llm_alignment",
+        return_value={"alignment_score": 8, "alignment_comment": "ok"},
+    )
+    mocker.patch.object(run_module, "metric_cache_stats", return_value={"enabled": False})
+    mocker.patch.object(run_module.settings, "lexical_index_dir", None)
+    mocker.patch.object(run_module.settings, "manifest_dir", str(tmp_path / "manifests"))
+
+    seen: list[QAResult] = []
+    summary = run_module.run_pipeline(
+        [tmp_path], tmp_path / "out", questions_per_file=2, on_result=seen.append, seed=7
+    )
+
+    lines = (tmp_path / "out" / run_module.RESULTS_FILE).read_text(encoding="utf-8").splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert len(rows) == len(seen) == 4
+    assert sorted(r["source_pdf"] for r in rows) == sorted(map(str, pdfs * 2))
+    assert all(r["evaluation_metrics"]["llm_alignment_score"] == 8 for r in rows)
+    assert all("bm25_similarity" in r["evaluation_metrics"] for r in rows)
+    assert summary["aggregate_metrics"]["evaluated_count"] == 4
+    assert summary["stages"]["score"]["produced"] == 4
+    assert summary["first_result_seconds"] is not None
+    assert summary["seed"] == 7 and len(summary["manifests"]) == 2
+    assert generate.call_count == 4
+
+    # Same seed and PDFs: identical manifests, QA pairs come from the store
+    again = run_module.run_pipeline(
+        [tmp_path], tmp_path / "out2", questions_per_file=2, seed=7, output_format="parquet"
+    )
+    assert generate.call_count == 4
+    keys = sorted(m["key"] for m in summary["manifests"])
+    assert sorted(m["key"] for m in again["manifests"]) == keys
+    assert again["aggregate_metrics"]["evaluated_count"] == 4
+    assert len(read_results(Path(again["parquet_file"]))) == 4
+
+    # Both runs reached the history batch by batch, with the hash of their results
+    runs = get_results_store().list_runs(kind="run")
+    assert [(r["item_count"], r["evaluated_count"]) for r in runs] == [(4, 4), (4, 4)]
+    assert all(r["results_hash"] and r["summary_file"] for r in runs)
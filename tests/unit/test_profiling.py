@@ -0,0 +1,67 @@
+"""Tests for per-stage profiling."""
+
+import pstats
+import threading
+
+from rag_med.profiling import (
+    disable_profiling,
+    enable_profiling,
+    profile_stage,
+    profile_summary,
+)
+
+
+def _in_stage(name: str) -> None:
+    with profile_stage(name):
+        sum(range(1000))
+
+
+def test_profile_stage_is_noop_when_disabled() -> None:
+    disable_profiling()
+    with profile_stage("pdf_read"):
+        pass
+    assert profile_summary() is None
+
+
+def test_stages_record_wall_cpu_memory_and_pstats(tmp_path) -> None:
+    pstats_file = tmp_path / "run.pstats"
+    enable_profiling(pstats_path=pstats_file, trace_memory=True)
+    try:
+        with profile_stage("split"):
+            _ = [str(i) for i in range(100_000)]
+        with profile_stage("split"), profile_stage("sampling"):
+            pass
+        worker = threading.Thread(target=_in_stage, args=("llm:rag",))
+        worker.start()
+        worker.join()
+        summary = profile_summary()
+    finally:
+        disable_profiling()
+
+    stages = summary["stages"]
+    assert stages["split"]["calls"] == 2
+    assert stages["split"]["wall_seconds"] >= stages["split"]["wall_max_seconds"] > 0
+    assert stages["split"]["cpu_seconds"] > 0
+    assert stages["split"]["peak_memory_bytes"] > 0
+    assert stages["sampling"]["calls"] == 1
+    assert stages["llm:rag"]["calls"] == 1
+    assert summary["pstats_file"] == str(pstats_file)
+    assert pstats.Stats(str(pstats_file)).total_calls > 0
+    assert profile_summary() is None
+
+
+def test_stage_without_cprofile_when_another_profiler_is_active(mocker, tmp_path) -> None:
+    profiler = enable_profiling(pstats_path=tmp_path / "run.pstats")
+    try:
+        busy = mocker.Mock()
+        busy.enable.side_effect = ValueError("Another profiling tool is already active")
+        mocker.patch.object(profiler, "_thread_profile", return_value=busy)
+        _in_stage("llm:rag")
+        _in_stage("llm:rag")
+        summary = profile_summary()
+    finally:
+        disable_profiling()
+
+    assert summary["stages"]["llm:rag"]["calls"] == 2
+    assert summary["cprofile_skipped"] == 2
+    busy.disable.assert_not_called()
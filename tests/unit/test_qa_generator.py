@@ -30,3 +30,60 @@ def test_generate_qa(mocker) -> None:
     assert result.model_used is not None
     assert result.question != ""
     assert result.answer != ""
+
+
+def test_run_valueai_evaluation_layout(mocker, tmp_path) -> None:
+    """Concurrent evaluation keeps per-item metrics and the summary layout."""
+    import json
+
+    from rag_med.qa_generator import generator
+    from rag_med.qa_generator.models import QAResult
+
+    client = mocker.Mock()
+    client.ask.side_effect = lambda q: f"rag: {q}"
+    mocker.patch.object(generator, "_build_valueai_client", return_value=client)
+    mocker.patch.object(
+        generator, "evaluate_answer_pair_ragas_extended", return_value={"faithfulness": 0.5}
+    )
+    mocker.patch.object(
+        generator,
+        "compare_two_answers",
+        return_value={"cosine_similarity": 0.25, "factual_correctness": 1.0},
+    )
+    mocker.patch.object(
+        generator,
+        "evaluate_answer_pair_llm_alignment",
+        return_value={"alignment_score": 8, "alignment_comment": "ok"},
+    )
+
+    def qa(i: int, question: str) -> QAResult:
+        return QAResult(
+            chunk_index=i,
+            chunk="текст",
+            chunk_length_chars=5,
+            chunk_length_words=1,
+            model_used="m",
+            question=question,
+            answer="ответ",
+            raw_model_output="{}",
+        )
+
+    results = [qa(1, "вопрос 1"), qa(2, "Ошибка"), qa(3, "вопрос 3")]
+    output = tmp_path / "qa_result.json"
+    generator._run_valueai_evaluation(results, tmp_path / "doc.pdf", 3, output, None)
+
+    assert results[0].valueai_answer == "rag: вопрос 1"
+    assert results[0].evaluation_metrics == {
+        "ragas_faithfulness": 0.5,
+        "cosine_similarity": 0.25,
+        "factual_correctness": 1.0,
+        "llm_alignment_score": 8,
+        "llm_alignment_comment": "ok",
+    }
+    assert results[1].evaluation_metrics == {"skipped": "generation failed"}
+    summary = json.loads((tmp_path / "qa_result_valueai_eval.json").read_text(encoding="utf-8"))
+    aggregate = summary["aggregate_metrics"]
+    assert aggregate["evaluated_count"] == 2
+    assert aggregate["avg_llm_alignment_score"] == 8.0
+    assert aggregate["metric_stats"]["llm_alignment_score"]["count"] == 2
+    assert len(json.loads(output.read_text(encoding="utf-8"))) == 3
@@ -0,0 +1,112 @@
+"""Tests for offline re-scoring of QA result files."""
+
+import json
+
+import pytest
+
+from rag_med.evaluation import rescore
+from rag_med.qa_generator.models import QAResult
+from rag_med.qa_generator.output import write_results
+
+
+def _qa(i: int, valueai_answer: str | None) -> dict:
+    return QAResult(
+        chunk_index=i,
+        chunk="контекст",
+        chunk_length_chars=8,
+        chunk_length_words=1,
+        model_used="m",
+        question=f"вопрос {i}",
+        answer="эталон",
+        raw_model_output="{}",
+        valueai_answer=valueai_answer,
+    ).model_dump()
+
+
+@pytest.fixture
+def judged(mocker):
+    mocker.patch.object(rescore, "metric_cache_stats", return_value={"enabled": False})
+    mocker.patch.object(
+        rescore,
+        "evaluate_answer_pairs_ragas_batch",
+        side_effect=lambda samples: [{"faithfulness": 0.5} for _ in samples],
+    )
+    return mocker.patch.object(
+        rescore,
+        "evaluate_answer_pair_llm_alignment",
+        return_value={"alignment_score": 9, "alignment_comment": "ok"},
+    )
+
+
+def test_parse_metric_names() -> None:
+    assert rescore.parse_metric_names("all") == list(rescore.METRIC_NAMES)
+    assert rescore.parse_metric_names("cosine, alignment,cosine") == ["cosine", "alignment"]
+    with pytest.raises(ValueError, match="Unknown metrics"):
+        rescore.parse_metric_names("bleu")
+
+
+def test_only_stale_items_are_rescored(judged, tmp_path) -> None:
+    (tmp_path / "a.json").write_text(json.dumps([_qa(1, "ответ"), _qa(2, None)]), encoding="utf-8")
+    (tmp_path / "b.json").write_text(json.dumps([_qa(3, "ответ 3")]), encoding="utf-8")
+    (tmp_path / "a_valueai_eval.json").write_text("{}", encoding="utf-8")
+    metrics = ["faithfulness", "cosine", "alignment"]
+
+    report = rescore.evaluate_result_files([tmp_path], metrics, summary_file=tmp_path / "s.out")
+    assert report["evaluable"] == 2
+    assert report["rescored"] == {"faithfulness": 2, "cosine": 2, "alignment": 2}
+    saved = json.loads((tmp_path / "a.json").read_text(encoding="utf-8"))
+    assert saved[0]["evaluation_metrics"]["llm_alignment_score"] == 9
+    assert saved[0]["evaluation_metrics"]["ragas_faithfulness"] == 0.5
+    assert saved[1]["evaluation_metrics"] is None
+    assert report["aggregate_metrics"]["avg_llm_alignment_score"] == 9.0
+
+    report = rescore.evaluate_result_files([tmp_path], metrics, summary_file=tmp_path / "s.out")
+    assert report["rescored"] == {"faithfulness": 0, "cosine": 0, "alignment": 0}
+    assert judged.call_count == 2
+
+    saved[0]["valueai_answer"] = "новый ответ"
+    (tmp_path / "a.json").write_text(json.dumps(saved), encoding="utf-8")
+    report = rescore.evaluate_result_files([tmp_path], ["alignment"], summary_file=tmp_path / "s.out")
+    assert report["rescored"] == {"alignment": 1}
+    summary = json.loads((tmp_path / "s.out").read_text(encoding="utf-8"))
+    assert [f["path"] for f in summary["files"]] == [str(tmp_path / "a.json"), str(tmp_path / "b.json")]
+
+
+def test_rescore_sets_and_clears_gate_keys(judged, tmp_path) -> None:
+    path = tmp_path / "qa_result.json"
+    path.write_text(json.dumps([_qa(1, "ответ")]), encoding="utf-8")
+    judged.return_value = {"alignment_score": 1, "alignment_gate": "refusal"}
+    summary = tmp_path / "s.out"
+    rescore.evaluate_result_files([path], ["alignment"], summary_file=summary)
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved[0]["evaluation_metrics"]["llm_alignment_gate"] == "refusal"
+
+    judged.return_value = {"alignment_score": 9, "alignment_comment": "ok"}
+    rescore.evaluate_result_files([path], ["alignment"], summary_file=summary, force=True)
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved[0]["evaluation_metrics"]["llm_alignment_score"] == 9
+    assert "llm_alignment_gate" not in saved[0]["evaluation_metrics"]
+
+
+def test_output_dir_keeps_runs_apart(judged, tmp_path) -> None:
+    for name, i in (("a", 1), ("b", 2)):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "qa_result.json").write_text(
+            json.dumps([_qa(i, "ответ")]), encoding="utf-8"
+        )
+    # The same run saved in both formats is read once
+    write_results(
+        [QAResult.model_validate(_qa(1, "ответ"))], tmp_path / "a" / "qa_result.parquet"
+    )
+    out = tmp_path / "out"
+
+    report = rescore.evaluate_result_files(
+        [tmp_path / "a", tmp_path / "b"], ["alignment"], output_dir=out
+    )
+    assert report["items"] == 2
+    assert sorted(f["output"] for f in report["files"]) == [
+        str(out / "a" / "qa_result.parquet"),
+        str(out / "b" / "qa_result.json"),
+    ]
+    saved = json.loads((out / "b" / "qa_result.json").read_text(encoding="utf-8"))
+    assert saved[0]["chunk_index"] == 2
@@ -0,0 +1,121 @@
+"""Tests for the SQLite run history."""
+
+import json
+
+from rag_med.qa_generator.models import QAResult
+from rag_med.results_store import ResultsStore
+
+
+def _qa(i: int, faithfulness: float | None, question: str | None = None) -> QAResult:
+    metrics = None if faithfulness is None else {
+        "ragas_faithfulness": faithfulness,
+        "llm_alignment_score": 8,
+        "llm_alignment_comment": "ok",
+    }
+    return QAResult(
+        chunk_index=i,
+        chunk="текст",
+        chunk_length_chars=5,
+        chunk_length_words=1,
+        model_used="qa-model",
+        question=question or f"вопрос {i}",
+        answer="ответ",
+        raw_model_output="{}",
+        valueai_answer="rag" if metrics else None,
+        evaluation_metrics=metrics,
+    )
+
+
+def test_add_list_and_diff_runs(tmp_path) -> None:
+    store = ResultsStore(tmp_path / "results.sqlite3")
+    meta = {"rag_id": 387, "rag_model": "rag-m", "qa_model": "qa-m"}
+    a = store.add_run([_qa(1, 0.4), _qa(2, 0.6)], kind="generate", meta=meta, created_at=1.0)
+    b = store.add_run([_qa(1, 0.8), _qa(3, 1.0)], kind="generate", meta=meta, created_at=2.0)
+    other = store.add_run(
+        [_qa(1, 0.1)], kind="run", meta={**meta, "rag_id": 1}, created_at=3.0
+    )
+    rerun = store.add_run(
+        [_qa(1, 0.4), _qa(2, 0.6)], kind="generate", created_at=0.5, reused=True
+    )
+    assert rerun not in (None, a)
+    assert store.get_run(rerun)["reused"] == 1
+    assert store.get_run(a)["reused"] == 0
+
+    runs = store.list_runs(rag_id=387)
+    assert [r["run_id"] for r in runs] == [b, a]
+    assert runs[0]["metric_mean"] == 0.9 and runs[1]["evaluated_count"] == 2
+    assert [r["run_id"] for r in store.list_runs(limit=1)] == [other]
+
+    assert store.metric_means(a)["llm_alignment_score"]["count"] == 2
+    rows = {row["metric"]: row for row in store.diff(a, b)}
+    faith = rows["ragas_faithfulness"]
+    assert round(faith["delta"], 6) == 0.4
+    assert faith["paired"] == 1 and round(faith["paired_delta"], 6) == 0.4
+
+
+def test_ingest_file_uses_siblings(tmp_path) -> None:
+    store = ResultsStore(tmp_path / "results.sqlite3")
+    results = tmp_path / "qa_result.json"
+    results.write_text(
+        json.dumps([_qa(1, 0.5).model_dump(), _qa(2, None).model_dump()]), encoding="utf-8"
+    )
+    (tmp_path / "qa_result_manifest.json").write_text(
+        json.dumps({"pdf_path": "doc.pdf", "seed": 3, "models": {"qa": "qa-m", "rag_id": 42}}),
+        encoding="utf-8",
+    )
+
+    run_id = store.ingest_file(results)
+    run = store.get_run(run_id)
+    assert (run["kind"], run["source"], run["rag_id"], run["seed"]) == ("backfill", "doc.pdf", 42, 3)
+    assert (run["item_count"], run["evaluated_count"]) == (2, 1)
+    assert store.ingest_file(results) is None
+
+    # Results a live run recorded already are not backfilled again
+    recorded = tmp_path / "recorded.json"
+    recorded.write_text(json.dumps([_qa(3, 0.7).model_dump()]), encoding="utf-8")
+    store.add_run([_qa(3, 0.7)], kind="generate")
+    assert store.ingest_file(recorded) is None
+
+
+def test_store_from_before_run_ids_is_migrated(tmp_path) -> None:
+    import sqlite3
+
+    from rag_med.results_store import _SCHEMA, results_key
+
+    db = tmp_path / "results.sqlite3"
+    old_schema = _SCHEMA[0].replace(
+        ",\n        results_hash TEXT,\n        reused INTEGER NOT NULL DEFAULT 0", ""
+    )
+    results = tmp_path / "qa_result.json"
+    results.write_text(json.dumps([_qa(1, 0.5).model_dump()]), encoding="utf-8")
+    with sqlite3.connect(db) as conn:
+        conn.execute(old_schema)
+        conn.execute(
+            "INSERT INTO runs (run_key, kind, created_at, item_count, evaluated_count) "
+            "VALUES (?, 'generate', 1.0, 1, 1)",
+            (results_key([_qa(1, 0.5)]),),
+        )
+    conn.close()
+
+    store = ResultsStore(db)
+    assert store.get_run(1)["reused"] == 0
+    assert store.ingest_file(results) is None
+
+
+def test_streamed_run_matches_add_run(tmp_path) -> None:
+    from rag_med.results_store import RunRecorder
+
+    store = ResultsStore(tmp_path / "results.sqlite3")
+    results = [_qa(1, 0.4), _qa(2, None), _qa(3, 0.8)]
+    whole = store.add_run(results, kind="run")
+    recorder = RunRecorder(store, store.start_run(kind="run"), batch_size=2)
+    for r in results:
+        recorder.add(r)
+    assert store.get_run(recorder.run_id)["item_count"] == 2
+    streamed = recorder.finish(summary_file=tmp_path / "run_summary.json")
+
+    a, b = store.get_run(whole), store.get_run(streamed)
+    assert (b["item_count"], b["evaluated_count"]) == (a["item_count"], a["evaluated_count"])
+    assert b["results_hash"] == a["results_hash"]
+    assert b["summary_file"] == str(tmp_path / "run_summary.json")
+    assert store.metric_means(streamed) == store.metric_means(whole)
@@ -0,0 +1,89 @@
+"""Tests for the warm HTTP service (rag-med serve)."""
+
+import threading
+
+import httpx
+
+from rag_med import server
+from rag_med.qa_generator.models import QAResult
+from rag_med.server import QAServer, QAService
+
+
+def _fake_generate(chunk: str, chunk_index: int) -> QAResult:
+    return QAResult(
+        chunk_index=chunk_index,
+        chunk=chunk,
+        chunk_length_chars=len(chunk),
+        chunk_length_words=len(chunk.split()),
+        model_used="m",
+        question="вопрос",
+        answer="ответ",
+        raw_model_output="{}",
+    )
+
+
+def test_endpoints_and_score_batching(mocker) -> None:
+    batch_sizes: list[int] = []
+
+    def ragas_batch(samples: list) -> list[dict]:
+        batch_sizes.append(len(samples))
+        return [{"faithfulness": 0.5} for _ in samples]
+
+    mocker.patch.object(server._metrics, "evaluate_answer_pairs_ragas_batch", ragas_batch)
+    mocker.patch.object(
+        server._metrics,
+        "compare_two_answers_batch",
+        lambda pairs: [{"cosine_similarity": 0.25, "factual_correctness": 1.0} for _ in pairs],
+    )
+    mocker.patch.object(
+        server._metrics,
+        "evaluate_answer_pair_llm_alignment",
+        return_value={"alignment_score": 8, "alignment_comment": "ok"},
+    )
+    mocker.patch.object(server._generator, "generate_qa", side_effect=_fake_generate)
+    client = mocker.Mock()
+    client.ask.side_effect = lambda q: f"rag: {q}"
+    build_client = mocker.patch.object(
+        server._generator, "_build_valueai_client", return_value=client
+    )
+
+    service = QAService(batch_size=4, batch_wait=0.2)
+    with QAServer("127.0.0.1", 0, service) as srv:
+        url = srv.base_url
+        assert httpx.get(f"{url}/health").json() == {"status": "ok"}
+
+        qa = httpx.post(f"{url}/generate", json={"chunk": "текст главы", "chunk_index": 3})
+        assert qa.status_code == 200 and qa.json()["chunk_index"] == 3
+        for _ in range(2):
+            answer = httpx.post(f"{url}/ask", json={"question": "что?"}).json()
+        assert answer == {"answer": "rag: что?"}
+        assert build_client.call_count == 1
+
+        pair = {"question": "q", "reference": "эталон", "candidate": "ответ"}
+        many = httpx.post(f"{url}/score", json={"items": [pair] * 4}, timeout=10).json()
+        assert len(many["items"]) == 4
+        assert many["items"][0]["ragas_faithfulness"] == 0.5
+        assert many["items"][0]["llm_alignment_score"] == 8
+
+        # Concurrent single-pair requests share batch calls
+        results: list[dict] = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    httpx.post(f"{url}/score", json=pair, timeout=10).json()
+                )
+            )
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert [r["metrics"]["cosine_similarity"] for r in results] == [0.25] * 4
+        assert sum(batch_sizes) == 8 and len(batch_sizes) < 8
+
+        bad = httpx.post(f"{url}/score", json={"question": "q"})
+        assert bad.status_code == 400 and "reference" in bad.json()["detail"]
+        assert httpx.post(f"{url}/nope", json={}).status_code == 404
+        stats = httpx.get(f"{url}/stats").json()
+        assert stats["requests"]["/score 200"] == 5
@@ -0,0 +1,87 @@
+"""Tests for single-flight coalescing of identical ValueAI requests."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from rag_med.valueai.fake_server import FakeServerConfig, FakeValueAIServer, LatencySpec
+from rag_med.valueai.llm_api_client import get_token, predict_async, predict_sync
+from rag_med.valueai.singleflight import AsyncSingleFlight, SingleFlight, singleflight_stats
+
+
+def test_singleflight_coalesces_threads_and_propagates_errors() -> None:
+    flight = SingleFlight("test_threads")
+    started = threading.Event()
+    calls = []
+
+    def slow() -> int:
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flight.do, "k", slow)
+        started.wait()
+        followers = [pool.submit(flight.do, "k", slow) for _ in range(4)]
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == [42] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 5, "executions": 1, "coalesced": 4}
+    assert singleflight_stats()["test_threads"]["coalesced"] == 4
+
+    def boom() -> int:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", boom)
+
+
+def test_async_singleflight_fans_out_result() -> None:
+    flight = AsyncSingleFlight("test_async")
+    calls = []
+
+    async def work() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main() -> list:
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(3)), flight.do("x", work))
+
+    assert asyncio.run(main()) == ["done"] * 4
+    assert len(calls) == 2
+    assert flight.stats()["coalesced"] == 2
+
+
+def test_identical_predicts_share_one_server_prediction() -> None:
+    messages = [{"role": "user", "content": "одинаковый промпт"}]
+    config = FakeServerConfig(compute=LatencySpec("fixed", 0.2))
+    with FakeValueAIServer(config) as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            texts = list(
+                pool.map(
+                    lambda _: predict_sync(srv.base_url, token, "m", messages, poll_interval=0.01),
+                    range(4),
+                )
+            )
+
+        async def main() -> list:
+            return await asyncio.gather(
+                *(
+                    predict_async(srv.base_url, token, "m", messages, poll_interval=0.01)
+                    for _ in range(3)
+                )
+            )
+
+        async_texts = asyncio.run(main())
+        submitted = srv.stats()["predicts"]["llm"]["submitted"]
+
+    assert len(set(texts)) == 1
+    assert len(set(async_texts)) == 1
+    assert submitted == 2
@@ -0,0 +1,56 @@
+"""Tests for streaming evaluation statistics."""
+
+import random
+import statistics
+
+import pytest
+
+from rag_med.evaluation.stats import MetricAggregator, P2Quantile, RunningStats
+
+
+def test_p2_quantile_tracks_exact_quantiles() -> None:
+    rng = random.Random(7)
+    values = [rng.lognormvariate(0, 0.5) for _ in range(20_000)]
+    for q in (0.25, 0.5, 0.9):
+        estimator = P2Quantile(q)
+        for v in values:
+            estimator.add(v)
+        exact = statistics.quantiles(values, n=100)[round(q * 100) - 1]
+        assert estimator.value() == pytest.approx(exact, rel=0.02)
+
+    few = P2Quantile(0.5)
+    for v in (3.0, 1.0, 2.0):
+        few.add(v)
+    assert few.value() == 2.0
+    assert P2Quantile(0.5).value() is None
+
+
+def test_running_stats_matches_batch_statistics() -> None:
+    rng = random.Random(1)
+    values = [rng.uniform(1, 10) for _ in range(1000)]
+    stats = RunningStats()
+    for v in values:
+        stats.add(v)
+    stats.add(None)
+
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.stdev == pytest.approx(statistics.stdev(values))
+    assert (stats.count, stats.missing) == (1000, 1)
+    low, high = stats.confidence_interval(0.95)
+    assert low < stats.mean < high
+    assert high - low == pytest.approx(2 * 1.959964 * statistics.stdev(values) / 1000**0.5, rel=1e-4)
+
+
+def test_aggregator_skips_missing_values() -> None:
+    agg = MetricAggregator(["score", "faith"])
+    agg.add({"score": 8, "faith": None})
+    agg.add({"score": 6})
+    agg.add({"score": None, "faith": 0.5})
+
+    assert agg.mean("score") == 7.0
+    assert agg.mean("faith") == 0.5
+    summary = agg.summary()
+    assert (summary["score"]["count"], summary["score"]["missing"]) == (2, 1)
+    assert (summary["faith"]["count"], summary["faith"]["missing"]) == (1, 2)
+    assert summary["faith"]["ci_low"] is None
+    assert MetricAggregator(["x"]).mean("x") == 0.0
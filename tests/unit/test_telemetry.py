@@ -0,0 +1,62 @@
+"""Tests for ValueAI latency instrumentation."""
+
+from rag_med.valueai.client import ValueAIRagClient, ValueAIRagClientConfig
+from rag_med.valueai.fake_server import FakeServerConfig, FakeValueAIServer, LatencySpec
+from rag_med.valueai.llm_api_client import get_token, predict_sync
+from rag_med.valueai.telemetry import (
+    FIRST_NONPENDING,
+    POLL_COUNT,
+    SUBMIT_RTT,
+    TIME_TO_RESULT,
+    TOKEN_FETCH,
+    Histogram,
+    LatencyRecorder,
+    get_recorder,
+)
+
+
+def test_histogram_quantiles() -> None:
+    hist = Histogram(reservoir_size=1000)
+    for v in range(1, 101):
+        hist.observe(float(v))
+    summary = hist.summary()
+    assert summary["count"] == 100
+    assert (summary["p50"], summary["p95"], summary["p99"]) == (50.0, 95.0, 99.0)
+    assert Histogram().summary()["p50"] is None
+
+
+def test_prometheus_export() -> None:
+    rec = LatencyRecorder()
+    rec.observe(SUBMIT_RTT, 0.25, endpoint="/llm/predict", model="m")
+    text = rec.to_prometheus()
+    assert "# TYPE valueai_submit_rtt_seconds summary" in text
+    assert 'valueai_submit_rtt_seconds{endpoint="/llm/predict",model="m",quantile="0.5"} 0.25' in text
+    assert 'valueai_submit_rtt_seconds_count{endpoint="/llm/predict",model="m"} 1' in text
+    assert LatencyRecorder().to_prometheus() == ""
+
+
+def test_clients_record_breakdown() -> None:
+    recorder = get_recorder()
+    recorder.reset()
+    config = FakeServerConfig(compute=LatencySpec("fixed", 0.05))
+    with FakeValueAIServer(config) as srv:
+        token = get_token(srv.base_url, "user", "pass")
+        predict_sync(srv.base_url, token, "llm-m", [{"role": "user", "content": "q"}], poll_interval=0.01)
+        ValueAIRagClient(
+            ValueAIRagClientConfig(
+                base_url=srv.base_url,
+                username="u",
+                password="p",
+                rag_id=1,
+                model_name="rag-m",
+                poll_interval_seconds=0.01,
+            )
+        ).ask("телеметрия")
+
+    snap = recorder.snapshot()
+    for metric in (SUBMIT_RTT, FIRST_NONPENDING, TIME_TO_RESULT, POLL_COUNT):
+        series = {(s["endpoint"], s["model"]) for s in snap[metric]}
+        assert series == {("/llm/predict", "llm-m"), ("/rag/predict", "rag-m")}
+    assert sum(s["count"] for s in snap[TOKEN_FETCH]) == 2
+    polls = next(s for s in snap[POLL_COUNT] if s["model"] == "llm-m")
+    assert polls["max"] >= 2
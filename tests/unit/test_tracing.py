@@ -0,0 +1,61 @@
+"""Tests for the buffered tracing sink."""
+
+import json
+
+import pytest
+
+from rag_med import tracing
+
+
+@pytest.fixture(autouse=True)
+def _reset_tracer():
+    yield
+    tracing.configure_tracing(enabled=False)
+
+
+def test_disabled_tracer_records_nothing() -> None:
+    tracing.configure_tracing(enabled=False)
+    with tracing.span("outer", a=1) as s:
+        s.set(b=2)
+        tracing.event("inside")
+    assert tracing.get_tracer().records() == []
+
+
+def test_spans_nest_and_errors_are_recorded() -> None:
+    tracer = tracing.configure_tracing(enabled=True, level="info")
+    with tracing.span("outer", chunk_index=1):
+        tracing.event("ignored", level="debug")
+        tracing.event("note", x=1)
+        with pytest.raises(ValueError), tracing.span("inner"):
+            raise ValueError("boom")
+    records = {r["name"]: r for r in tracer.records()}
+    assert set(records) == {"outer", "note", "inner"}
+    outer, inner = records["outer"], records["inner"]
+    assert inner["parent_id"] == outer["span_id"] == records["note"]["parent_id"]
+    assert inner["trace_id"] == outer["trace_id"]
+    assert inner["status"] == "error" and "boom" in inner["error"]
+    assert outer["attrs"] == {"chunk_index": 1} and outer["duration_ms"] >= 0
+
+
+def test_sampling_keeps_errors_and_ring_buffer_drops_oldest() -> None:
+    tracer = tracing.configure_tracing(enabled=True, sample_rate=0.0, buffer_size=3)
+    with tracing.span("unsampled"):
+        tracing.event("child")
+    tracing.event("failure", level="error")
+    assert [r["name"] for r in tracer.records()] == ["failure"]
+
+    for i in range(5):
+        tracing.event(f"e{i}", level="error")
+    assert [r["name"] for r in tracer.records()] == ["e2", "e3", "e4"]
+    assert tracer.dropped == 3
+
+
+def test_writer_appends_json_lines(tmp_path) -> None:
+    path = tmp_path / "trace.jsonl"
+    tracer = tracing.configure_tracing(enabled=True, path=path)
+    with tracing.span("predict", model="m"):
+        pass
+    tracer.close()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(r["type"], r["name"], r["attrs"]) for r in lines] == [("span", "predict", {"model": "m"})]
+    assert tracer.records() == []
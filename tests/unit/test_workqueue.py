@@ -0,0 +1,137 @@
+"""Tests for the shared job queue, workers and coordinator."""
+
+import json
+import time
+
+from rag_med.qa_generator import generator
+from rag_med.qa_generator.models import QAResult
+from rag_med.workqueue import coordinator, tasks
+from rag_med.workqueue.queue import STATE_DONE, STATE_FAILED, JobQueue
+
+
+def test_lease_order_and_follow_ups(tmp_path) -> None:
+    queue = JobQueue(tmp_path / "q.sqlite3")
+    queue.enqueue("b", [("generate", {"i": 1}, 0), ("metric", {"i": 2}, 2)])
+    first = queue.lease("w1", lease_seconds=60)
+    assert first.kind == "metric" and first.attempts == 1
+    assert queue.complete(first, "w1", {"ok": 1}, [("rag", {"i": 3}, 1)])
+    assert queue.lease("w1", lease_seconds=60, kinds=["rag"]).payload == {"i": 3}
+    assert queue.lease("w2", lease_seconds=60, kinds=["rag"]) is None
+    assert not queue.batch_finished("b")
+    assert queue.batch_counts("b")["metric"] == {STATE_DONE: 1}
+    assert [j.result for j in queue.batch_jobs("b", "metric")] == [{"ok": 1}]
+
+
+def test_expired_lease_is_taken_over(tmp_path) -> None:
+    queue = JobQueue(tmp_path / "q.sqlite3")
+    queue.enqueue("b", [("generate", {}, 0)])
+    stale = queue.lease("w1", lease_seconds=0.01)
+    time.sleep(0.05)
+    job = queue.lease("w2", lease_seconds=60)
+    assert job.job_id == stale.job_id and job.attempts == 2
+    assert not queue.heartbeat(stale.job_id, "w1", lease_seconds=60)
+    assert not queue.complete(stale, "w1", "late")
+    assert queue.heartbeat(job.job_id, "w2", lease_seconds=60)
+    assert queue.complete(job, "w2", "on time")
+    assert queue.batch_finished("b")
+    assert queue.batch_jobs("b")[0].result == "on time"
+
+
+def test_failed_job_is_retried_then_marked_failed(tmp_path) -> None:
+    queue = JobQueue(tmp_path / "q.sqlite3", max_attempts=2, retry_delay=0)
+    queue.enqueue("b", [("rag", {}, 1)])
+    queue.fail(queue.lease("w", lease_seconds=60), "w", "timeout")
+    second = queue.lease("w", lease_seconds=60)
+    assert second.attempts == 2 and second.error == "timeout"
+    queue.fail(second, "w", "timeout again")
+    assert queue.lease("w", lease_seconds=60) is None
+    assert queue.batch_finished("b")
+    (job,) = queue.batch_jobs("b")
+    assert job.state == STATE_FAILED and job.error == "timeout again"
+
+    assert queue.retry_failed("b") == 1
+    retried = queue.lease("w", lease_seconds=60)
+    assert retried.attempts == 1 and retried.error is None
+
+
+def test_coordinate_pdf_with_local_workers(mocker, tmp_path) -> None:
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF doc")
+    mocker.patch.object(coordinator, "_read_pdf_text", return_value="doc")
+    mocker.patch.object(
+        coordinator, "_split_text_chunks", return_value=[f"chunk {i}" for i in range(12)]
+    )
+    mocker.patch.object(coordinator.settings, "workqueue_poll_seconds", 0.01)
+    calls: dict[int, int] = {}
+
+    def flaky_generate(chunk: str, chunk_index: int) -> QAResult:
+        # The first attempt of group 2 fails and is retried by the queue
+        calls[chunk_index] = calls.get(chunk_index, 0) + 1
+        failed = chunk_index == 2 and calls[chunk_index] == 1
+        return QAResult(
+            chunk_index=chunk_index,
+            chunk=chunk,
+            chunk_length_chars=len(chunk),
+            chunk_length_words=len(chunk.split()),
+            model_used="m",
+            question="Ошибка" if failed else f"вопрос {chunk_index}",
+            answer="Ошибка" if failed else "ответ",
+            raw_model_output="{}",
+        )
+
+    mocker.patch.object(generator, "generate_qa", side_effect=flaky_generate)
+    client = mocker.Mock()
+    client.ask.side_effect = lambda q: f"rag: {q}"
+    mocker.patch.object(tasks, "_rag_client", return_value=client)
+    mocker.patch.object(
+        generator, "evaluate_answer_pair_ragas_extended", return_value={"faithfulness": 0.5}
+    )
+    mocker.patch.object(
+        generator,
+        "compare_two_answers",
+        return_value={"cosine_similarity": 0.25, "factual_correctness": 1.0},
+    )
+    mocker.patch.object(
+        generator,
+        "evaluate_answer_pair_llm_alignment",
+        return_value={"alignment_score": 8, "alignment_comment": "ok"},
+    )
+
+    queue = JobQueue(tmp_path / "q.sqlite3", retry_delay=0)
+    output = tmp_path / "qa.json"
+    results = coordinator.coordinate_pdf(
+        pdf, output, num_questions=3, evaluate=True, seed=5, queue=queue, local_workers=2
+    )
+
+    assert [r.chunk_index for r in results] == [1, 2, 3]
+    assert calls == {1: 1, 2: 2, 3: 1}
+    assert all(r.valueai_answer == f"rag: {r.question}" for r in results)
+    assert all(r.evaluation_metrics["llm_alignment_score"] == 8 for r in results)
+    assert "bm25_similarity" not in results[0].evaluation_metrics
+    summary = json.loads((tmp_path / "qa_valueai_eval.json").read_text(encoding="utf-8"))
+    assert summary["aggregate_metrics"]["evaluated_count"] == 3
+    assert summary["workqueue"]["jobs"]["metric"] == {STATE_DONE: 9}
+    assert (tmp_path / "qa_manifest.json").exists()
+
+    # Same seed: attaches to the finished batch instead of publishing it again
+    again = coordinator.publish_pdf(queue, pdf, num_questions=3, evaluate=True, seed=5)
+    assert again.attached and again.batch_id == summary["manifest"]["key"]
+    assert queue.batch_finished(again.batch_id)
+
+
+def test_rerun_retries_failed_jobs_of_finished_batch(mocker, tmp_path) -> None:
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF doc")
+    mocker.patch.object(coordinator, "_read_pdf_text", return_value="doc")
+    mocker.patch.object(
+        coordinator, "_split_text_chunks", return_value=[f"chunk {i}" for i in range(8)]
+    )
+    queue = JobQueue(tmp_path / "q.sqlite3", max_attempts=1)
+    batch = coordinator.publish_pdf(queue, pdf, num_questions=2, seed=5)
+    queue.complete(queue.lease("w", lease_seconds=60), "w", {"ok": 1})
+    queue.fail(queue.lease("w", lease_seconds=60), "w", "LLM down")
+    assert queue.batch_counts(batch.batch_id)["generate"] == {STATE_DONE: 1, STATE_FAILED: 1}
+
+    again = coordinator.publish_pdf(queue, pdf, num_questions=2, seed=5)
+    assert again.attached
+    assert queue.batch_counts(batch.batch_id)["generate"] == {STATE_DONE: 1, "pending": 1}